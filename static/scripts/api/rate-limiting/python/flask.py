@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import requests
+
+# Configuration - Update these values
+API_TOKEN = "YOUR_API_TOKEN"
+ORG_ID = "YOUR_ORGANIZATION_ID"
+BASE_URL = "https://api.turbodocx.com"
+
+# Save this file as turbodocx_rate_limit.py next to your TurboDocx clients and use
+# RateLimitedSession in place of requests so every client in the process shares one set
+# of rate limits. Only the demo app at the bottom needs Flask
+
+# Endpoint families that share one rate limit, matched on the request path in order
+ENDPOINT_FAMILIES = [
+    ('bulk-ingest', re.compile(r'^/turbosign/bulk/ingest')),
+    ('bulk-cancel', re.compile(r'^/turbosign/bulk/batch/[^/]+/cancel')),
+    ('bulk-list', re.compile(r'^/turbosign/bulk/')),
+    ('template', re.compile(r'^/template')),
+    ('deliverable', re.compile(r'^/v1/deliverable')),
+    ('ai-generate', re.compile(r'^/ai/generate/')),
+]
+
+# Starting limits as (requests, per seconds) until the API's response headers say otherwise
+DEFAULT_LIMITS = {
+    'bulk-ingest': (10, 60.0),     # Documented TurboSign bulk limits
+    'bulk-cancel': (10, 60.0),
+    'bulk-list': (60, 60.0),
+    'template': (60, 60.0),
+    'deliverable': (60, 60.0),
+    'ai-generate': (20, 60.0),
+    'default': (60, 60.0),
+}
+
+MAX_RATE_LIMIT_RETRIES = 5      # 429 responses to absorb per request before giving up
+DEFAULT_RETRY_AFTER = 5.0       # Seconds to pause a family on a 429 without Retry-After
+
+class TokenBucket:
+    """
+    Thread-safe token bucket for one endpoint family.
+
+    acquire() blocks until a token is available instead of failing, so
+    bursts are queued and sustained throughput settles at the allowed rate.
+    pause() holds every caller until a server-provided reset time.
+    """
+
+    def __init__(self, limit: int, period: float):
+        self.capacity = float(limit)
+        self.rate = limit / period
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.paused_until:
+                    wait = self.paused_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def learn(self, limit: Optional[int], remaining: Optional[int], reset_in: Optional[float]):
+        """Adopt the limit the API reports and resynchronise the local token count"""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            if limit:
+                self.capacity = float(limit)
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+                if reset_in and remaining <= 0:
+                    self.paused_until = max(self.paused_until, now + reset_in)
+                elif reset_in:
+                    # Spread what is left of the window evenly over the time until it resets
+                    self.rate = max(remaining / max(reset_in, 1.0), 0.01)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def parse_rate_limit_headers(headers) -> Tuple[Optional[int], Optional[int], Optional[float]]:
+    """Read limit, remaining and seconds-until-reset from X-RateLimit-* or RateLimit-* headers"""
+    def header(name):
+        return headers.get(f'X-RateLimit-{name}') or headers.get(f'RateLimit-{name}')
+
+    def as_int(value):
+        try:
+            return int(float(value.split(',')[0]))
+        except (AttributeError, ValueError):
+            return None
+
+    limit = as_int(header('Limit'))
+    remaining = as_int(header('Remaining'))
+    reset = header('Reset')
+    reset_in = None
+    if reset:
+        try:
+            reset_value = float(reset)
+            # Some APIs send an epoch timestamp, others seconds until reset
+            reset_in = reset_value - time.time() if reset_value > 1_000_000_000 else reset_value
+            reset_in = max(reset_in, 0.0)
+        except ValueError:
+            reset_in = None
+
+    return limit, remaining, reset_in
+
+class RequestScheduler:
+    """
+    Rate-limit-aware scheduler shared by every TurboDocx client in a process.
+
+    Each endpoint family (bulk ingest, bulk cancel, bulk listings,
+    /template*, /v1/deliverable, /ai/generate/*) has its own token bucket. Limits start at
+    DEFAULT_LIMITS and are replaced by whatever the API reports in its
+    rate-limit headers. A 429 pauses the whole family for Retry-After and
+    the request is queued and sent again instead of raising.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 max_retries: int = MAX_RATE_LIMIT_RETRIES):
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.max_retries = max_retries
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+        self.throttled = 0
+
+    def family_for(self, url: str) -> str:
+        path = urlparse(url).path
+        for family, pattern in ENDPOINT_FAMILIES:
+            if pattern.match(path):
+                return family
+        return 'default'
+
+    def bucket(self, family: str) -> TokenBucket:
+        with self.lock:
+            if family not in self.buckets:
+                self.buckets[family] = TokenBucket(*self.limits.get(family, self.limits['default']))
+            return self.buckets[family]
+
+    def send(self, send_once, url: str) -> requests.Response:
+        """Run send_once() under the family's rate limit, waiting out any 429s"""
+        bucket = self.bucket(self.family_for(url))
+
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            response = send_once()
+            bucket.learn(*parse_rate_limit_headers(response.headers))
+
+            if response.status_code != 429 or attempt == self.max_retries:
+                return response
+
+            self.throttled += 1
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            bucket.pause(retry_after if retry_after is not None else DEFAULT_RETRY_AFTER * (2 ** attempt))
+            response.close()
+
+        return response
+
+# One scheduler per process, shared by every RateLimitedSession
+default_scheduler = RequestScheduler()
+
+class RateLimitedSession(requests.Session):
+    """
+    Drop-in replacement for requests: use session.get/post/... where a
+    script calls requests.get/post/.... Sessions share the process-wide
+    scheduler unless given their own, so separate clients draw on the same
+    rate limits. Callers still send their own Authorization headers.
+    """
+
+    def __init__(self, scheduler: Optional[RequestScheduler] = None):
+        super().__init__()
+        self.scheduler = scheduler or default_scheduler
+
+    def request(self, method, url, *args, **kwargs):
+        files = kwargs.get('files') or {}
+
+        def send_once():
+            # Rewind file uploads so a queued retry sends the whole file again
+            for value in (files.values() if isinstance(files, dict) else []):
+                handle = value[1] if isinstance(value, tuple) else value
+                if hasattr(handle, 'seek'):
+                    handle.seek(0)
+            return super(RateLimitedSession, self).request(method, url, *args, **kwargs)
+
+        return self.scheduler.send(send_once, url)
+
+def create_app():
+    """Demo service - Flask is only imported when the demo runs, not when RateLimitedSession is imported"""
+    from flask import Flask, jsonify
+
+    app = Flask(__name__)
+
+    session = RateLimitedSession()
+    session.headers.update({
+        'Authorization': f'Bearer {API_TOKEN}',
+        'x-rapiddocx-org-id': ORG_ID,
+        'User-Agent': 'TurboDocx API Client'
+    })
+
+    @app.route('/template-pages', methods=['GET'])
+    def template_pages():
+        """Burst 20 page requests - they are queued at the template family's rate instead of failing with 429"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        def fetch_page(offset):
+            response = session.get(
+                f'{BASE_URL}/template-item',
+                params={'limit': 25, 'offset': offset}
+            )
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            with ThreadPoolExecutor(max_workers=10) as executor:
+                pages = list(executor.map(fetch_page, range(0, 500, 25)))
+        except requests.exceptions.RequestException as error:
+            return jsonify({'success': False, 'error': str(error)}), 502
+
+        return jsonify({
+            'success': True,
+            'pages': len(pages),
+            'throttled': session.scheduler.throttled
+        })
+
+    @app.route('/rate-limits', methods=['GET'])
+    def rate_limits():
+        """Current limit and refill rate the scheduler has learned for each endpoint family"""
+        return jsonify({
+            family: {
+                'limit': round(bucket.capacity),
+                'perSecond': round(bucket.rate, 3),
+                'tokens': round(bucket.tokens, 2)
+            }
+            for family, bucket in session.scheduler.buckets.items()
+        })
+
+    return app
+
+if __name__ == '__main__':
+    create_app().run(debug=True)
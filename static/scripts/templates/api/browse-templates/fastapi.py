@@ -1,10 +1,25 @@
 #!/usr/bin/env python3
 
+import os
+import re
+import asyncio
+import copy
+import heapq
+import time
+import hashlib
+import threading
+import random
 import requests
 import json
-from typing import Optional, List
+from bisect import bisect_left
+from collections import OrderedDict, Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional, List, Dict, Callable
 from urllib.parse import urlencode
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
 
@@ -13,6 +28,35 @@ API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
+# Template cache settings
+TEMPLATE_CACHE_SIZE = 256               # Entries kept in the in-process LRU
+TEMPLATE_DETAILS_TTL = 300              # Seconds a details entry is served without revalidation
+TEMPLATE_PREVIEW_TTL = 60               # Preview links may be short-lived, so revalidate sooner
+TEMPLATE_CACHE_DIR: Optional[str] = None  # Set to a directory to share entries between processes
+TEMPLATE_CACHE_DISK_SIZE = 4096         # Files kept in TEMPLATE_CACHE_DIR; the oldest are removed beyond this
+
+# Catalog crawler settings
+CATALOG_PAGE_SIZE = 100                 # Items per /template-item page
+CATALOG_CONCURRENCY = 8                 # Pages and detail lookups fetched in parallel
+RATE_LIMIT_RETRIES = 5                  # 429s waited out per request before giving up
+RATE_LIMIT_BASE_DELAY = 1.0             # Seconds before the first retry when a 429 has no Retry-After
+
+# Local search settings
+SEARCH_INDEX_REFRESH = 300              # Seconds before the catalog is re-crawled in the background
+SEARCH_FIELD_WEIGHTS = {'name': 3.0, 'tags': 2.0, 'placeholders': 1.5, 'description': 1.0}
+SEARCH_MAX_PREFIX_EXPANSIONS = 200      # Completions considered per partial word
+SEARCH_MIN_TRIGRAM_SIMILARITY = 0.4     # Jaccard similarity for typo matches
+
+# Browse workflow settings
+BROWSE_CANDIDATES = 3                   # Top templates whose details are fetched alongside the selection
+
+# Share one rate limiter with the other TurboDocx clients in this process when the
+# rate-limiting example is saved next to this script as turbodocx_rate_limit.py
+try:
+    from turbodocx_rate_limit import RateLimitedSession
+except ImportError:
+    RateLimitedSession = None
+
 app = FastAPI(
     title="TurboDocx Template Browser Service",
     description="FastAPI service for browsing and selecting templates from TurboDocx API",
@@ -50,6 +94,185 @@ class ServiceInfo(BaseModel):
     endpoints: dict
     configuration: ConfigurationInfo
 
+class TemplateCache:
+    """
+    Template Metadata Cache
+    Two tiers: an in-process LRU and an optional on-disk directory shared by
+    every worker on the host. A fresh entry (younger than its TTL) is
+    returned without touching the network. A stale entry is revalidated with
+    If-None-Match / If-Modified-Since, so an unchanged template costs a 304
+    instead of a full body. If the API is unreachable, a stale details copy
+    is served rather than failing the generation request; preview links
+    expire, so a stale preview is never served. The disk tier is capped at
+    max_disk_entries files, removing the least recently written first.
+    """
+
+    def __init__(self, max_entries: int = TEMPLATE_CACHE_SIZE, cache_dir: Optional[str] = TEMPLATE_CACHE_DIR,
+                 max_disk_entries: int = TEMPLATE_CACHE_DISK_SIZE):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.max_disk_entries = max_disk_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'diskHits': 0, 'revalidated': 0, 'misses': 0, 'staleServed': 0}
+
+        # Pooled keep-alive connections for revalidation and misses
+        self.session = RateLimitedSession() if RateLimitedSession else requests.Session()
+        self.session.headers.update({
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        })
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def _count(self, stat: str):
+        # Handlers run on a thread pool, so counters are updated under the lock
+        with self.lock:
+            self.stats[stat] += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _load(self, key: str) -> Optional[dict]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                return entry
+
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        self._count('diskHits')
+        self._store(key, entry, write_disk=False)
+        return entry
+
+    def _store(self, key: str, entry: dict, write_disk: bool = True):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+        if self.cache_dir and write_disk:
+            # Write then rename so other processes never read a half-written entry
+            path = self._disk_path(key)
+            is_new = not os.path.exists(path)
+            temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(temp_path, path)
+            if is_new:
+                self._prune_disk()
+
+    def _prune_disk(self):
+        """Remove the least recently written files once the directory exceeds max_disk_entries"""
+        try:
+            files = [e for e in os.scandir(self.cache_dir) if e.name.endswith('.json')]
+        except OSError:
+            return
+        if len(files) <= self.max_disk_entries:
+            return
+
+        def mtime(entry):
+            try:
+                return entry.stat().st_mtime
+            except OSError:
+                return 0
+
+        files.sort(key=mtime)
+        for entry in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass  # Another worker pruned it first
+
+    def fetch(self, url: str, **kwargs) -> requests.Response:
+        """GET over the pooled session, backing off on 429 unless RateLimitedSession already did"""
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            response = self.session.get(url, **kwargs)
+            if response.status_code != 429 or RateLimitedSession or attempt == RATE_LIMIT_RETRIES:
+                return response
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            delay = retry_after if retry_after is not None else random.uniform(0, RATE_LIMIT_BASE_DELAY * (2 ** attempt))
+            print(f'⚠️  HTTP 429 - retrying in {delay:.1f}s ({attempt + 1}/{RATE_LIMIT_RETRIES})')
+            response.close()
+            time.sleep(delay)
+
+    def get(self, key: str, url: str, extract: Callable[[dict], object], ttl: float, serve_stale: bool = True):
+        entry = self._load(key)
+
+        # Wall-clock time so entries written by another process age correctly
+        if entry is not None and time.time() - entry['fetchedAt'] < ttl:
+            self._count('hits')
+            return copy.deepcopy(entry['value'])
+
+        headers = {}
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('lastModified'):
+                headers['If-Modified-Since'] = entry['lastModified']
+
+        try:
+            response = self.fetch(url, headers=headers, timeout=(5, 30))
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if entry is None or not serve_stale:
+                raise
+            print(f'⚠️  API unreachable, serving cached {key}')
+            self._count('staleServed')
+            return copy.deepcopy(entry['value'])
+
+        if response.status_code == 304 and entry is not None:
+            self._count('revalidated')
+            entry = {**entry, 'fetchedAt': time.time()}
+            self._store(key, entry)
+            return copy.deepcopy(entry['value'])
+
+        response.raise_for_status()
+        self._count('misses')
+
+        entry = {
+            'value': extract(response.json()),
+            'etag': response.headers.get('ETag'),
+            'lastModified': response.headers.get('Last-Modified'),
+            'fetchedAt': time.time()
+        }
+        self._store(key, entry)
+        return copy.deepcopy(entry['value'])
+
+    def invalidate(self, template_id: str):
+        for key in (f'details:{template_id}', f'preview:{template_id}'):
+            with self.lock:
+                self.entries.pop(key, None)
+            if self.cache_dir:
+                try:
+                    os.remove(self._disk_path(key))
+                except FileNotFoundError:
+                    pass
+
+template_cache = TemplateCache()
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
 def browse_templates(limit: int = 25, offset: int = 0, query: str = '',
                     show_tags: bool = True, selected_tags: Optional[List[str]] = None) -> dict:
     """
@@ -85,7 +308,7 @@ def browse_templates(limit: int = 25, offset: int = 0, query: str = '',
     }
 
     try:
-        response = requests.get(url, headers=headers)
+        response = template_cache.session.get(url, headers=headers)
         response.raise_for_status()
 
         # Parse response
@@ -108,21 +331,16 @@ def browse_templates(limit: int = 25, offset: int = 0, query: str = '',
         raise
 
 def get_template_details(template_id: str) -> dict:
-    """Get detailed template information"""
+    """Get detailed template information (served from the template cache while fresh)"""
     url = f"{BASE_URL}/template/{template_id}"
 
-    headers = {
-        'Authorization': f'Bearer {API_TOKEN}',
-        'x-rapiddocx-org-id': ORG_ID,
-        'User-Agent': 'TurboDocx API Client'
-    }
-
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-
-        result = response.json()
-        template = result['data']['results']
+        template = template_cache.get(
+            f'details:{template_id}',
+            url,
+            lambda result: result['data']['results'],
+            TEMPLATE_DETAILS_TTL
+        )
 
         print(f"Template: {template['name']}")
 
@@ -146,21 +364,17 @@ def get_template_details(template_id: str) -> dict:
         raise
 
 def get_template_pdf_preview(template_id: str) -> str:
-    """Get template PDF preview link"""
+    """Get template PDF preview link (served from the template cache while fresh)"""
     url = f"{BASE_URL}/template/{template_id}/previewpdflink"
 
-    headers = {
-        'Authorization': f'Bearer {API_TOKEN}',
-        'x-rapiddocx-org-id': ORG_ID,
-        'User-Agent': 'TurboDocx API Client'
-    }
-
     try:
-        response = requests.get(url, headers=headers)
-        response.raise_for_status()
-
-        result = response.json()
-        pdf_url = result['results']
+        pdf_url = template_cache.get(
+            f'preview:{template_id}',
+            url,
+            lambda result: result['results'],
+            TEMPLATE_PREVIEW_TTL,
+            serve_stale=False  # An expired preview link is worse than an error
+        )
 
         print(f"PDF Preview: {pdf_url}")
 
@@ -177,6 +391,307 @@ def get_template_pdf_preview(template_id: str) -> str:
         print(error_msg)
         raise
 
+class TemplateCatalog:
+    """
+    Full Template Catalog
+    Pages through the flat /template-item listing once. The first page
+    reports totalRecords, so the remaining pages are fetched concurrently on
+    a bounded thread pool, and the folder tree is rebuilt locally from each
+    item's templateFolderId. Each template is stored with its folder path,
+    tags and variable count, so name and tag lookups are answered locally
+    instead of by paginated searches.
+    """
+
+    def __init__(self):
+        self.templates: Dict[str, dict] = {}
+        self.folders: Dict[str, dict] = {}
+        self.crawled_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def _fetch_page(self, offset: int) -> dict:
+        params = {
+            'limit': str(CATALOG_PAGE_SIZE),
+            'offset': str(offset),
+            'showTags': 'true'
+        }
+
+        response = template_cache.fetch(f"{BASE_URL}/template-item", params=params, timeout=(5, 30))
+        response.raise_for_status()
+        return response.json()['data']
+
+    def _path(self, item: dict, folders: Dict[str, dict]) -> str:
+        parts = [item['name']]
+        parent_id = item.get('templateFolderId')
+        seen = set()
+        while parent_id and parent_id in folders and parent_id not in seen:
+            seen.add(parent_id)
+            parts.append(folders[parent_id]['name'])
+            parent_id = folders[parent_id].get('templateFolderId')
+        return '/'.join(reversed(parts))
+
+    def crawl(self, include_variables: bool = True, concurrency: int = CATALOG_CONCURRENCY) -> dict:
+        started = time.monotonic()
+        items: Dict[str, dict] = {}
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            # The first page reports totalRecords, so the rest can be fetched at once
+            first_page = self._fetch_page(0)
+            offsets = range(CATALOG_PAGE_SIZE, first_page.get('totalRecords', 0), CATALOG_PAGE_SIZE)
+            pages = [first_page, *executor.map(self._fetch_page, offsets)]
+
+            # Keyed by id, so an item that shifts across a page boundary mid-crawl is kept once
+            for data in pages:
+                for item in data['results']:
+                    items[item['id']] = item
+
+            # Folders come back in the same flat listing; templateFolderId links the tree
+            folders = {item_id: item for item_id, item in items.items() if item.get('type') == 'folder'}
+            templates = {}
+            for item_id, item in items.items():
+                if item.get('type') != 'template':
+                    continue
+                tags = item.get('tags') or []
+                templates[item_id] = {
+                    'id': item_id,
+                    'name': item['name'],
+                    'description': item.get('description'),
+                    'path': self._path(item, folders),
+                    'folderId': item.get('templateFolderId'),
+                    'tags': [tag.get('name') or tag.get('label') or tag.get('id') for tag in tags if isinstance(tag, dict)],
+                    'tagIds': [tag.get('id') for tag in tags if isinstance(tag, dict) and tag.get('id')],
+                    'updatedOn': item.get('updatedOn'),
+                    'variableCount': None,
+                    'placeholders': [],
+                    'variableError': None
+                }
+
+            if include_variables:
+                previous = self.templates
+
+                # Variables come from template details, which share the template cache
+                def variable_info(template_id):
+                    known = previous.get(template_id)
+                    # Templates unchanged since the last crawl keep their variables
+                    if known and known['variableCount'] is not None and known['updatedOn'] == templates[template_id]['updatedOn']:
+                        return known['variableCount'], known['placeholders'], None
+                    try:
+                        details = template_cache.get(
+                            f'details:{template_id}',
+                            f"{BASE_URL}/template/{template_id}",
+                            lambda result: result['data']['results'],
+                            TEMPLATE_DETAILS_TTL
+                        )
+                    except (requests.exceptions.RequestException, KeyError, ValueError) as error:
+                        # One failed lookup (e.g. a template deleted mid-crawl) must not abort the catalog
+                        return None, [], str(error)
+                    variables = details.get('variables') or []
+                    return len(variables), [v['placeholder'] for v in variables if v.get('placeholder')], None
+
+                for template_id, (count, placeholders, error) in zip(templates, executor.map(variable_info, list(templates))):
+                    templates[template_id]['variableCount'] = count
+                    templates[template_id]['placeholders'] = placeholders
+                    templates[template_id]['variableError'] = error
+
+        # Swap the new catalog in at once so readers never see a half-built one
+        with self.lock:
+            self.templates = templates
+            self.folders = folders
+            self.crawled_at = time.time()
+
+        return {
+            'templates': len(templates),
+            'folders': len(folders),
+            'pagesFetched': len(pages),
+            'variableErrors': sum(1 for template in templates.values() if template['variableError']),
+            'elapsedSeconds': round(time.monotonic() - started, 2)
+        }
+
+    def find_by_name(self, name: str) -> List[dict]:
+        needle = name.casefold()
+        return [t for t in self.templates.values() if needle in t['name'].casefold()]
+
+    def find_by_tag(self, tag: str) -> List[dict]:
+        needle = tag.casefold()
+        return [
+            t for t in self.templates.values()
+            if tag in t['tagIds'] or any(needle == str(name).casefold() for name in t['tags'])
+        ]
+
+template_catalog = TemplateCatalog()
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lower-case word tokens; camelCase placeholders such as {EmployeeName} also yield their parts"""
+    if not text:
+        return []
+    tokens = []
+    for word in re.findall(r'[A-Za-z0-9]+', text):
+        tokens.append(word.lower())
+        parts = re.findall(r'[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])', word)
+        if len(parts) > 1:
+            tokens.extend(part.lower() for part in parts)
+    return tokens
+
+def trigrams(token: str) -> set:
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TemplateSearchIndex:
+    """
+    Local Template Search Index
+    An inverted index over template names, descriptions, tags and variable
+    placeholders, built from the template catalog. A query term matches
+    exact tokens first, then tokens it is a prefix of (so search-as-you-type
+    works on partial words), then - when nothing else matched - tokens with
+    similar trigrams to absorb typos. Every term must match for a template to
+    be returned. sync() only reindexes templates whose updatedOn changed.
+    """
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[str, float]] = defaultdict(dict)  # token -> {template id: field weight}
+        self.token_trigrams: Dict[str, set] = defaultdict(set)          # trigram -> tokens
+        self.sorted_tokens: List[str] = []
+        self.doc_tokens: Dict[str, set] = {}
+        self.docs: Dict[str, dict] = {}
+        self.synced_at: Optional[float] = None  # When the index last applied a catalog snapshot
+        self.lock = threading.RLock()
+
+    def _add(self, template: dict):
+        fields = [
+            (template['name'], SEARCH_FIELD_WEIGHTS['name']),
+            (template.get('description'), SEARCH_FIELD_WEIGHTS['description']),
+            (' '.join(str(tag) for tag in template.get('tags') or []), SEARCH_FIELD_WEIGHTS['tags']),
+            (' '.join(template.get('placeholders') or []), SEARCH_FIELD_WEIGHTS['placeholders'])
+        ]
+        tokens = set()
+        for text, weight in fields:
+            for token in tokenize(text):
+                postings = self.postings[token]
+                if not postings:
+                    for gram in trigrams(token):
+                        self.token_trigrams[gram].add(token)
+                postings[template['id']] = max(postings.get(template['id'], 0.0), weight)
+                tokens.add(token)
+
+        self.doc_tokens[template['id']] = tokens
+        self.docs[template['id']] = template
+
+    def _remove(self, template_id: str):
+        for token in self.doc_tokens.pop(template_id, ()):
+            postings = self.postings[token]
+            postings.pop(template_id, None)
+            if not postings:
+                del self.postings[token]
+                for gram in trigrams(token):
+                    self.token_trigrams[gram].discard(token)
+        self.docs.pop(template_id, None)
+
+    def sync(self, templates: Dict[str, dict]) -> dict:
+        """Apply a catalog snapshot: index new and changed templates, drop deleted ones"""
+        with self.lock:
+            removed = [template_id for template_id in self.docs if template_id not in templates]
+            changed = [
+                template for template_id, template in templates.items()
+                if template_id not in self.docs or self.docs[template_id] != template
+            ]
+            for template_id in removed:
+                self._remove(template_id)
+            for template in changed:
+                self._remove(template['id'])
+                self._add(template)
+            if removed or changed:
+                self.sorted_tokens = sorted(self.postings)
+            self.synced_at = time.time()
+            return {'indexed': len(changed), 'removed': len(removed), 'total': len(self.docs)}
+
+    def _match_term(self, term: str) -> Dict[str, float]:
+        """Template id -> best score for one query term"""
+        scores: Dict[str, float] = {}
+
+        def collect(token, factor):
+            for template_id, weight in self.postings.get(token, {}).items():
+                scores[template_id] = max(scores.get(template_id, 0.0), weight * factor)
+
+        collect(term, 1.0)
+
+        # Prefix matches - the sorted token list puts every completion of term in one run
+        start = bisect_left(self.sorted_tokens, term)
+        for token in self.sorted_tokens[start:start + SEARCH_MAX_PREFIX_EXPANSIONS]:
+            if not token.startswith(term):
+                break
+            if token != term:
+                collect(token, 0.8)
+
+        # Fuzzy fallback for typos, only when nothing matched exactly or by prefix
+        if not scores and len(term) >= 3:
+            term_grams = trigrams(term)
+            candidates = Counter()
+            for gram in term_grams:
+                candidates.update(self.token_trigrams.get(gram, ()))
+            for token, shared in candidates.items():
+                similarity = shared / len(term_grams | trigrams(token))
+                if similarity >= SEARCH_MIN_TRIGRAM_SIMILARITY:
+                    collect(token, 0.5 * similarity)
+
+        return scores
+
+    def search(self, query: str = '', selected_tags: Optional[List[str]] = None,
+               limit: int = 25, offset: int = 0) -> dict:
+        with self.lock:
+            terms = list(dict.fromkeys(tokenize(query)))
+            if terms:
+                scores = None
+                for term in terms:
+                    term_scores = self._match_term(term)
+                    if scores is None:
+                        scores = term_scores
+                    else:
+                        scores = {tid: score + term_scores[tid] for tid, score in scores.items() if tid in term_scores}
+                    if not scores:
+                        break
+                scores = scores or {}
+            else:
+                scores = {template_id: 0.0 for template_id in self.docs}
+
+            if selected_tags:
+                wanted = [tag.casefold() for tag in selected_tags]
+                scores = {
+                    tid: score for tid, score in scores.items()
+                    if all(
+                        tag in [t.casefold() for t in self.docs[tid].get('tagIds') or []] or
+                        tag in [str(t).casefold() for t in self.docs[tid].get('tags') or []]
+                        for tag in wanted
+                    )
+                }
+
+            # Only the requested page is ranked, not every match
+            ranked = heapq.nsmallest(
+                offset + limit,
+                scores.items(),
+                key=lambda entry: (-entry[1], self.docs[entry[0]]['name'].casefold())
+            )
+            results = [
+                {**self.docs[tid], 'type': 'template', 'templateFolderId': self.docs[tid].get('folderId'), 'score': round(score, 3)}
+                for tid, score in ranked[offset:]
+            ]
+
+            return {'results': results, 'totalRecords': len(scores)}
+
+search_index = TemplateSearchIndex()
+search_refresh_lock = threading.Lock()
+
+def refresh_local_index(include_variables: bool = True) -> dict:
+    """Re-crawl the catalog and apply the changes to the search index - every crawl goes through here"""
+    with search_refresh_lock:
+        crawl_summary = template_catalog.crawl(include_variables)
+        return {**crawl_summary, **search_index.sync(template_catalog.templates)}
+
+def ensure_local_index():
+    """Build the index on first use; afterwards refresh it in the background once it is stale"""
+    if search_index.synced_at is None:
+        refresh_local_index()
+    elif time.time() - search_index.synced_at > SEARCH_INDEX_REFRESH and not search_refresh_lock.locked():
+        threading.Thread(target=refresh_local_index, daemon=True).start()
+
 # FastAPI route handlers
 @app.get("/browse-templates", response_model=BrowseResponse)
 async def browse_templates_endpoint(
@@ -184,11 +699,16 @@ async def browse_templates_endpoint(
     offset: int = Query(0, ge=0),
     query: str = Query(''),
     showTags: bool = Query(True),
-    selectedTags: Optional[List[str]] = Query(None)
+    selectedTags: Optional[List[str]] = Query(None),
+    local: bool = Query(False)
 ):
-    """Browse templates with filtering options"""
+    """Browse templates with filtering options (local=true searches the in-process index)"""
     try:
-        result = browse_templates(limit, offset, query, showTags, selectedTags)
+        if local:
+            await run_in_threadpool(ensure_local_index)
+            result = search_index.search(query, selectedTags, limit, offset)
+        else:
+            result = browse_templates(limit, offset, query, showTags, selectedTags)
 
         return BrowseResponse(
             success=True,
@@ -229,6 +749,46 @@ async def get_template_pdf_preview_endpoint(template_id: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get PDF preview: {str(e)}")
 
+async def fan_out_template_lookups(candidates: List[dict]) -> dict:
+    """
+    Fetch the selected template's details and PDF preview together with the
+    details of the other candidates, all at once, merging each result as it
+    completes. The selected template's lookups are required; a failed
+    candidate lookup is reported in its entry instead of failing the call.
+    """
+    selected_id = candidates[0]['id']
+    tasks = {
+        asyncio.ensure_future(run_in_threadpool(get_template_details, selected_id)): ('templateDetails', selected_id),
+        asyncio.ensure_future(run_in_threadpool(get_template_pdf_preview, selected_id)): ('pdfPreview', selected_id)
+    }
+    for candidate in candidates[1:]:
+        tasks[asyncio.ensure_future(run_in_threadpool(get_template_details, candidate['id']))] = ('candidate', candidate['id'])
+
+    merged = {'templateDetails': None, 'pdfPreview': None, 'candidates': {}}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                kind, template_id = tasks[task]
+                if kind != 'candidate':
+                    merged[kind] = task.result()
+                elif task.exception() is not None:
+                    merged['candidates'][template_id] = {'id': template_id, 'error': str(task.exception())}
+                else:
+                    details = task.result()
+                    merged['candidates'][template_id] = {
+                        'id': template_id,
+                        'name': details.get('name'),
+                        'variableCount': len(details['variables']) if details.get('variables') else 0
+                    }
+    finally:
+        # A required lookup failed - stop waiting on the rest
+        for task in pending:
+            task.cancel()
+
+    return merged
+
 @app.post("/browse-workflow", response_model=BrowseResponse)
 async def browse_workflow_endpoint(request: BrowseRequest):
     """Complete browse and select workflow"""
@@ -237,33 +797,29 @@ async def browse_workflow_endpoint(request: BrowseRequest):
         print('1. Browsing templates...')
         browse_result = browse_templates(request.limit, request.offset, request.query, request.showTags)
 
-        # Find a template (not a folder)
-        selected_template = None
-        for item in browse_result['results']:
-            if item.get('type') == 'template':
-                selected_template = item
-                break
+        # Find the top templates (not folders) - the first one is selected
+        candidates = [item for item in browse_result['results'] if item.get('type') == 'template'][:BROWSE_CANDIDATES]
 
-        if not selected_template:
+        if not candidates:
             raise HTTPException(
                 status_code=404,
                 detail="No templates found in browse results"
             )
 
+        selected_template = candidates[0]
         print(f"Selected template: {selected_template['name']} ({selected_template['id']})")
 
-        # Step 2: Get detailed template information
-        print('2. Getting template details...')
-        template_details = get_template_details(selected_template['id'])
-
-        # Step 3: Get PDF preview (optional)
-        print('3. Getting PDF preview...')
-        pdf_preview = get_template_pdf_preview(selected_template['id'])
+        # Steps 2 and 3: details, PDF preview and candidate details are fetched concurrently
+        print(f'2. Getting template details, PDF preview and {len(candidates) - 1} candidate details...')
+        lookups = await fan_out_template_lookups(candidates)
+        template_details = lookups['templateDetails']
+        pdf_preview = lookups['pdfPreview']
 
         result = {
             'selectedTemplate': selected_template,
             'templateDetails': template_details,
             'pdfPreview': pdf_preview,
+            'candidates': [lookups['candidates'][c['id']] for c in candidates[1:]],
             'summary': {
                 'templateId': template_details['id'],
                 'variableCount': len(template_details['variables']) if template_details.get('variables') else 0,
@@ -282,6 +838,67 @@ async def browse_workflow_endpoint(request: BrowseRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Browse workflow failed: {str(e)}")
 
+@app.post("/catalog/crawl", response_model=BrowseResponse)
+async def crawl_catalog_endpoint(includeVariables: bool = Query(True)):
+    """Crawl every folder and rebuild the local template catalog"""
+    try:
+        summary = await run_in_threadpool(refresh_local_index, includeVariables)
+
+        return BrowseResponse(
+            success=True,
+            message="Template catalog rebuilt",
+            data=summary
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Catalog crawl failed: {str(e)}")
+
+@app.get("/catalog", response_model=BrowseResponse)
+async def catalog_lookup_endpoint(
+    name: Optional[str] = Query(None),
+    tag: Optional[str] = Query(None)
+):
+    """Look templates up by name and/or tag in the local catalog (crawled on first use)"""
+    try:
+        if template_catalog.crawled_at is None:
+            await run_in_threadpool(refresh_local_index)
+
+        results = list(template_catalog.templates.values())
+        if name:
+            results = template_catalog.find_by_name(name)
+        if tag:
+            tagged = {t['id'] for t in template_catalog.find_by_tag(tag)}
+            results = [t for t in results if t['id'] in tagged]
+
+        return BrowseResponse(
+            success=True,
+            message=f"Found {len(results)} templates in local catalog",
+            data={
+                'results': results,
+                'totalRecords': len(results),
+                'crawledAt': template_catalog.crawled_at
+            }
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Catalog lookup failed: {str(e)}")
+
+@app.get("/template-cache/stats")
+async def template_cache_stats():
+    """Template cache hit/miss counters"""
+    with template_cache.lock:
+        return {
+            "entries": len(template_cache.entries),
+            "diskTier": bool(template_cache.cache_dir),
+            **template_cache.stats
+        }
+
+@app.delete("/template-cache/{template_id}")
+async def invalidate_template_cache(template_id: str):
+    """Drop a template's cached details and preview, e.g. after editing it"""
+    template_cache.invalidate(template_id)
+    return {"success": True, "templateId": template_id}
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -296,10 +913,14 @@ async def browse_info():
     return ServiceInfo(
         service="TurboDocx Template Browser Service",
         endpoints={
-            "GET /browse-templates": "Browse available templates with filtering",
+            "GET /browse-templates": "Browse available templates with filtering (local=true for in-process search)",
             "GET /template/{template_id}": "Get detailed template information",
             "GET /template/{template_id}/preview": "Get template PDF preview URL",
             "POST /browse-workflow": "Complete browse and select workflow",
+            "POST /catalog/crawl": "Crawl every folder into the local template catalog",
+            "GET /catalog": "Look up templates by name or tag in the local catalog",
+            "GET /template-cache/stats": "Template cache hit/miss counters",
+            "DELETE /template-cache/{template_id}": "Invalidate a cached template",
             "GET /health": "Service health check",
             "GET /browse-info": "Service information",
             "GET /docs": "Interactive API documentation",
@@ -378,6 +999,10 @@ if __name__ == '__main__':
         print(f'  GET  http://{host}:{port}/template/{{template_id}}')
         print(f'  GET  http://{host}:{port}/template/{{template_id}}/preview')
         print(f'  POST http://{host}:{port}/browse-workflow')
+        print(f'  POST http://{host}:{port}/catalog/crawl')
+        print(f'  GET  http://{host}:{port}/catalog')
+        print(f'  GET  http://{host}:{port}/template-cache/stats')
+        print(f'  DELETE http://{host}:{port}/template-cache/{{template_id}}')
         print(f'  GET  http://{host}:{port}/health')
         print(f'  GET  http://{host}:{port}/browse-info')
         print(f'  GET  http://{host}:{port}/docs (Interactive API docs)')
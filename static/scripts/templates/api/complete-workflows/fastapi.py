@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 
 import os
+import re
+import time
+import asyncio
+import threading
 import requests
 import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Awaitable, Callable, Tuple
+from requests.adapters import HTTPAdapter
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 import uvicorn
@@ -15,6 +21,24 @@ API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
+# Download settings
+DOWNLOAD_DIR = "./deliverables"     # Target directory for downloaded deliverables
+DOWNLOAD_CONCURRENCY = 8            # Files fetched in parallel
+DOWNLOAD_CHUNK_SIZE = 64 * 1024     # Bytes written per chunk
+DOWNLOAD_MAX_ATTEMPTS = 3           # Attempts per file; later attempts resume from the partial file
+DOWNLOAD_RETRY_DELAY = 1.0          # Seconds before retrying a 5xx response, doubled per attempt
+
+# Variable schema settings
+VARIABLE_INDEX_TTL = 300            # Seconds before a template's variable index is rebuilt
+STRICT_VARIABLES = False            # Also reject payloads that leave out placeholders the template uses
+
+# Browse workflow settings
+BROWSE_CANDIDATES = 3               # Top templates whose details are fetched alongside the selection
+
+# Workflow graph settings
+STEP_TIMEOUT = 120                  # Seconds a workflow step may run before it is abandoned
+REQUEST_TIMEOUT = (10, 60)          # (connect, read) seconds for each API call a step makes
+
 app = FastAPI(
     title="TurboDocx Complete Workflow Manager Service",
     description="FastAPI service demonstrating complete template workflows using TurboDocx API",
@@ -24,6 +48,19 @@ app = FastAPI(
 class UploadWorkflowRequest(BaseModel):
     templateFilePath: Optional[str] = "./contract-template.docx"
 
+class DownloadItem(BaseModel):
+    deliverableId: str
+    filename: Optional[str] = None
+
+class DownloadRequest(BaseModel):
+    deliverables: List[DownloadItem]
+
+class OnboardingRequest(BaseModel):
+    templateFilePaths: List[str]
+    templateNames: Optional[Dict[str, str]] = None
+    stepTimeout: Optional[float] = None
+    runId: Optional[str] = None
+
 class WorkflowResponse(BaseModel):
     success: bool
     message: str
@@ -40,6 +77,379 @@ class ServiceInfo(BaseModel):
     configuration: ConfigurationInfo
     description: str
 
+class DeliverableDownloadManager:
+    """
+    Parallel Deliverable Download Manager
+    Fetches many deliverable files on a thread pool and writes each one to a
+    .part file that is renamed into place only once its size matches the
+    server's Content-Length. An interrupted download keeps its .part file and
+    the next attempt resumes it with an HTTP Range request; a resume the
+    server cannot honour exactly discards the .part file and starts over.
+    Files already in the target directory are skipped, so a rerun only
+    fetches what is missing. Only one thread writes a given path at a time,
+    and duplicate filenames within one batch get a numeric suffix.
+    """
+
+    def __init__(self, api_token: str, org_id: str, base_url: str,
+                 target_dir: str = DOWNLOAD_DIR, concurrency: int = DOWNLOAD_CONCURRENCY):
+        self.base_url = base_url
+        self.target_dir = target_dir
+        self.concurrency = concurrency
+        self.path_locks: Dict[str, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+        # One pooled session shared by every worker thread
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency))
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_token}',
+            'x-rapiddocx-org-id': org_id,
+            'User-Agent': 'TurboDocx API Client',
+            # Ask for the raw bytes so Content-Length and Range offsets refer to the file itself
+            'Accept-Encoding': 'identity'
+        })
+
+    def _path_lock(self, path: str) -> threading.Lock:
+        with self.lock:
+            return self.path_locks.setdefault(path, threading.Lock())
+
+    def download(self, deliverable_id: str, filename: Optional[str] = None) -> dict:
+        filename = os.path.basename(filename or f'deliverable-{deliverable_id}.docx')
+        target_path = os.path.join(self.target_dir, filename)
+
+        # Two requests naming the same file must not append to one .part file
+        with self._path_lock(target_path):
+            return self._download(deliverable_id, filename, target_path)
+
+    def _download(self, deliverable_id: str, filename: str, target_path: str) -> dict:
+        part_path = f'{target_path}.part'
+        url = f"{self.base_url}/deliverable/file/{deliverable_id}"
+
+        result = {'deliverableId': deliverable_id, 'filename': filename, 'path': target_path}
+
+        if os.path.exists(target_path):
+            # Only complete files are ever renamed into place
+            return {**result, 'status': 'skipped', 'bytes': os.path.getsize(target_path)}
+
+        os.makedirs(self.target_dir, exist_ok=True)
+        resumed = False
+        error = None
+
+        for attempt in range(DOWNLOAD_MAX_ATTEMPTS):
+            offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {'Range': f'bytes={offset}-'} if offset else {}
+
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=(10, 60)) as response:
+                    if response.status_code == 416:
+                        # The partial file no longer lines up with the server copy - start over
+                        os.remove(part_path)
+                        continue
+                    if response.status_code >= 500:
+                        # Server-side failure - back off and try again, keeping the .part file
+                        error = requests.exceptions.HTTPError(f'{response.status_code} Server Error', response=response)
+                        time.sleep(DOWNLOAD_RETRY_DELAY * 2 ** attempt)
+                        continue
+                    response.raise_for_status()
+
+                    content_type = response.headers.get('Content-Type', 'N/A')
+                    content_length = response.headers.get('Content-Length')
+                    content_range = re.match(r'bytes (\d+)-\d+/(\d+)', response.headers.get('Content-Range', ''))
+
+                    if response.status_code == 206:
+                        if not (offset and content_range and int(content_range.group(1)) == offset):
+                            # A partial body we cannot place - discard the .part file and fetch it whole
+                            error = IOError(f'Unusable partial response (Content-Range: {response.headers.get("Content-Range")!r})')
+                            if os.path.exists(part_path):
+                                os.remove(part_path)
+                            continue
+                        mode = 'ab'
+                        expected_size = int(content_range.group(2))
+                        resumed = True
+                    else:
+                        # Range not supported (200) - rewrite the file from the start
+                        mode = 'wb'
+                        expected_size = int(content_length) if content_length and content_length.isdigit() else None
+
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+
+            except (requests.exceptions.ConnectionError,
+                    requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                # Keep the .part file so the next attempt can resume it
+                error = e
+                continue
+
+            size = os.path.getsize(part_path)
+            if expected_size is not None and size != expected_size:
+                error = IOError(f'Size mismatch: received {size} of {expected_size} bytes')
+                if size > expected_size:
+                    os.remove(part_path)
+                continue
+
+            os.replace(part_path, target_path)
+            return {
+                **result,
+                'status': 'downloaded',
+                'bytes': size,
+                'contentType': content_type,
+                'resumed': resumed,
+                'attempts': attempt + 1
+            }
+
+        raise IOError(f'Download of {deliverable_id} failed after {DOWNLOAD_MAX_ATTEMPTS} attempts: {error}')
+
+    def download_many(self, items: List[Dict[str, Optional[str]]]) -> dict:
+        """Download every {deliverableId, filename} item concurrently and summarise the run"""
+        started = time.monotonic()
+
+        # Give repeated filenames a numeric suffix so each deliverable keeps its own file
+        used = {}
+        named = []
+        for item in items:
+            filename = os.path.basename(item.get('filename') or f'deliverable-{item["deliverableId"]}.docx')
+            stem, ext = os.path.splitext(filename)
+            count = used.get(filename.casefold(), 0) + 1
+            used[filename.casefold()] = count
+            while count > 1 and used.get(f'{stem}-{count}{ext}'.casefold()):
+                count += 1
+            if count > 1:
+                filename = f'{stem}-{count}{ext}'
+                used[filename.casefold()] = 1
+            named.append({**item, 'filename': filename})
+
+        def download_one(item):
+            try:
+                return self.download(item['deliverableId'], item['filename'])
+            except Exception as e:
+                return {'deliverableId': item['deliverableId'], 'filename': item['filename'], 'status': 'failed', 'error': str(e)}
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(download_one, named))
+
+        elapsed = time.monotonic() - started
+        total_bytes = sum(r.get('bytes', 0) for r in results if r['status'] == 'downloaded')
+
+        return {
+            'results': results,
+            'summary': {
+                'total': len(results),
+                'downloaded': sum(1 for r in results if r['status'] == 'downloaded'),
+                'skipped': sum(1 for r in results if r['status'] == 'skipped'),
+                'failed': sum(1 for r in results if r['status'] == 'failed'),
+                'bytes': total_bytes,
+                'elapsedSeconds': round(elapsed, 2),
+                'megabytesPerSecond': round(total_bytes / elapsed / 1_000_000, 2) if elapsed else None
+            }
+        }
+
+# Download managers shared by every workflow manager in the process, one pooled session per account
+deliverable_downloaders: Dict[Tuple[str, str, str], DeliverableDownloadManager] = {}
+
+class DeliverableValidationError(ValueError):
+    """Raised when deliverable data does not match the template's variables"""
+
+    def __init__(self, template_id: str, errors: List[str]):
+        self.template_id = template_id
+        self.errors = errors
+        super().__init__(f'Deliverable data does not match template {template_id}: ' + '; '.join(errors))
+
+class TemplateVariableIndex:
+    """
+    Variable Schema Index
+    Placeholder -> allowed subvariable placeholders for one template, built
+    once from the template's variables. validate() checks a deliverable
+    payload against it with set lookups only, so a mismatched placeholder is
+    rejected locally instead of costing a server-side generation. A template
+    whose details list no variables gives nothing to check against, so
+    validation is skipped for it rather than rejecting every placeholder.
+    """
+
+    def __init__(self, template_id: str, variables: Optional[List[dict]]):
+        self.template_id = template_id
+        self.built_at = time.monotonic()
+        self.placeholders: Dict[str, set] = {}
+
+        for variable in variables or []:
+            placeholder = variable.get('placeholder')
+            if placeholder:
+                self.placeholders[placeholder] = {
+                    sub['placeholder'] for sub in variable.get('subvariables') or [] if sub.get('placeholder')
+                }
+
+    def validate(self, deliverable_data: dict, allow_missing: bool = False):
+        if not self.placeholders:
+            return
+
+        errors = []
+        seen = set()
+
+        for variable in deliverable_data.get('variables') or []:
+            placeholder = variable.get('placeholder')
+            if placeholder not in self.placeholders:
+                errors.append(f'unknown placeholder {placeholder!r}')
+                continue
+            if placeholder in seen:
+                errors.append(f'duplicate placeholder {placeholder!r}')
+            seen.add(placeholder)
+
+            # Subvariables are only checked when the template declares them
+            allowed = self.placeholders[placeholder]
+            if allowed:
+                for sub in variable.get('subvariables') or []:
+                    if sub.get('placeholder') not in allowed:
+                        errors.append(f'unknown subvariable {sub.get("placeholder")!r} for {placeholder!r}')
+
+        if not allow_missing:
+            # Placeholders the template uses but the payload leaves out would render blank
+            for placeholder in self.placeholders.keys() - seen:
+                errors.append(f'missing placeholder {placeholder!r}')
+
+        if errors:
+            raise DeliverableValidationError(self.template_id, errors)
+
+# Variable indexes shared by every workflow manager in the process
+variable_indexes: Dict[str, TemplateVariableIndex] = {}
+
+class WorkflowStep:
+    """One node of a workflow graph: an async callable and the steps it needs first"""
+
+    def __init__(self, name: str, run: Callable[[Dict[str, Any]], Awaitable[Any]],
+                 depends_on: Tuple[str, ...] = (), timeout: float = STEP_TIMEOUT, required: bool = True):
+        self.name = name
+        self.run = run
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        self.required = required
+
+class WorkflowGraph:
+    """
+    Pluggable Step Graph
+    Steps declare the steps they depend on and receive every finished
+    result. run() starts each step as soon as all of its dependencies have
+    succeeded, so independent paths run concurrently. Every step has its
+    own timeout and can be cancelled by name; a failed or abandoned step
+    only skips the steps downstream of it.
+
+    Steps make blocking API calls on worker threads, which cannot be
+    interrupted. A step that times out or is cancelled is abandoned: its
+    dependants never start, but a request it already sent keeps running
+    (bounded by REQUEST_TIMEOUT) and may still complete on the server.
+    """
+
+    def __init__(self):
+        self.steps: Dict[str, WorkflowStep] = {}
+        self.running: Dict[str, asyncio.Task] = {}
+        self.results: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {}
+        self.errors: Dict[str, str] = {}
+        self.exceptions: Dict[str, BaseException] = {}
+
+    def add(self, name: str, run: Callable[[Dict[str, Any]], Awaitable[Any]],
+            depends_on: Tuple[str, ...] = (), timeout: float = STEP_TIMEOUT,
+            required: bool = True) -> 'WorkflowGraph':
+        if name in self.steps:
+            raise ValueError(f'Duplicate workflow step: {name}')
+        self.steps[name] = WorkflowStep(name, run, depends_on, timeout, required)
+        return self
+
+    def cancel(self, name: str) -> bool:
+        """Abandon a running step; the steps that depend on it are skipped"""
+        task = self.running.get(name)
+        return task.cancel() if task else False
+
+    def failed_required(self) -> List[str]:
+        """Required steps that did not succeed"""
+        return [name for name, step in self.steps.items()
+                if step.required and self.status.get(name) != 'succeeded']
+
+    def snapshot(self) -> dict:
+        return {
+            'steps': {name: self.status.get(name, 'running' if name in self.running else 'pending')
+                      for name in self.steps},
+            'errors': dict(self.errors)
+        }
+
+    def _validate(self):
+        for step in self.steps.values():
+            for dependency in step.depends_on:
+                if dependency not in self.steps:
+                    raise ValueError(f'Step {step.name} depends on unknown step {dependency}')
+
+        # Kahn's algorithm - any step left unvisited is part of a cycle
+        indegree = {name: len(step.depends_on) for name, step in self.steps.items()}
+        ready = [name for name, degree in indegree.items() if degree == 0]
+        visited = 0
+        while ready:
+            current = ready.pop()
+            visited += 1
+            for step in self.steps.values():
+                if current in step.depends_on:
+                    indegree[step.name] -= 1
+                    if indegree[step.name] == 0:
+                        ready.append(step.name)
+        if visited != len(self.steps):
+            raise ValueError('Workflow graph contains a cycle')
+
+    async def run(self) -> dict:
+        self._validate()
+
+        results, status, errors = self.results, self.status, self.errors
+        waiting = dict(self.steps)
+        tasks: Dict[asyncio.Task, str] = {}
+
+        def start_ready_steps():
+            changed = True
+            while changed:
+                changed = False
+                for name, step in list(waiting.items()):
+                    if any(status.get(dep) not in (None, 'succeeded') for dep in step.depends_on):
+                        status[name] = 'skipped'
+                    elif all(status.get(dep) == 'succeeded' for dep in step.depends_on):
+                        task = asyncio.create_task(asyncio.wait_for(step.run(results), step.timeout))
+                        tasks[task] = name
+                        self.running[name] = task
+                    else:
+                        continue
+                    del waiting[name]
+                    changed = True
+
+        start_ready_steps()
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = tasks.pop(task)
+                    self.running.pop(name, None)
+
+                    if task.cancelled() or isinstance(task.exception(), asyncio.TimeoutError):
+                        reason = 'Cancelled' if task.cancelled() else f'Timed out after {self.steps[name].timeout}s'
+                        status[name] = 'abandoned'
+                        errors[name] = f'{reason} - a request already sent may still complete on the server'
+                    elif task.exception() is not None:
+                        status[name] = 'failed'
+                        errors[name] = str(task.exception())
+                        self.exceptions[name] = task.exception()
+                    else:
+                        status[name] = 'succeeded'
+                        results[name] = task.result()
+
+                    print(f'[{name}] {status[name]}')
+
+                start_ready_steps()
+        finally:
+            # The caller was cancelled - stop waiting on every step still in flight
+            for task in tasks:
+                task.cancel()
+            self.running.clear()
+
+        return {'results': results, 'status': status, 'errors': errors, 'failed': self.failed_required()}
+
+# Graphs currently running, by run ID, so a step can be cancelled while the request is in flight
+active_workflows: Dict[str, WorkflowGraph] = {}
+
 class TemplateWorkflowManager:
     """
     Complete Template Workflow Manager
@@ -50,35 +460,123 @@ class TemplateWorkflowManager:
         self.api_token = api_token
         self.org_id = org_id
         self.base_url = base_url
+        # Reuse the account's downloader - a manager is built per request, its session should not be
+        account = (api_token, org_id, base_url)
+        if account not in deliverable_downloaders:
+            deliverable_downloaders[account] = DeliverableDownloadManager(api_token, org_id, base_url)
+        self.downloader = deliverable_downloaders[account]
         print('=== TurboDocx Template Generation Workflow Manager ===')
 
-    async def demonstrate_complete_workflow(self) -> dict:
+    async def run_graph(self, graph: WorkflowGraph, run_id: Optional[str] = None) -> dict:
+        """Run a graph registered under run_id, so its steps can be cancelled by name meanwhile"""
+        run_id = run_id or str(uuid.uuid4())
+        if run_id in active_workflows:
+            raise ValueError(f'Workflow run {run_id} is already in progress')
+        active_workflows[run_id] = graph
+        try:
+            outcome = await graph.run()
+        finally:
+            active_workflows.pop(run_id, None)
+
+        # A payload that does not match its template is the caller's error, not a workflow failure
+        for error in graph.exceptions.values():
+            if isinstance(error, DeliverableValidationError):
+                raise error
+
+        return {**outcome, 'runId': run_id}
+
+    async def demonstrate_complete_workflow(self, run_id: Optional[str] = None) -> dict:
         print('\nSelect workflow path:')
         print('A) Upload new template')
         print('B) Browse and select existing template')
 
-        # For this example, we'll demonstrate both paths
-        print('\n=== Demonstrating Path A: Upload Template ===')
-        template_id_a = await self.demonstrate_upload_workflow()
-
-        print('\n=== Demonstrating Path B: Browse Templates ===')
-        template_id_b = await self.demonstrate_browse_workflow()
+        # For this example, we'll demonstrate both paths - they share nothing, so they run concurrently
+        print('\n=== Demonstrating Path A (Upload) and Path B (Browse) in parallel ===')
+        outcome = await self.run_graph(self.build_dual_path_graph(), run_id)
 
-        # Generate deliverables for both templates if successful
         results = {}
+        if 'generateA' in outcome['results']:
+            results['uploadPath'] = outcome['results']['generateA']
+        if 'generateB' in outcome['results']:
+            results['browsePath'] = outcome['results']['generateB']
 
-        if template_id_a:
-            print('\n=== Generating Deliverable from Uploaded Template ===')
-            results['uploadPath'] = await self.generate_and_download_deliverable(template_id_a, 'A')
+        return {
+            'runId': outcome['runId'],
+            'uploadedTemplateId': outcome['results'].get('uploadA'),
+            'selectedTemplateId': outcome['results'].get('browseB'),
+            'results': results,
+            'steps': outcome['status'],
+            'errors': outcome['errors'],
+            'failedSteps': outcome['failed']
+        }
 
-        if template_id_b:
-            print('\n=== Generating Deliverable from Selected Template ===')
-            results['browsePath'] = await self.generate_and_download_deliverable(template_id_b, 'B')
+    def build_dual_path_graph(self, step_timeout: float = STEP_TIMEOUT) -> WorkflowGraph:
+        """Path A (upload -> generate) and Path B (browse -> generate) as two independent branches"""
+        async def upload_path(results):
+            template_id = await self.demonstrate_upload_workflow()
+            if not template_id:
+                raise RuntimeError('Path A produced no template')
+            return template_id
+
+        async def browse_path(results):
+            template_id = await self.demonstrate_browse_workflow()
+            if not template_id:
+                raise RuntimeError('Path B produced no template')
+            return template_id
+
+        graph = WorkflowGraph()
+        graph.add('uploadA', upload_path, timeout=step_timeout)
+        graph.add('browseB', browse_path, timeout=step_timeout)
+        graph.add('generateA', lambda results: self.generate_and_download_deliverable(results['uploadA'], 'A'),
+                  ('uploadA',), step_timeout)
+        graph.add('generateB', lambda results: self.generate_and_download_deliverable(results['browseB'], 'B'),
+                  ('browseB',), step_timeout)
+        return graph
+
+    def build_onboarding_graph(self, template_file_paths: List[str], step_timeout: float = STEP_TIMEOUT,
+                               template_names: Optional[Dict[str, str]] = None) -> WorkflowGraph:
+        """One upload -> generate chain per template file, all chains running concurrently"""
+        graph = WorkflowGraph()
+        template_names = template_names or {}
+
+        for index, template_file_path in enumerate(template_file_paths, 1):
+            upload_step = f'upload{index}'
+
+            async def upload(results, template_file_path=template_file_path):
+                result = await self.upload_template(template_file_path, template_names.get(template_file_path))
+                return result['data']['results']['template']['id']
+
+            graph.add(upload_step, upload, timeout=step_timeout)
+            graph.add(f'generate{index}',
+                      lambda results, upload_step=upload_step, label=str(index):
+                          self.generate_and_download_deliverable(results[upload_step], label),
+                      (upload_step,), step_timeout)
+
+        return graph
+
+    async def onboard_templates(self, template_file_paths: List[str], step_timeout: float = STEP_TIMEOUT,
+                                template_names: Optional[Dict[str, str]] = None,
+                                run_id: Optional[str] = None) -> dict:
+        print(f'\n=== Onboarding {len(template_file_paths)} templates ===')
+        outcome = await self.run_graph(self.build_onboarding_graph(template_file_paths, step_timeout, template_names), run_id)
+
+        templates = []
+        for index, template_file_path in enumerate(template_file_paths, 1):
+            generated = outcome['results'].get(f'generate{index}')
+            templates.append({
+                'templateFilePath': template_file_path,
+                'templateId': outcome['results'].get(f'upload{index}'),
+                'deliverable': generated['deliverable'] if generated else None,
+                'uploadStatus': outcome['status'].get(f'upload{index}'),
+                'generateStatus': outcome['status'].get(f'generate{index}')
+            })
 
         return {
-            'uploadedTemplateId': template_id_a,
-            'selectedTemplateId': template_id_b,
-            'results': results
+            'runId': outcome['runId'],
+            'templates': templates,
+            'steps': outcome['status'],
+            'errors': outcome['errors'],
+            'failedSteps': outcome['failed']
         }
 
     async def demonstrate_upload_workflow(self) -> Optional[str]:
@@ -92,7 +590,7 @@ class TemplateWorkflowManager:
                 print('Creating a placeholder message for demonstration')
                 return None
 
-            result = await self.upload_template(template_file)
+            result = await self.upload_template(template_file, 'Employee Contract Template')
             template = result['data']['results']['template']
 
             print('✅ Upload workflow completed')
@@ -112,24 +610,37 @@ class TemplateWorkflowManager:
             # Browse templates
             browse_result = await self.browse_templates(10, 0, 'contract', True)
 
-            # Find first template (not folder)
-            selected_template = None
-            for item in browse_result['results']:
-                if item.get('type') == 'template':
-                    selected_template = item
-                    break
+            # Top templates (not folders) - the first one is selected
+            candidates = [item for item in browse_result['results'] if item.get('type') == 'template'][:BROWSE_CANDIDATES]
 
-            if not selected_template:
+            if not candidates:
                 print('⚠️  No templates found in browse results')
                 return None
 
+            selected_template = candidates[0]
             print(f'Selected: {selected_template["name"]}')
 
-            # Get detailed information
-            template_details = await self.get_template_details(selected_template['id'])
+            # Details, PDF preview and candidate details are independent, so fetch them all at once
+            details_task = asyncio.create_task(self.get_template_details(selected_template['id']))
+            preview_task = asyncio.create_task(self.get_template_pdf_preview(selected_template['id']))
+            candidate_tasks = {
+                asyncio.create_task(self.get_template_details(candidate['id'])): candidate
+                for candidate in candidates[1:]
+            }
+
+            try:
+                for task in asyncio.as_completed(candidate_tasks):
+                    try:
+                        details = await task
+                        variable_count = len(details['variables']) if details.get('variables') else 0
+                        print(f'Candidate: {details["name"]} ({variable_count} variables)')
+                    except Exception as e:
+                        print(f'⚠️  Candidate lookup failed: {str(e)}')
 
-            # Optionally get PDF preview
-            pdf_preview = await self.get_template_pdf_preview(selected_template['id'])
+                template_details, pdf_preview = await asyncio.gather(details_task, preview_task)
+            finally:
+                for task in (details_task, preview_task, *candidate_tasks):
+                    task.cancel()
 
             print('✅ Browse workflow completed')
             print(f'Template ID: {template_details["id"]}')
@@ -168,9 +679,12 @@ class TemplateWorkflowManager:
             print(f'❌ Deliverable generation failed for Path {path_label}: {str(e)}')
             raise
 
-    async def upload_template(self, template_file_path: str) -> dict:
+    async def upload_template(self, template_file_path: str, name: Optional[str] = None) -> dict:
         url = f"{self.base_url}/template/upload-and-create"
 
+        # Without an explicit name, "offer_letter-v2.docx" becomes "offer letter v2"
+        name = name or re.sub(r'[_-]+', ' ', os.path.splitext(os.path.basename(template_file_path))[0]).strip()
+
         with open(template_file_path, 'rb') as file:
             files = {
                 'templateFile': (os.path.basename(template_file_path), file,
@@ -178,7 +692,7 @@ class TemplateWorkflowManager:
             }
 
             data = {
-                'name': 'Employee Contract Template',
+                'name': name,
                 'description': 'Standard employee contract with variable placeholders',
                 'variables': '[]',
                 'tags': '["hr", "contract", "template"]'
@@ -190,7 +704,8 @@ class TemplateWorkflowManager:
                 'User-Agent': 'TurboDocx API Client'
             }
 
-            response = requests.post(url, files=files, data=data, headers=headers)
+            response = await asyncio.to_thread(requests.post, url, files=files, data=data, headers=headers,
+                                               timeout=REQUEST_TIMEOUT)
             response.raise_for_status()
             return response.json()
 
@@ -215,7 +730,7 @@ class TemplateWorkflowManager:
             'User-Agent': 'TurboDocx API Client'
         }
 
-        response = requests.get(url, headers=headers)
+        response = await asyncio.to_thread(requests.get, url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()['data']
 
@@ -228,7 +743,7 @@ class TemplateWorkflowManager:
             'User-Agent': 'TurboDocx API Client'
         }
 
-        response = requests.get(url, headers=headers)
+        response = await asyncio.to_thread(requests.get, url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()['data']['results']
 
@@ -241,13 +756,27 @@ class TemplateWorkflowManager:
             'User-Agent': 'TurboDocx API Client'
         }
 
-        response = requests.get(url, headers=headers)
+        response = await asyncio.to_thread(requests.get, url, headers=headers, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()['results']
 
-    async def generate_deliverable(self, template_id: str, deliverable_data: dict) -> dict:
+    async def get_variable_index(self, template_id: str) -> TemplateVariableIndex:
+        index = variable_indexes.get(template_id)
+        if index is None or time.monotonic() - index.built_at > VARIABLE_INDEX_TTL:
+            template = await self.get_template_details(template_id)
+            index = TemplateVariableIndex(template_id, template.get('variables'))
+            variable_indexes[template_id] = index
+        return index
+
+    async def generate_deliverable(self, template_id: str, deliverable_data: dict,
+                                   strict: Optional[bool] = None) -> dict:
         url = f"{self.base_url}/deliverable"
 
+        # Reject unknown placeholders and subvariables before spending a server generation;
+        # missing ones are only rejected in strict mode since templates may leave some optional
+        index = await self.get_variable_index(template_id)
+        index.validate(deliverable_data, allow_missing=not (STRICT_VARIABLES if strict is None else strict))
+
         print('Generating deliverable...')
         print(f'Template ID: {template_id}')
         print(f'Deliverable Name: {deliverable_data["name"]}')
@@ -260,7 +789,8 @@ class TemplateWorkflowManager:
             'Content-Type': 'application/json'
         }
 
-        response = requests.post(url, json=deliverable_data, headers=headers)
+        response = await asyncio.to_thread(requests.post, url, json=deliverable_data, headers=headers,
+                                           timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
         # Parse JSON response
@@ -278,36 +808,23 @@ class TemplateWorkflowManager:
     async def download_deliverable(self, deliverable_id: str, filename: str) -> dict:
         print(f'Downloading file: {filename}')
 
-        url = f"{self.base_url}/deliverable/file/{deliverable_id}"
-
-        headers = {
-            'Authorization': f'Bearer {self.api_token}',
-            'x-rapiddocx-org-id': self.org_id,
-            'User-Agent': 'TurboDocx API Client'
-        }
-
-        response = requests.get(url, headers=headers, stream=True)
-        response.raise_for_status()
-
-        print(f'✅ File ready for download: {filename}')
-
-        content_type = response.headers.get('Content-Type', 'N/A')
-        content_length = response.headers.get('Content-Length', 'N/A')
-
-        print(f'📁 Content-Type: {content_type}')
-        print(f'📊 Content-Length: {content_length} bytes')
+        # Blocking I/O runs on a worker thread so the event loop stays free
+        result = await asyncio.to_thread(self.downloader.download, deliverable_id, filename)
 
-        # In a real application, you would save the file
-        # with open(filename, 'wb') as f:
-        #     for chunk in response.iter_content(chunk_size=8192):
-        #         f.write(chunk)
+        print(f'✅ File saved: {result["path"]}')
+        print(f'📁 Content-Type: {result.get("contentType", "N/A")}')
+        print(f'📊 Size: {result["bytes"]} bytes')
 
         return {
-            'filename': filename,
-            'contentType': content_type,
-            'contentLength': content_length
+            'filename': result['filename'],
+            'path': result['path'],
+            'contentType': result.get('contentType', 'N/A'),
+            'contentLength': str(result['bytes'])
         }
 
+    async def download_deliverables(self, items: List[Dict[str, Optional[str]]]) -> dict:
+        return await asyncio.to_thread(self.downloader.download_many, items)
+
     def create_deliverable_data(self, template_id: str, path_label: str) -> dict:
         now = datetime.utcnow().isoformat() + 'Z'
 
@@ -386,23 +903,39 @@ class TemplateWorkflowManager:
 
 # FastAPI route handlers
 @app.post("/complete-workflow", response_model=WorkflowResponse)
-async def complete_workflow_endpoint():
+async def complete_workflow_endpoint(runId: Optional[str] = None):
     """Complete workflow demonstration endpoint"""
     try:
         print('Starting complete workflow demonstration...')
+        if runId in active_workflows:
+            raise HTTPException(status_code=409, detail=f"Workflow run {runId} is already in progress")
 
         workflow_manager = TemplateWorkflowManager(API_TOKEN, ORG_ID, BASE_URL)
-        result = await workflow_manager.demonstrate_complete_workflow()
-
-        return WorkflowResponse(
-            success=True,
-            message="Complete workflow demonstration finished",
-            data=result
-        )
+        result = await workflow_manager.demonstrate_complete_workflow(runId)
 
+    except HTTPException:
+        raise
+    except DeliverableValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": "Complete workflow failed: invalid deliverable data", "errors": e.errors})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Complete workflow failed: {str(e)}")
 
+    if result['failedSteps']:
+        raise HTTPException(
+            status_code=502,
+            detail={
+                "message": f"Complete workflow failed: {', '.join(result['failedSteps'])} did not succeed",
+                "steps": result['steps'],
+                "errors": result['errors']
+            }
+        )
+
+    return WorkflowResponse(
+        success=True,
+        message="Complete workflow demonstration finished",
+        data=result
+    )
+
 @app.post("/upload-workflow", response_model=WorkflowResponse)
 async def upload_workflow_endpoint(request: UploadWorkflowRequest):
     """Upload workflow endpoint"""
@@ -430,6 +963,8 @@ async def upload_workflow_endpoint(request: UploadWorkflowRequest):
 
     except HTTPException:
         raise
+    except DeliverableValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": "Upload workflow failed: invalid deliverable data", "errors": e.errors})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload workflow failed: {str(e)}")
 
@@ -460,9 +995,79 @@ async def browse_workflow_endpoint():
 
     except HTTPException:
         raise
+    except DeliverableValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": "Browse workflow failed: invalid deliverable data", "errors": e.errors})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Browse workflow failed: {str(e)}")
 
+@app.post("/onboard-templates", response_model=WorkflowResponse)
+async def onboard_templates_endpoint(request: OnboardingRequest):
+    """Upload several templates and generate a deliverable from each, concurrently"""
+    try:
+        if request.runId in active_workflows:
+            raise HTTPException(status_code=409, detail=f"Workflow run {request.runId} is already in progress")
+
+        workflow_manager = TemplateWorkflowManager(API_TOKEN, ORG_ID, BASE_URL)
+        result = await workflow_manager.onboard_templates(
+            request.templateFilePaths,
+            request.stepTimeout or STEP_TIMEOUT,
+            request.templateNames,
+            request.runId
+        )
+
+        return WorkflowResponse(
+            success=not result['failedSteps'],
+            message=f"Onboarded {sum(1 for t in result['templates'] if t['generateStatus'] == 'succeeded')} of {len(result['templates'])} templates",
+            data=result
+        )
+
+    except HTTPException:
+        raise
+    except DeliverableValidationError as e:
+        raise HTTPException(status_code=422, detail={"message": "Template onboarding failed: invalid deliverable data", "errors": e.errors})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Template onboarding failed: {str(e)}")
+
+@app.get("/workflows/{run_id}", response_model=WorkflowResponse)
+async def workflow_status_endpoint(run_id: str):
+    """Step status of a workflow run that is still in progress"""
+    graph = active_workflows.get(run_id)
+    if graph is None:
+        raise HTTPException(status_code=404, detail=f"No workflow run in progress with ID {run_id}")
+
+    return WorkflowResponse(success=True, message=f"Workflow run {run_id} in progress", data=graph.snapshot())
+
+@app.delete("/workflows/{run_id}/steps/{step_name}", response_model=WorkflowResponse)
+async def cancel_workflow_step_endpoint(run_id: str, step_name: str):
+    """Abandon a running step; steps that depend on it are skipped"""
+    graph = active_workflows.get(run_id)
+    if graph is None:
+        raise HTTPException(status_code=404, detail=f"No workflow run in progress with ID {run_id}")
+    if not graph.cancel(step_name):
+        raise HTTPException(status_code=409, detail=f"Step {step_name} is not running")
+
+    return WorkflowResponse(
+        success=True,
+        message=f"Step {step_name} abandoned - a request it already sent may still complete on the server",
+        data=graph.snapshot()
+    )
+
+@app.post("/download-deliverables", response_model=WorkflowResponse)
+async def download_deliverables_endpoint(request: DownloadRequest):
+    """Download many deliverables concurrently into DOWNLOAD_DIR"""
+    try:
+        workflow_manager = TemplateWorkflowManager(API_TOKEN, ORG_ID, BASE_URL)
+        result = await workflow_manager.download_deliverables([item.model_dump() for item in request.deliverables])
+
+        return WorkflowResponse(
+            success=result['summary']['failed'] == 0,
+            message=f"Downloaded {result['summary']['downloaded']} of {result['summary']['total']} deliverables",
+            data=result
+        )
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk download failed: {str(e)}")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -480,6 +1085,10 @@ async def workflow_info():
             "POST /complete-workflow": "Demonstrate both upload and browse workflows",
             "POST /upload-workflow": "Execute upload workflow only",
             "POST /browse-workflow": "Execute browse workflow only",
+            "POST /onboard-templates": "Upload and generate from several templates concurrently",
+            "POST /download-deliverables": "Download many deliverables concurrently with resume",
+            "GET /workflows/{run_id}": "Step status of a workflow run in progress",
+            "DELETE /workflows/{run_id}/steps/{step_name}": "Abandon a running workflow step",
             "GET /health": "Service health check",
             "GET /workflow-info": "Service information",
             "GET /docs": "Interactive API documentation",
@@ -531,6 +1140,10 @@ if __name__ == '__main__':
         print(f'  POST http://{host}:{port}/complete-workflow')
         print(f'  POST http://{host}:{port}/upload-workflow')
         print(f'  POST http://{host}:{port}/browse-workflow')
+        print(f'  POST http://{host}:{port}/onboard-templates')
+        print(f'  POST http://{host}:{port}/download-deliverables')
+        print(f'  GET  http://{host}:{port}/workflows/{{run_id}}')
+        print(f'  DELETE http://{host}:{port}/workflows/{{run_id}}/steps/{{step_name}}')
         print(f'  GET  http://{host}:{port}/health')
         print(f'  GET  http://{host}:{port}/workflow-info')
         print(f'  GET  http://{host}:{port}/docs (Interactive API docs)')
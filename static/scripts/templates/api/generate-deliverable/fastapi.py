@@ -1,11 +1,17 @@
 #!/usr/bin/env python3
 
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
 import requests
+from urllib3.exceptions import NewConnectionError
 import json
 import uuid
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterator
 from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 import uvicorn
@@ -16,6 +22,126 @@ API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
+# Download settings - files are streamed in fixed-size chunks, never held in memory whole
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Share one rate limiter with the other TurboDocx clients in this process when the
+# rate-limiting example is saved next to this script as turbodocx_rate_limit.py
+try:
+    from turbodocx_rate_limit import RateLimitedSession
+except ImportError:
+    RateLimitedSession = None
+
+api_session = RateLimitedSession() if RateLimitedSession else requests.Session()
+
+# Retry settings - by default only attempts the API never processed are retried
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5          # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0          # Upper bound for a computed backoff; Retry-After is always honoured in full
+REQUEST_TIMEOUT = (10, 120)     # (connect, read) seconds
+REJECTED_STATUS_CODES = {408, 425, 429}             # The API turned the request away without processing it
+if RateLimitedSession:
+    REJECTED_STATUS_CODES.discard(429)              # RateLimitedSession already waits out 429s - don't retry them twice
+AMBIGUOUS_STATUS_CODES = {500, 502, 503, 504}       # The request may or may not have been processed
+
+# A POST that timed out, lost its connection or got a 5xx may already have created
+# something. The Idempotency-Key header is sent on every attempt, but TurboDocx does not
+# document deduplicating on it - only enable this if your API deployment does
+RETRY_AMBIGUOUS_FAILURES = False
+
+AMBIGUOUS_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+# SSL, proxy and configuration errors will not fix themselves
+FATAL_EXCEPTIONS = (
+    requests.exceptions.SSLError,
+    requests.exceptions.ProxyError,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidHeader,
+    requests.exceptions.TooManyRedirects
+)
+
+def request_never_sent(error):
+    """True when the connection failed before any part of the request reached the API"""
+    if isinstance(error, FATAL_EXCEPTIONS):
+        return False
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def is_retryable(error=None, response=None):
+    """Classify a failed attempt as safe to retry or final"""
+    if error is not None:
+        if request_never_sent(error):
+            return True
+        return RETRY_AMBIGUOUS_FAILURES and isinstance(error, AMBIGUOUS_EXCEPTIONS) and not isinstance(error, FATAL_EXCEPTIONS)
+    if response is None:
+        return False
+    return response.status_code in REJECTED_STATUS_CODES or (
+        RETRY_AMBIGUOUS_FAILURES and response.status_code in AMBIGUOUS_STATUS_CODES
+    )
+
+def new_idempotency_key():
+    """One key per logical operation - its retries reuse it, a deliberate repeat gets a fresh one"""
+    return str(uuid.uuid4())
+
+def parse_retry_after(value):
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, response=None):
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+def post_with_retry(url, idempotency_key, headers, files=None, **kwargs):
+    """
+    POST with retries. Attempts the API never processed (connection refused,
+    408/425, and 429 unless RateLimitedSession already waited it out) are
+    retried; timeouts and 5xx only when
+    RETRY_AMBIGUOUS_FAILURES is set. Every attempt carries the same
+    Idempotency-Key header. Returns the last response; raises request errors
+    that are not retried.
+    """
+    headers = {**headers, 'Idempotency-Key': idempotency_key}
+
+    for attempt in range(MAX_RETRIES + 1):
+        # Rewind file uploads so every attempt sends the whole file
+        for value in (files or {}).values():
+            handle = value[1] if isinstance(value, tuple) else value
+            if hasattr(handle, 'seek'):
+                handle.seek(0)
+
+        try:
+            response = api_session.post(url, headers=headers, files=files, timeout=REQUEST_TIMEOUT, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if not is_retryable(error=e) or attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+        else:
+            if not is_retryable(response=response) or attempt == MAX_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f'⚠️  HTTP {response.status_code} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+            response.close()
+
+        time.sleep(delay)
+
 app = FastAPI(
     title="TurboDocx Deliverable Generator Service",
     description="FastAPI service for generating deliverables from templates using TurboDocx API",
@@ -84,7 +210,7 @@ class ServiceInfo(BaseModel):
     endpoints: dict
     configuration: ConfigurationInfo
 
-def generate_deliverable(template_id: str, deliverable_data: dict) -> dict:
+def generate_deliverable(template_id: str, deliverable_data: dict, idempotency_key: Optional[str] = None) -> dict:
     """
     Final Step: Generate Deliverable (Both Paths Converge Here)
     Generate a deliverable document from template with variable substitution
@@ -104,7 +230,9 @@ def generate_deliverable(template_id: str, deliverable_data: dict) -> dict:
     }
 
     try:
-        response = requests.post(url, json=deliverable_data, headers=headers)
+        # A fresh key per call: its retries share it, but generating the same data twice is two deliverables
+        key = idempotency_key or new_idempotency_key()
+        response = post_with_retry(url, key, headers, json=deliverable_data)
         response.raise_for_status()
 
         # Parse JSON response
@@ -130,8 +258,41 @@ def generate_deliverable(template_id: str, deliverable_data: dict) -> dict:
         print(error_msg)
         raise
 
-def download_deliverable(deliverable_id: str, filename: str) -> dict:
-    """Download the generated deliverable file"""
+def iter_download(response: requests.Response) -> Iterator[bytes]:
+    """Yield the file in DOWNLOAD_CHUNK_SIZE pieces and release the connection afterwards"""
+    try:
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            if chunk:
+                yield chunk
+    finally:
+        response.close()
+
+def save_download(response: requests.Response, save_path: str, expected_length: Optional[int] = None) -> int:
+    """Write the file to disk one chunk at a time so memory stays flat regardless of file size"""
+    temp_path = f'{save_path}.part'
+    written = 0
+    try:
+        with open(temp_path, 'wb') as f:
+            for chunk in iter_download(response):
+                f.write(chunk)
+                written += len(chunk)
+
+        if expected_length is not None and written != expected_length:
+            raise IOError(f'Incomplete download: received {written} of {expected_length} bytes')
+
+        # Only a complete file ever appears under the final name
+        os.replace(temp_path, save_path)
+        return written
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def download_deliverable(deliverable_id: str, filename: str, save_path: Optional[str] = None) -> dict:
+    """
+    Download the generated deliverable file
+    Returns a chunk iterator for streaming, or writes the file to save_path
+    """
     print(f'Downloading file: {filename}')
 
     url = f"{BASE_URL}/v1/deliverable/file/{deliverable_id}"
@@ -143,23 +304,35 @@ def download_deliverable(deliverable_id: str, filename: str) -> dict:
     }
 
     try:
-        response = requests.get(url, headers=headers, stream=True)
+        response = api_session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
         print(f'✅ File ready for download: {filename}')
 
         content_type = response.headers.get('Content-Type', 'N/A')
-        content_length = response.headers.get('Content-Length', 'N/A')
+        # iter_content decompresses, so a compressed Content-Length would not match what is streamed
+        content_length = 'N/A' if response.headers.get('Content-Encoding') else response.headers.get('Content-Length', 'N/A')
 
         print(f'📁 Content-Type: {content_type}')
         print(f'📊 Content-Length: {content_length} bytes')
 
-        # Return response object for streaming
+        if save_path:
+            expected_length = int(content_length) if content_length.isdigit() else None
+            size = save_download(response, save_path, expected_length)
+            print(f'💾 Saved {size} bytes to {save_path}')
+
+            return {
+                'filename': filename,
+                'contentType': content_type,
+                'contentLength': str(size),
+                'savedTo': save_path
+            }
+
         return {
             'filename': filename,
             'contentType': content_type,
             'contentLength': content_length,
-            'response': response
+            'downloadStream': iter_download(response)
         }
 
     except requests.exceptions.RequestException as e:
@@ -365,12 +538,8 @@ async def download_deliverable_endpoint(deliverable_id: str, filename: Optional[
         if not filename:
             filename = f'deliverable-{deliverable_id}.docx'
 
-        download_info = download_deliverable(deliverable_id, filename)
-
-        # Create streaming response
-        def generate_file_stream():
-            for chunk in download_info['response'].iter_content(chunk_size=8192):
-                yield chunk
+        # Open the upstream stream off the event loop - requests is blocking
+        download_info = await run_in_threadpool(download_deliverable, deliverable_id, filename)
 
         headers = {
             'Content-Disposition': f'attachment; filename="{filename}"'
@@ -379,8 +548,9 @@ async def download_deliverable_endpoint(deliverable_id: str, filename: Optional[
         if download_info['contentLength'] and download_info['contentLength'] != 'N/A':
             headers['Content-Length'] = download_info['contentLength']
 
+        # Upstream chunks are passed straight through, the file is never buffered in this process
         return StreamingResponse(
-            generate_file_stream(),
+            download_info['downloadStream'],
             media_type=download_info['contentType'],
             headers=headers
         )
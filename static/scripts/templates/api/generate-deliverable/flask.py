@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from email.utils import parsedate_to_datetime
 import requests
+from urllib3.exceptions import NewConnectionError
 import json
 import uuid
-from datetime import datetime
-from flask import Flask, request, jsonify, Response
+from datetime import datetime, timezone
+from flask import Flask, request, jsonify, Response, stream_with_context
 import io
 
 # Configuration - Update these values
@@ -12,9 +19,133 @@ API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
+# Download settings - files are streamed in fixed-size chunks, never held in memory whole
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Bulk generation settings
+GENERATION_CONCURRENCY = 8          # Parallel /v1/deliverable calls by default
+MAX_GENERATION_CONCURRENCY = 32     # Upper bound a caller may request
+
+# Share one rate limiter with the other TurboDocx clients in this process when the
+# rate-limiting example is saved next to this script as turbodocx_rate_limit.py
+try:
+    from turbodocx_rate_limit import RateLimitedSession
+except ImportError:
+    RateLimitedSession = None
+
+api_session = RateLimitedSession() if RateLimitedSession else requests.Session()
+
+# Retry settings - by default only attempts the API never processed are retried
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5          # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0          # Upper bound for a computed backoff; Retry-After is always honoured in full
+REQUEST_TIMEOUT = (10, 120)     # (connect, read) seconds
+REJECTED_STATUS_CODES = {408, 425, 429}             # The API turned the request away without processing it
+if RateLimitedSession:
+    REJECTED_STATUS_CODES.discard(429)              # RateLimitedSession already waits out 429s - don't retry them twice
+AMBIGUOUS_STATUS_CODES = {500, 502, 503, 504}       # The request may or may not have been processed
+
+# A POST that timed out, lost its connection or got a 5xx may already have created
+# something. The Idempotency-Key header is sent on every attempt, but TurboDocx does not
+# document deduplicating on it - only enable this if your API deployment does
+RETRY_AMBIGUOUS_FAILURES = False
+
+AMBIGUOUS_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+# SSL, proxy and configuration errors will not fix themselves
+FATAL_EXCEPTIONS = (
+    requests.exceptions.SSLError,
+    requests.exceptions.ProxyError,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidHeader,
+    requests.exceptions.TooManyRedirects
+)
+
+def request_never_sent(error):
+    """True when the connection failed before any part of the request reached the API"""
+    if isinstance(error, FATAL_EXCEPTIONS):
+        return False
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def is_retryable(error=None, response=None):
+    """Classify a failed attempt as safe to retry or final"""
+    if error is not None:
+        if request_never_sent(error):
+            return True
+        return RETRY_AMBIGUOUS_FAILURES and isinstance(error, AMBIGUOUS_EXCEPTIONS) and not isinstance(error, FATAL_EXCEPTIONS)
+    if response is None:
+        return False
+    return response.status_code in REJECTED_STATUS_CODES or (
+        RETRY_AMBIGUOUS_FAILURES and response.status_code in AMBIGUOUS_STATUS_CODES
+    )
+
+def new_idempotency_key():
+    """One key per logical operation - its retries reuse it, a deliberate repeat gets a fresh one"""
+    return str(uuid.uuid4())
+
+def parse_retry_after(value):
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, response=None):
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+def post_with_retry(url, idempotency_key, headers, files=None, **kwargs):
+    """
+    POST with retries. Attempts the API never processed (connection refused,
+    408/425, and 429 unless RateLimitedSession already waited it out) are
+    retried; timeouts and 5xx only when
+    RETRY_AMBIGUOUS_FAILURES is set. Every attempt carries the same
+    Idempotency-Key header. Returns the last response; raises request errors
+    that are not retried.
+    """
+    headers = {**headers, 'Idempotency-Key': idempotency_key}
+
+    for attempt in range(MAX_RETRIES + 1):
+        # Rewind file uploads so every attempt sends the whole file
+        for value in (files or {}).values():
+            handle = value[1] if isinstance(value, tuple) else value
+            if hasattr(handle, 'seek'):
+                handle.seek(0)
+
+        try:
+            response = api_session.post(url, headers=headers, files=files, timeout=REQUEST_TIMEOUT, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if not is_retryable(error=e) or attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+        else:
+            if not is_retryable(response=response) or attempt == MAX_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f'⚠️  HTTP {response.status_code} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+            response.close()
+
+        time.sleep(delay)
+
 app = Flask(__name__)
 
-def generate_deliverable(template_id, deliverable_data):
+def generate_deliverable(template_id, deliverable_data, idempotency_key=None):
     """
     Final Step: Generate Deliverable (Both Paths Converge Here)
     Generate a deliverable document from template with variable substitution
@@ -34,7 +165,9 @@ def generate_deliverable(template_id, deliverable_data):
     }
 
     try:
-        response = requests.post(url, json=deliverable_data, headers=headers)
+        # A fresh key per call: its retries share it, but generating the same data twice is two deliverables
+        key = idempotency_key or new_idempotency_key()
+        response = post_with_retry(url, key, headers, json=deliverable_data)
         response.raise_for_status()
 
         # Parse JSON response
@@ -60,8 +193,41 @@ def generate_deliverable(template_id, deliverable_data):
         print(error_msg)
         raise
 
-def download_deliverable(deliverable_id, filename):
-    """Download the generated deliverable file"""
+def iter_download(response):
+    """Yield the file in DOWNLOAD_CHUNK_SIZE pieces and release the connection afterwards"""
+    try:
+        for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+            if chunk:
+                yield chunk
+    finally:
+        response.close()
+
+def save_download(response, save_path, expected_length=None):
+    """Write the file to disk one chunk at a time so memory stays flat regardless of file size"""
+    temp_path = f'{save_path}.part'
+    written = 0
+    try:
+        with open(temp_path, 'wb') as f:
+            for chunk in iter_download(response):
+                f.write(chunk)
+                written += len(chunk)
+
+        if expected_length is not None and written != expected_length:
+            raise IOError(f'Incomplete download: received {written} of {expected_length} bytes')
+
+        # Only a complete file ever appears under the final name
+        os.replace(temp_path, save_path)
+        return written
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def download_deliverable(deliverable_id, filename, save_path=None):
+    """
+    Download the generated deliverable file
+    Returns a chunk iterator for streaming, or writes the file to save_path
+    """
     print(f'Downloading file: {filename}')
 
     url = f"{BASE_URL}/v1/deliverable/file/{deliverable_id}"
@@ -73,27 +239,35 @@ def download_deliverable(deliverable_id, filename):
     }
 
     try:
-        response = requests.get(url, headers=headers, stream=True)
+        response = api_session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
 
         print(f'✅ File ready for download: {filename}')
 
         content_type = response.headers.get('Content-Type', 'N/A')
-        content_length = response.headers.get('Content-Length', 'N/A')
+        # iter_content decompresses, so a compressed Content-Length would not match what is streamed
+        content_length = 'N/A' if response.headers.get('Content-Encoding') else response.headers.get('Content-Length', 'N/A')
 
         print(f'📁 Content-Type: {content_type}')
         print(f'📊 Content-Length: {content_length} bytes')
 
-        # In a real application, you would save the file
-        # with open(filename, 'wb') as f:
-        #     for chunk in response.iter_content(chunk_size=8192):
-        #         f.write(chunk)
+        if save_path:
+            expected_length = int(content_length) if content_length.isdigit() else None
+            size = save_download(response, save_path, expected_length)
+            print(f'💾 Saved {size} bytes to {save_path}')
+
+            return {
+                'filename': filename,
+                'contentType': content_type,
+                'contentLength': str(size),
+                'savedTo': save_path
+            }
 
         return {
             'filename': filename,
             'contentType': content_type,
             'contentLength': content_length,
-            'downloadStream': response.content
+            'downloadStream': iter_download(response)
         }
 
     except requests.exceptions.RequestException as e:
@@ -270,6 +444,110 @@ def create_deliverable_data(template_id):
         }
     }
 
+class GenerationStats:
+    """Thread-safe counters and latencies for a bulk generation run"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.latencies = []
+        self.succeeded = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+
+    def record(self, latency, success):
+        with self.lock:
+            self.latencies.append(latency)
+            if success:
+                self.succeeded += 1
+            else:
+                self.failed += 1
+
+    def summary(self):
+        with self.lock:
+            latencies = sorted(self.latencies)
+            succeeded, failed = self.succeeded, self.failed
+        elapsed = time.monotonic() - self.started
+
+        def percentile(p):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+
+        return {
+            'total': succeeded + failed,
+            'succeeded': succeeded,
+            'failed': failed,
+            'elapsedSeconds': round(elapsed, 2),
+            'deliverablesPerSecond': round((succeeded + failed) / elapsed, 2) if elapsed else None,
+            'latencyMs': {
+                'avg': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+                'p50': percentile(0.50),
+                'p95': percentile(0.95),
+                'p99': percentile(0.99),
+                'max': round(latencies[-1] * 1000, 1) if latencies else None
+            }
+        }
+
+def generate_deliverables(deliverables, concurrency=GENERATION_CONCURRENCY, stats=None):
+    """
+    Bulk Generation: run many deliverables through a bounded thread pool
+    Accepts any iterable of deliverable_data dicts (each carrying its templateId)
+    and yields one result per deliverable as soon as it finishes. Only
+    concurrency * 2 items are read ahead, so a generator of 30k letters is never
+    held in memory at once.
+    """
+    stats = stats if stats is not None else GenerationStats()
+    source = enumerate(deliverables)
+
+    def timed_generate(deliverable_data):
+        started = time.monotonic()
+        try:
+            deliverable = generate_deliverable(deliverable_data['templateId'], deliverable_data)
+            return deliverable, None, time.monotonic() - started
+        except Exception as e:
+            return None, e, time.monotonic() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+
+        def submit_next():
+            for index, deliverable_data in source:
+                pending[executor.submit(timed_generate, deliverable_data)] = (index, deliverable_data)
+                return True
+            return False
+
+        for _ in range(concurrency * 2):
+            if not submit_next():
+                break
+
+        try:
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, deliverable_data = pending.pop(future)
+                    deliverable, error, latency = future.result()
+                    stats.record(latency, error is None)
+                    submit_next()
+
+                    result = {
+                        'index': index,
+                        'name': deliverable_data.get('name'),
+                        'success': error is None,
+                        'latencyMs': round(latency * 1000, 1)
+                    }
+                    if error is None:
+                        result['deliverableId'] = deliverable['id']
+                    else:
+                        result['error'] = str(error)
+                        response = getattr(error, 'response', None)
+                        if response is not None:
+                            result['statusCode'] = response.status_code
+                    yield result
+        finally:
+            # Stop queued work if the caller stops consuming results early
+            for future in pending:
+                future.cancel()
+
 # Flask route handlers
 @app.route('/generate-deliverable', methods=['POST'])
 def generate_deliverable_endpoint():
@@ -304,6 +582,32 @@ def generate_deliverable_endpoint():
             'message': str(e)
         }), 500
 
+@app.route('/generate-deliverables', methods=['POST'])
+def generate_deliverables_endpoint():
+    """Bulk generation endpoint - streams one NDJSON line per deliverable, then a summary line"""
+    data = request.get_json()
+
+    if not data or not isinstance(data.get('deliverables'), list):
+        return jsonify({
+            'error': 'deliverables must be a list of deliverable data objects'
+        }), 400
+
+    try:
+        concurrency = int(data.get('concurrency', GENERATION_CONCURRENCY))
+    except (TypeError, ValueError):
+        return jsonify({
+            'error': 'concurrency must be an integer'
+        }), 400
+    concurrency = max(1, min(concurrency, MAX_GENERATION_CONCURRENCY))
+
+    def stream():
+        stats = GenerationStats()
+        for result in generate_deliverables(data['deliverables'], concurrency, stats):
+            yield json.dumps(result) + '\n'
+        yield json.dumps({'summary': stats.summary()}) + '\n'
+
+    return Response(stream_with_context(stream()), mimetype='application/x-ndjson')
+
 @app.route('/download-deliverable/<deliverable_id>', methods=['GET'])
 def download_deliverable_endpoint(deliverable_id):
     """Download deliverable endpoint"""
@@ -312,10 +616,11 @@ def download_deliverable_endpoint(deliverable_id):
 
         download_info = download_deliverable(deliverable_id, filename)
 
-        # Create response with file stream
+        # Pass upstream chunks straight through - the file is never buffered in this process
         response = Response(
             download_info['downloadStream'],
-            mimetype=download_info['contentType']
+            mimetype=download_info['contentType'],
+            direct_passthrough=True
         )
         response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
 
@@ -398,6 +703,7 @@ def generator_info():
         'service': 'TurboDocx Deliverable Generator Service',
         'endpoints': {
             'POST /generate-deliverable': 'Generate a deliverable from template',
+            'POST /generate-deliverables': 'Generate many deliverables concurrently (NDJSON stream)',
             'GET /download-deliverable/<deliverable_id>': 'Download generated deliverable file',
             'POST /complete-workflow': 'Complete generation and download workflow',
             'GET /health': 'Service health check',
@@ -423,7 +729,8 @@ def demonstrate_generation():
 
         # Download the generated file
         print('\n=== Download Generated File ===')
-        download_info = download_deliverable(deliverable['id'], f"{deliverable['name']}.docx")
+        filename = f"{deliverable['name']}.docx"
+        download_info = download_deliverable(deliverable['id'], filename, save_path=filename)
 
         print('\n=== Generation Complete ===')
         print('Deliverable generated and download info retrieved successfully')
@@ -453,6 +760,7 @@ if __name__ == '__main__':
         print(f'📡 Server listening on http://{host}:{port}')
         print('\nAvailable endpoints:')
         print(f'  POST http://{host}:{port}/generate-deliverable')
+        print(f'  POST http://{host}:{port}/generate-deliverables')
         print(f'  GET  http://{host}:{port}/download-deliverable/<deliverable_id>')
         print(f'  POST http://{host}:{port}/complete-workflow')
         print(f'  GET  http://{host}:{port}/health')
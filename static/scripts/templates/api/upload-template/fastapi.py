@@ -1,11 +1,24 @@
 #!/usr/bin/env python3
 
 import os
+import re
+import mmap
+import threading
+import uuid
+import shutil
+import hashlib
+import random
+import time
+from email.utils import parsedate_to_datetime
 import requests
+from urllib3.exceptions import NewConnectionError
 import json
 import tempfile
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, Callable, List
 from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import uvicorn
 
@@ -15,6 +28,214 @@ ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 TEMPLATE_NAME = "Employee Contract Template"
 
+# Streaming upload settings - large files are sent from a memory map instead of being read whole.
+# There is no resume: a connection dropped mid-upload fails the upload unless
+# RETRY_AMBIGUOUS_FAILURES (below) is enabled, and a retry resends the whole file
+STREAMING_UPLOAD_THRESHOLD = 8 * 1024 * 1024    # Files at least this large use the streaming upload
+UPLOAD_CHUNK_SIZE = 1024 * 1024                 # Bytes handed to the socket per write
+
+# Directory import settings
+IMPORT_CONCURRENCY = 4                          # Templates uploaded in parallel
+IMPORT_MANIFEST = ".turbodocx-import.json"      # Content-hash manifest kept in the imported directory
+TEMPLATE_CONTENT_TYPES = {
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    '.pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+}
+TEMPLATE_EXTENSIONS = tuple(TEMPLATE_CONTENT_TYPES)
+
+# Share one rate limiter with the other TurboDocx clients in this process when the
+# rate-limiting example is saved next to this script as turbodocx_rate_limit.py
+try:
+    from turbodocx_rate_limit import RateLimitedSession
+except ImportError:
+    RateLimitedSession = None
+
+api_session = RateLimitedSession() if RateLimitedSession else requests.Session()
+
+# Retry settings - by default only attempts the API never processed are retried
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5          # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0          # Upper bound for a computed backoff; Retry-After is always honoured in full
+REQUEST_TIMEOUT = (10, 120)     # (connect, read) seconds
+REJECTED_STATUS_CODES = {408, 425, 429}             # The API turned the request away without processing it
+if RateLimitedSession:
+    REJECTED_STATUS_CODES.discard(429)              # RateLimitedSession already waits out 429s - don't retry them twice
+AMBIGUOUS_STATUS_CODES = {500, 502, 503, 504}       # The request may or may not have been processed
+
+# A POST that timed out, lost its connection or got a 5xx may already have created
+# something. The Idempotency-Key header is sent on every attempt, but TurboDocx does not
+# document deduplicating on it - only enable this if your API deployment does
+RETRY_AMBIGUOUS_FAILURES = False
+
+AMBIGUOUS_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+# SSL, proxy and configuration errors will not fix themselves
+FATAL_EXCEPTIONS = (
+    requests.exceptions.SSLError,
+    requests.exceptions.ProxyError,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidHeader,
+    requests.exceptions.TooManyRedirects
+)
+
+def request_never_sent(error):
+    """True when the connection failed before any part of the request reached the API"""
+    if isinstance(error, FATAL_EXCEPTIONS):
+        return False
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def is_retryable(error=None, response=None):
+    """Classify a failed attempt as safe to retry or final"""
+    if error is not None:
+        if request_never_sent(error):
+            return True
+        return RETRY_AMBIGUOUS_FAILURES and isinstance(error, AMBIGUOUS_EXCEPTIONS) and not isinstance(error, FATAL_EXCEPTIONS)
+    if response is None:
+        return False
+    return response.status_code in REJECTED_STATUS_CODES or (
+        RETRY_AMBIGUOUS_FAILURES and response.status_code in AMBIGUOUS_STATUS_CODES
+    )
+
+def new_idempotency_key():
+    """One key per logical operation - its retries reuse it, a deliberate repeat gets a fresh one"""
+    return str(uuid.uuid4())
+
+def parse_retry_after(value):
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, response=None):
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+def post_with_retry(url, idempotency_key, headers, files=None, **kwargs):
+    """
+    POST with retries. Attempts the API never processed (connection refused,
+    408/425, and 429 unless RateLimitedSession already waited it out) are
+    retried; timeouts and 5xx only when
+    RETRY_AMBIGUOUS_FAILURES is set. Every attempt carries the same
+    Idempotency-Key header. Returns the last response; raises request errors
+    that are not retried.
+    """
+    headers = {**headers, 'Idempotency-Key': idempotency_key}
+
+    for attempt in range(MAX_RETRIES + 1):
+        # Rewind file uploads so every attempt sends the whole file
+        for value in (files or {}).values():
+            handle = value[1] if isinstance(value, tuple) else value
+            if hasattr(handle, 'seek'):
+                handle.seek(0)
+
+        try:
+            response = api_session.post(url, headers=headers, files=files, timeout=REQUEST_TIMEOUT, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if not is_retryable(error=e) or attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+        else:
+            if not is_retryable(response=response) or attempt == MAX_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f'⚠️  HTTP {response.status_code} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+            response.close()
+
+        time.sleep(delay)
+
+def quote_form_value(value: str) -> str:
+    """Percent-encode quotes and line breaks in a Content-Disposition name or filename (RFC 7578)"""
+    return value.replace('"', '%22').replace('\r', '%0D').replace('\n', '%0A')
+
+class MmapMultipartBody:
+    """
+    multipart/form-data body that streams the template from a memory map.
+    Iterating yields the encoded form fields, then UPLOAD_CHUNK_SIZE slices of
+    the mapped file, then the closing boundary, so at most one chunk is held
+    in memory. len() is exact, so requests sends a Content-Length instead of
+    chunked encoding. Each iteration is a fresh pass over the file, so when
+    post_with_retry does retry it resends from the start without reopening
+    anything - but a connection reset mid-body is only retried with
+    RETRY_AMBIGUOUS_FAILURES, so by default an interrupted upload fails.
+    """
+
+    def __init__(self, path: str, fields: dict, file_field: str, content_type: str,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.file = open(path, 'rb')
+        self.size = os.fstat(self.file.fileno()).st_size
+        # mmap cannot map an empty file
+        self.mapped = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.progress = progress
+        self.attempt = 0
+
+        boundary = uuid.uuid4().hex
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+
+        parts = []
+        for name, value in fields.items():
+            parts.append(
+                f'--{boundary}\r\n'
+                f'Content-Disposition: form-data; name="{quote_form_value(name)}"\r\n\r\n'
+                f'{value}\r\n'
+            )
+        parts.append(
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{quote_form_value(file_field)}"; '
+            f'filename="{quote_form_value(os.path.basename(path))}"\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        )
+        self.head = ''.join(parts).encode('utf-8')
+        self.tail = f'\r\n--{boundary}--\r\n'.encode('utf-8')
+
+    def __len__(self) -> int:
+        return len(self.head) + self.size + len(self.tail)
+
+    def __iter__(self):
+        self.attempt += 1
+        if self.attempt > 1:
+            print(f'↻ Attempt {self.attempt}: resending {self.size} bytes from the start')
+
+        yield self.head
+        for offset in range(0, self.size, UPLOAD_CHUNK_SIZE):
+            yield self.mapped[offset:offset + UPLOAD_CHUNK_SIZE]
+            if self.progress:
+                self.progress(min(offset + UPLOAD_CHUNK_SIZE, self.size), self.size)
+        yield self.tail
+
+    def close(self):
+        if self.mapped is not None:
+            self.mapped.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def print_progress(sent: int, total: int):
+    """Default progress reporter - one line per 10% of the file"""
+    step = max(total // 10, 1)
+    if sent == total or sent // step != (sent - min(UPLOAD_CHUNK_SIZE, sent)) // step:
+        print(f'📤 Uploaded {sent * 100 // total}% ({sent}/{total} bytes)')
+
 app = FastAPI(
     title="TurboDocx Template Upload Service",
     description="FastAPI service for uploading templates to TurboDocx API",
@@ -24,6 +245,11 @@ app = FastAPI(
 class UploadRequest(BaseModel):
     templateFilePath: str
 
+class ImportRequest(BaseModel):
+    directory: str
+    concurrency: Optional[int] = IMPORT_CONCURRENCY
+    dryRun: Optional[bool] = False
+
 class UploadResponse(BaseModel):
     success: bool
     message: str
@@ -39,76 +265,215 @@ class ServiceInfo(BaseModel):
     endpoints: dict
     configuration: ConfigurationInfo
 
-def upload_template(template_file_path: str) -> dict:
+def upload_template(template_file_path: str,
+                    progress: Optional[Callable[[int, int], None]] = print_progress,
+                    name: str = TEMPLATE_NAME,
+                    description: str = 'Standard employee contract with variable placeholders',
+                    tags: Optional[List[str]] = None) -> dict:
     """
     Path A: Upload and Create Template
     Uploads a .docx/.pptx template and extracts variables automatically
+    Files of STREAMING_UPLOAD_THRESHOLD bytes or more are streamed from a memory map
     """
     # Check if file exists
     if not os.path.exists(template_file_path):
         raise FileNotFoundError(f"Template file not found: {template_file_path}")
 
     url = f"{BASE_URL}/template/upload-and-create"
+    extension = os.path.splitext(template_file_path)[1].lower()
+    content_type = TEMPLATE_CONTENT_TYPES.get(extension, TEMPLATE_CONTENT_TYPES['.docx'])
+
+    data = {
+        'name': name,
+        'description': description,
+        'variables': '[]',
+        'tags': json.dumps(tags if tags is not None else ["hr", "contract", "template"])
+    }
 
-    # Prepare files and data
-    with open(template_file_path, 'rb') as file:
-        files = {
-            'templateFile': (os.path.basename(template_file_path), file,
-                           'application/vnd.openxmlformats-officedocument.wordprocessingml.document')
-        }
-
-        data = {
-            'name': TEMPLATE_NAME,
-            'description': 'Standard employee contract with variable placeholders',
-            'variables': '[]',
-            'tags': '["hr", "contract", "template"]'
-        }
-
-        headers = {
-            'Authorization': f'Bearer {API_TOKEN}',
-            'x-rapiddocx-org-id': ORG_ID,
-            'User-Agent': 'TurboDocx API Client'
-        }
-
-        print(f"Uploading template: {os.path.basename(template_file_path)}")
-        print(f"Template name: {TEMPLATE_NAME}")
+    headers = {
+        'Authorization': f'Bearer {API_TOKEN}',
+        'x-rapiddocx-org-id': ORG_ID,
+        'User-Agent': 'TurboDocx API Client'
+    }
 
-        try:
-            response = requests.post(url, files=files, data=data, headers=headers)
-            response.raise_for_status()
+    print(f"Uploading template: {os.path.basename(template_file_path)}")
+    print(f"Template name: {name}")
 
-            # Parse response
-            result = response.json()
-            template = result['data']['results']['template']
+    try:
+        if os.path.getsize(template_file_path) >= STREAMING_UPLOAD_THRESHOLD:
+            # The API takes the file in one request with no resume - a retry resends the whole body
+            with MmapMultipartBody(template_file_path, data, 'templateFile', content_type, progress) as body:
+                response = post_with_retry(url, new_idempotency_key(), {**headers, 'Content-Type': body.content_type}, data=body)
+        else:
+            with open(template_file_path, 'rb') as file:
+                files = {
+                    'templateFile': (os.path.basename(template_file_path), file, content_type)
+                }
 
-            print(f"✅ Template uploaded successfully: {template['id']}")
-            print(f"Template name: {template['name']}")
+                response = post_with_retry(url, new_idempotency_key(), headers, files=files, data=data)
 
-            # Handle nullable variables field
-            variable_count = len(template['variables']) if template.get('variables') else 0
-            print(f"Variables extracted: {variable_count}")
+        response.raise_for_status()
 
-            print(f"Default font: {template.get('defaultFont', 'N/A')}")
+        # Parse response
+        result = response.json()
+        template = result['data']['results']['template']
 
-            # Handle nullable fonts field
-            font_count = len(template['fonts']) if template.get('fonts') else 0
-            print(f"Fonts used: {font_count}")
+        print(f"✅ Template uploaded successfully: {template['id']}")
+        print(f"Template name: {template['name']}")
 
-            print(f"Redirect to: {result['data']['results']['redirectUrl']}")
-            print(f"Ready to generate documents with template: {template['id']}")
+        # Handle nullable variables field
+        variable_count = len(template['variables']) if template.get('variables') else 0
+        print(f"Variables extracted: {variable_count}")
 
-            return result
+        print(f"Default font: {template.get('defaultFont', 'N/A')}")
 
-        except requests.exceptions.RequestException as e:
-            error_msg = f"Upload failed: {str(e)}"
-            if hasattr(e, 'response') and e.response is not None:
-                try:
-                    error_data = e.response.json()
-                    error_msg += f" - {error_data}"
-                except:
-                    error_msg += f" - {e.response.text}"
-            print(error_msg)
-            raise
+        # Handle nullable fonts field
+        font_count = len(template['fonts']) if template.get('fonts') else 0
+        print(f"Fonts used: {font_count}")
+
+        print(f"Redirect to: {result['data']['results']['redirectUrl']}")
+        print(f"Ready to generate documents with template: {template['id']}")
+
+        return result
+
+    except requests.exceptions.RequestException as e:
+        error_msg = f"Upload failed: {str(e)}"
+        if hasattr(e, 'response') and e.response is not None:
+            try:
+                error_data = e.response.json()
+                error_msg += f" - {error_data}"
+            except:
+                error_msg += f" - {e.response.text}"
+        print(error_msg)
+        raise
+
+def file_sha256(path: str) -> str:
+    """Hash a file in chunks so large templates are never read whole"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def template_metadata(root_dir: str, template_path: str) -> dict:
+    """
+    Derive name, description and tags for one template
+    The name comes from the file name, tags from the folders between root_dir
+    and the file. A sidecar <file stem>.json next to the template overrides
+    any of name, description and tags.
+    """
+    relative_path = os.path.relpath(template_path, root_dir)
+    stem = os.path.splitext(os.path.basename(template_path))[0]
+    folders = os.path.dirname(relative_path).split(os.sep) if os.path.dirname(relative_path) else []
+
+    metadata = {
+        'name': re.sub(r'[_-]+', ' ', stem).strip(),
+        'description': f'Imported from {relative_path}',
+        'tags': [folder.lower() for folder in folders]
+    }
+
+    sidecar_path = os.path.join(os.path.dirname(template_path), f'{stem}.json')
+    if os.path.exists(sidecar_path):
+        with open(sidecar_path, 'r') as f:
+            sidecar = json.load(f)
+        metadata.update({key: sidecar[key] for key in ('name', 'description', 'tags') if key in sidecar})
+
+    return metadata
+
+def import_template_directory(root_dir: str, concurrency: int = IMPORT_CONCURRENCY, dry_run: bool = False) -> dict:
+    """
+    Bulk Import: Upload Every Template in a Directory Tree
+    A manifest in root_dir records each file's content hash, metadata and
+    template ID. Files whose content and metadata are unchanged since the last
+    import are skipped, so re-running an import only uploads the delta. The
+    rest go through a bounded thread pool, and the manifest is saved after
+    every upload so an interrupted run keeps its progress. No endpoint for
+    replacing a template's file is documented, so a changed file is uploaded
+    as a new template; the result reports the template it supersedes
+    (replacesTemplateId) so the caller can retire the old one.
+    """
+    if not os.path.isdir(root_dir):
+        raise FileNotFoundError(f"Import directory not found: {root_dir}")
+
+    manifest_path = os.path.join(root_dir, IMPORT_MANIFEST)
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    manifest_lock = threading.Lock()
+
+    def save_manifest():
+        # Write then rename so an interrupted save never corrupts the manifest
+        temp_path = f'{manifest_path}.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(temp_path, manifest_path)
+
+    # Walk the tree, skipping hidden folders and Office lock files (~$name.docx)
+    template_paths = []
+    for directory, subdirectories, filenames in os.walk(root_dir):
+        subdirectories[:] = sorted(d for d in subdirectories if not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.lower().endswith(TEMPLATE_EXTENSIONS) and not filename.startswith('~$'):
+                template_paths.append(os.path.join(directory, filename))
+
+    results = []
+    to_upload = []
+    for template_path in template_paths:
+        relative_path = os.path.relpath(template_path, root_dir)
+        try:
+            metadata = template_metadata(root_dir, template_path)
+            content_hash = file_sha256(template_path)
+        except (OSError, ValueError) as e:
+            results.append({'path': relative_path, 'status': 'failed', 'error': str(e)})
+            continue
+
+        known = manifest.get(relative_path)
+        if known and known.get('templateId') and known['sha256'] == content_hash and known['metadata'] == metadata:
+            results.append({'path': relative_path, 'status': 'skipped', 'templateId': known['templateId']})
+        else:
+            previous_id = known.get('templateId') if known else None
+            to_upload.append((template_path, relative_path, metadata, content_hash, previous_id))
+
+    print(f"Import: {len(template_paths)} templates found, {len(to_upload)} new or changed")
+
+    def import_one(job):
+        template_path, relative_path, metadata, content_hash, previous_id = job
+        replaces = {'replacesTemplateId': previous_id} if previous_id else {}
+        if dry_run:
+            return {'path': relative_path, 'status': 'pending', 'name': metadata['name'], 'tags': metadata['tags'], **replaces}
+        try:
+            result = upload_template(template_path, progress=None, **metadata)
+            template_id = result['data']['results']['template']['id']
+        except Exception as e:
+            return {'path': relative_path, 'status': 'failed', 'error': str(e)}
+
+        with manifest_lock:
+            # Keep every template this file has superseded until the caller retires them
+            superseded = (manifest.get(relative_path) or {}).get('supersededTemplateIds', [])
+            manifest[relative_path] = {
+                'sha256': content_hash,
+                'metadata': metadata,
+                'templateId': template_id,
+                'supersededTemplateIds': superseded + [previous_id] if previous_id else superseded,
+                'importedAt': datetime.now(timezone.utc).isoformat()
+            }
+            save_manifest()
+        return {'path': relative_path, 'status': 'uploaded', 'templateId': template_id, 'name': metadata['name'], **replaces}
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        results.extend(executor.map(import_one, to_upload))
+
+    summary = {status: sum(1 for r in results if r['status'] == status) for status in ('uploaded', 'skipped', 'failed', 'pending')}
+    return {
+        'directory': root_dir,
+        'dryRun': dry_run,
+        'total': len(results),
+        **summary,
+        'supersededTemplateIds': [r['replacesTemplateId'] for r in results if r['status'] == 'uploaded' and r.get('replacesTemplateId')],
+        'results': results
+    }
 
 # FastAPI route handlers
 @app.post("/upload-template", response_model=UploadResponse)
@@ -140,9 +505,9 @@ async def upload_file_endpoint(templateFile: UploadFile = File(...)):
             )
 
         # Save uploaded file temporarily
+        # Copy in chunks so a large upload is never held in memory
         with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(templateFile.filename)[1]) as temp_file:
-            content = await templateFile.read()
-            temp_file.write(content)
+            shutil.copyfileobj(templateFile.file, temp_file, UPLOAD_CHUNK_SIZE)
             temp_path = temp_file.name
 
         try:
@@ -164,6 +529,28 @@ async def upload_file_endpoint(templateFile: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"File upload failed: {str(e)}")
 
+@app.post("/import-directory", response_model=UploadResponse)
+async def import_directory_endpoint(request: ImportRequest):
+    """Import every template in a directory tree, skipping files unchanged since the last import"""
+    try:
+        result = await run_in_threadpool(
+            import_template_directory,
+            request.directory,
+            request.concurrency or IMPORT_CONCURRENCY,
+            bool(request.dryRun)
+        )
+
+        return UploadResponse(
+            success=result['failed'] == 0,
+            message=f"Imported {result['uploaded']} templates, skipped {result['skipped']} unchanged, {result['failed']} failed",
+            data=result
+        )
+
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Directory import failed: {str(e)}")
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -180,6 +567,7 @@ async def upload_info():
         endpoints={
             "POST /upload-template": "Upload a template file (JSON with templateFilePath)",
             "POST /upload-file": "Upload a template file (multipart form data)",
+            "POST /import-directory": "Import every template in a directory tree (only new or changed files)",
             "GET /health": "Service health check",
             "GET /upload-info": "Service information",
             "GET /docs": "Interactive API documentation",
@@ -225,6 +613,7 @@ if __name__ == '__main__':
         print('\nAvailable endpoints:')
         print(f'  POST http://{host}:{port}/upload-template')
         print(f'  POST http://{host}:{port}/upload-file')
+        print(f'  POST http://{host}:{port}/import-directory')
         print(f'  GET  http://{host}:{port}/health')
         print(f'  GET  http://{host}:{port}/upload-info')
         print(f'  GET  http://{host}:{port}/docs (Interactive API docs)')
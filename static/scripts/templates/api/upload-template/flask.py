@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 
 import os
+import random
+import time
+import uuid
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 import requests
+from urllib3.exceptions import NewConnectionError
 import json
 from flask import Flask, request, jsonify
 from werkzeug.utils import secure_filename
@@ -12,6 +18,123 @@ ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 TEMPLATE_NAME = "Employee Contract Template"
 
+# Share one rate limiter with the other TurboDocx clients in this process when the
+# rate-limiting example is saved next to this script as turbodocx_rate_limit.py
+try:
+    from turbodocx_rate_limit import RateLimitedSession
+except ImportError:
+    RateLimitedSession = None
+
+api_session = RateLimitedSession() if RateLimitedSession else requests.Session()
+
+# Retry settings - by default only attempts the API never processed are retried
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5          # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0          # Upper bound for a computed backoff; Retry-After is always honoured in full
+REQUEST_TIMEOUT = (10, 120)     # (connect, read) seconds
+REJECTED_STATUS_CODES = {408, 425, 429}             # The API turned the request away without processing it
+if RateLimitedSession:
+    REJECTED_STATUS_CODES.discard(429)              # RateLimitedSession already waits out 429s - don't retry them twice
+AMBIGUOUS_STATUS_CODES = {500, 502, 503, 504}       # The request may or may not have been processed
+
+# A POST that timed out, lost its connection or got a 5xx may already have created
+# something. The Idempotency-Key header is sent on every attempt, but TurboDocx does not
+# document deduplicating on it - only enable this if your API deployment does
+RETRY_AMBIGUOUS_FAILURES = False
+
+AMBIGUOUS_EXCEPTIONS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+# SSL, proxy and configuration errors will not fix themselves
+FATAL_EXCEPTIONS = (
+    requests.exceptions.SSLError,
+    requests.exceptions.ProxyError,
+    requests.exceptions.InvalidURL,
+    requests.exceptions.InvalidHeader,
+    requests.exceptions.TooManyRedirects
+)
+
+def request_never_sent(error):
+    """True when the connection failed before any part of the request reached the API"""
+    if isinstance(error, FATAL_EXCEPTIONS):
+        return False
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.exceptions.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def is_retryable(error=None, response=None):
+    """Classify a failed attempt as safe to retry or final"""
+    if error is not None:
+        if request_never_sent(error):
+            return True
+        return RETRY_AMBIGUOUS_FAILURES and isinstance(error, AMBIGUOUS_EXCEPTIONS) and not isinstance(error, FATAL_EXCEPTIONS)
+    if response is None:
+        return False
+    return response.status_code in REJECTED_STATUS_CODES or (
+        RETRY_AMBIGUOUS_FAILURES and response.status_code in AMBIGUOUS_STATUS_CODES
+    )
+
+def new_idempotency_key():
+    """One key per logical operation - its retries reuse it, a deliberate repeat gets a fresh one"""
+    return str(uuid.uuid4())
+
+def parse_retry_after(value):
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt, response=None):
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+def post_with_retry(url, idempotency_key, headers, files=None, **kwargs):
+    """
+    POST with retries. Attempts the API never processed (connection refused,
+    408/425, and 429 unless RateLimitedSession already waited it out) are
+    retried; timeouts and 5xx only when
+    RETRY_AMBIGUOUS_FAILURES is set. Every attempt carries the same
+    Idempotency-Key header. Returns the last response; raises request errors
+    that are not retried.
+    """
+    headers = {**headers, 'Idempotency-Key': idempotency_key}
+
+    for attempt in range(MAX_RETRIES + 1):
+        # Rewind file uploads so every attempt sends the whole file
+        for value in (files or {}).values():
+            handle = value[1] if isinstance(value, tuple) else value
+            if hasattr(handle, 'seek'):
+                handle.seek(0)
+
+        try:
+            response = api_session.post(url, headers=headers, files=files, timeout=REQUEST_TIMEOUT, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if not is_retryable(error=e) or attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+        else:
+            if not is_retryable(response=response) or attempt == MAX_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f'⚠️  HTTP {response.status_code} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+            response.close()
+
+        time.sleep(delay)
+
 app = Flask(__name__)
 
 def upload_template(template_file_path):
@@ -49,7 +172,7 @@ def upload_template(template_file_path):
         print(f"Template name: {TEMPLATE_NAME}")
 
         try:
-            response = requests.post(url, files=files, data=data, headers=headers)
+            response = post_with_retry(url, new_idempotency_key(), headers, files=files, data=data)
             response.raise_for_status()
 
             # Parse response
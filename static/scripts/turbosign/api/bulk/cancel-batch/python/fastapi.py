@@ -1,7 +1,14 @@
+import asyncio
 import json
-import requests
+import random
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
+from typing import Callable, Optional
 
 # Configuration - Update these values
 API_TOKEN = "YOUR_API_TOKEN"
@@ -9,7 +16,114 @@ ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 BATCH_ID = "YOUR_BATCH_ID"  # Replace with actual batch ID to cancel
 
-app = FastAPI()
+# Use HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Shared async client - one pooled set of keep-alive connections for every request
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+# Retry settings - by default only attempts the API never processed are retried
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5          # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0          # Upper bound for a computed backoff; Retry-After is always honoured in full
+REJECTED_STATUS_CODES = {408, 425, 429}             # The API turned the request away without processing it
+AMBIGUOUS_STATUS_CODES = {500, 502, 503, 504}       # The request may or may not have been processed
+
+# A POST that timed out, lost its connection or got a 5xx may already have created
+# something. The Idempotency-Key header is sent on every attempt, but TurboDocx does not
+# document deduplicating on it - only enable this if your API deployment does
+RETRY_AMBIGUOUS_FAILURES = False
+
+# Failures before any connection carried the request
+NEVER_SENT_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+def is_retryable(error=None, response=None):
+    """Classify a failed attempt as safe to retry or final"""
+    if error is not None:
+        return isinstance(error, NEVER_SENT_EXCEPTIONS) or (
+            RETRY_AMBIGUOUS_FAILURES and isinstance(error, httpx.TransportError)
+        )
+    if response is None:
+        return False
+    return response.status_code in REJECTED_STATUS_CODES or (
+        RETRY_AMBIGUOUS_FAILURES and response.status_code in AMBIGUOUS_STATUS_CODES
+    )
+
+def new_idempotency_key() -> str:
+    """One key per logical operation - its retries reuse it, a deliberate repeat gets a fresh one"""
+    return str(uuid.uuid4())
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+async def post_with_retry(path: str, idempotency_key: str,
+                          build_request: Optional[Callable[[], dict]] = None, **kwargs) -> httpx.Response:
+    """
+    POST over the shared client with retries. Attempts the API never
+    processed (connection failures, 408/425/429) are retried; timeouts and
+    5xx only when RETRY_AMBIGUOUS_FAILURES is set. build_request, when
+    given, returns fresh keyword arguments for every attempt so a streamed
+    body that can only be read once is rebuilt for a retry.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        request_kwargs = build_request() if build_request else dict(kwargs)
+        headers = {**request_kwargs.pop('headers', {}), 'Idempotency-Key': idempotency_key}
+
+        try:
+            response = await http_client.post(path, headers=headers, **request_kwargs)
+        except httpx.TransportError as e:
+            if not is_retryable(error=e) or attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+        else:
+            if not is_retryable(response=response) or attempt == MAX_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f'⚠️  HTTP {response.status_code} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+            await response.aclose()
+
+        await asyncio.sleep(delay)
 
 class CancelBatchResponse(BaseModel):
     success: bool
@@ -23,18 +137,12 @@ class CancelBatchResponse(BaseModel):
 @app.post('/cancel-batch', response_model=CancelBatchResponse)
 async def cancel_batch():
     try:
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {API_TOKEN}',
-            'x-rapiddocx-org-id': ORG_ID,
-            'User-Agent': 'TurboDocx API Client',
-            'Content-Type': 'application/json'
-        }
-
-        # Send POST request to cancel batch
-        response = requests.post(
-            f'{BASE_URL}/turbosign/bulk/batch/{BATCH_ID}/cancel',
-            headers=headers
+        # Send POST request to cancel batch over the shared connection pool,
+        # retrying attempts the API never processed
+        response = await post_with_retry(
+            f'/turbosign/bulk/batch/{BATCH_ID}/cancel',
+            new_idempotency_key(),
+            headers={'Content-Type': 'application/json'}
         )
 
         result = response.json()
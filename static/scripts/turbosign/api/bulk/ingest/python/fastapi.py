@@ -1,14 +1,137 @@
+import asyncio
+import csv
+import io
 import json
-import requests
+import random
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from pydantic import BaseModel
+from typing import Callable, Iterable, Iterator, List, Optional
 
 # Configuration - Update these values
 API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
-app = FastAPI()
+# Streaming ingest limits - each batch is closed when either limit is reached
+MAX_JOBS_PER_BATCH = 1000                 # API maximum jobs per batch
+MAX_DOCUMENTS_BYTES = 5 * 1024 * 1024     # Size of the serialized `documents` form field
+
+# Use HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Shared async client - one pooled set of keep-alive connections for every request
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+# Retry settings - by default only attempts the API never processed are retried
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5          # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0          # Upper bound for a computed backoff; Retry-After is always honoured in full
+REJECTED_STATUS_CODES = {408, 425, 429}             # The API turned the request away without processing it
+AMBIGUOUS_STATUS_CODES = {500, 502, 503, 504}       # The request may or may not have been processed
+
+# A POST that timed out, lost its connection or got a 5xx may already have created
+# something. The Idempotency-Key header is sent on every attempt, but TurboDocx does not
+# document deduplicating on it - only enable this if your API deployment does
+RETRY_AMBIGUOUS_FAILURES = False
+
+# Failures before any connection carried the request
+NEVER_SENT_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+def is_retryable(error=None, response=None):
+    """Classify a failed attempt as safe to retry or final"""
+    if error is not None:
+        return isinstance(error, NEVER_SENT_EXCEPTIONS) or (
+            RETRY_AMBIGUOUS_FAILURES and isinstance(error, httpx.TransportError)
+        )
+    if response is None:
+        return False
+    return response.status_code in REJECTED_STATUS_CODES or (
+        RETRY_AMBIGUOUS_FAILURES and response.status_code in AMBIGUOUS_STATUS_CODES
+    )
+
+def new_idempotency_key() -> str:
+    """One key per logical operation - its retries reuse it, a deliberate repeat gets a fresh one"""
+    return str(uuid.uuid4())
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+async def post_with_retry(path: str, idempotency_key: str,
+                          build_request: Optional[Callable[[], dict]] = None, **kwargs) -> httpx.Response:
+    """
+    POST over the shared client with retries. Attempts the API never
+    processed (connection failures, 408/425/429) are retried; timeouts and
+    5xx only when RETRY_AMBIGUOUS_FAILURES is set. build_request, when
+    given, returns fresh keyword arguments for every attempt so a streamed
+    body that can only be read once is rebuilt for a retry.
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        request_kwargs = build_request() if build_request else dict(kwargs)
+        headers = {**request_kwargs.pop('headers', {}), 'Idempotency-Key': idempotency_key}
+
+        try:
+            response = await http_client.post(path, headers=headers, **request_kwargs)
+        except httpx.TransportError as e:
+            if not is_retryable(error=e) or attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+        else:
+            if not is_retryable(response=response) or attempt == MAX_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f'⚠️  HTTP {response.status_code} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+            await response.aclose()
+
+        await asyncio.sleep(delay)
+
+class UpstreamError(Exception):
+    """The API answered with a server error or a body that is not JSON"""
 
 class BulkIngestResponse(BaseModel):
     success: bool
@@ -18,6 +141,147 @@ class BulkIngestResponse(BaseModel):
     status: str
     message: str
 
+class StreamIngestResponse(BaseModel):
+    success: bool
+    totalBatches: int
+    totalJobs: int
+    batches: List[BulkIngestResponse]
+
+def build_document_from_row(row: dict) -> dict:
+    """
+    Build one signing job from a CSV row.
+
+    Expected columns: name, email, and optionally documentName,
+    documentDescription and fields (a JSON array of field objects).
+    Without a fields column the default signature + date layout is used.
+    """
+    email = row['email'].strip()
+    name = row['name'].strip()
+
+    if row.get('fields'):
+        fields = json.loads(row['fields'])
+    else:
+        fields = [
+            {
+                'recipientEmail': email,
+                'type': 'signature',
+                'page': 1,
+                'x': 100,
+                'y': 200,
+                'width': 200,
+                'height': 80,
+                'required': True
+            },
+            {
+                'recipientEmail': email,
+                'type': 'date',
+                'page': 1,
+                'x': 100,
+                'y': 300,
+                'width': 150,
+                'height': 30,
+                'required': True
+            }
+        ]
+
+    return {
+        'recipients': [
+            {
+                'name': name,
+                'email': email,
+                'signingOrder': 1
+            }
+        ],
+        'fields': fields,
+        'documentName': row.get('documentName') or f'Employment Contract - {name}',
+        'documentDescription': row.get('documentDescription') or 'Please review and sign your employment contract'
+    }
+
+def iter_documents(stream: Iterable[str], file_format: str) -> Iterator[dict]:
+    """
+    Lazily yield document objects from a CSV or JSONL text stream.
+
+    JSONL lines are complete document objects in the Documents Array Format;
+    CSV rows are converted with build_document_from_row. Only the current
+    line is held in memory.
+    """
+    if file_format == 'jsonl':
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                raise ValueError(f'Invalid JSON on line {line_number}: {error}')
+    elif file_format == 'csv':
+        for line_number, row in enumerate(csv.DictReader(stream), start=2):
+            try:
+                yield build_document_from_row(row)
+            except (KeyError, AttributeError, json.JSONDecodeError) as error:
+                raise ValueError(f'Invalid CSV row on line {line_number}: {error!r}')
+    else:
+        raise ValueError(f'Unsupported data file format: {file_format}')
+
+def iter_batches(documents: Iterable[dict],
+                 max_jobs: int = MAX_JOBS_PER_BATCH,
+                 max_bytes: int = MAX_DOCUMENTS_BYTES) -> Iterator[str]:
+    """
+    Group documents into size-bounded batches.
+
+    Each document is serialized once and the batch's `documents` JSON array
+    is joined from those pieces, so a batch is yielded as soon as it is full
+    instead of after the whole input has been read.
+    """
+    chunk: List[str] = []
+    chunk_bytes = 2  # Enclosing brackets
+
+    for document in documents:
+        encoded = json.dumps(document, separators=(',', ':'))
+        size = len(encoded.encode('utf-8')) + 1  # Trailing comma
+
+        if chunk and (len(chunk) >= max_jobs or chunk_bytes + size > max_bytes):
+            yield '[' + ','.join(chunk) + ']'
+            chunk = []
+            chunk_bytes = 2
+
+        chunk.append(encoded)
+        chunk_bytes += size
+
+    if chunk:
+        yield '[' + ','.join(chunk) + ']'
+
+async def submit_batch(file: UploadFile, batch_name: str, documents_json: str) -> dict:
+    """
+    Send one /turbosign/bulk/ingest request and return the parsed response.
+
+    Raises UpstreamError for a 5xx or a body that is not JSON, so a server
+    failure is never mistaken for a problem with the caller's input.
+    """
+    data = {
+        'sourceType': 'file',
+        'batchName': batch_name,
+        'documentName': 'Employment Contract',
+        'documentDescription': 'Please review and sign your employment contract',
+        'senderName': 'HR Department',
+        'senderEmail': 'hr@company.com',
+        'documents': documents_json
+    }
+
+    # Starlette has already spooled the upload to a temporary file; httpx rewinds it and
+    # streams the multipart body from it in chunks for every batch and every retry
+    files = {
+        'file': (file.filename or 'document.pdf', file.file, file.content_type or 'application/pdf')
+    }
+
+    response = await post_with_retry('/turbosign/bulk/ingest', new_idempotency_key(), data=data, files=files)
+    if response.status_code >= 500:
+        raise UpstreamError(f'TurboDocx returned HTTP {response.status_code}')
+    try:
+        return response.json()
+    except ValueError:
+        raise UpstreamError(f'TurboDocx returned a non-JSON response (HTTP {response.status_code})')
+
 @app.post('/bulk-ingest', response_model=BulkIngestResponse)
 async def bulk_ingest(file: UploadFile = File(...)):
     try:
@@ -91,38 +355,8 @@ async def bulk_ingest(file: UploadFile = File(...)):
             }
         ]
 
-        # Prepare file
-        files = {
-            'file': (file.filename, file.file, file.content_type)
-        }
-
-        # Prepare form data
-        data = {
-            'sourceType': 'file',
-            'batchName': 'Q4 Employment Contracts',
-            'documentName': 'Employment Contract',
-            'documentDescription': 'Please review and sign your employment contract',
-            'senderName': 'HR Department',
-            'senderEmail': 'hr@company.com',
-            'documents': json.dumps(documents)
-        }
-
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {API_TOKEN}',
-            'x-rapiddocx-org-id': ORG_ID,
-            'User-Agent': 'TurboDocx API Client'
-        }
-
-        # Send request
-        response = requests.post(
-            f'{BASE_URL}/turbosign/bulk/ingest',
-            headers=headers,
-            data=data,
-            files=files
-        )
-
-        result = response.json()
+        # Stream the upload through the shared connection pool, retrying attempts the API never processed
+        result = await submit_batch(file, 'Q4 Employment Contracts', json.dumps(documents))
 
         if result.get('success'):
             return BulkIngestResponse(
@@ -145,6 +379,14 @@ async def bulk_ingest(file: UploadFile = File(...)):
 
     except HTTPException:
         raise
+    except UpstreamError as error:
+        raise HTTPException(
+            status_code=502,
+            detail={
+                'error': 'Upstream error',
+                'message': str(error)
+            }
+        )
     except Exception as error:
         print(f'Error creating bulk batch: {error}')
         raise HTTPException(
@@ -154,3 +396,88 @@ async def bulk_ingest(file: UploadFile = File(...)):
                 'message': str(error)
             }
         )
+
+@app.post('/bulk-ingest/stream', response_model=StreamIngestResponse)
+async def bulk_ingest_stream(
+    file: UploadFile = File(..., description="PDF sent to every recipient"),
+    data_file: UploadFile = File(..., description="CSV or JSONL file with one signing job per row")
+):
+    batches: List[BulkIngestResponse] = []
+
+    def error_detail(**detail) -> dict:
+        # Once a batch is accepted its jobs are live - report them so a re-run can skip them
+        if batches:
+            detail['submittedBatches'] = [batch.batchId for batch in batches]
+        return detail
+
+    try:
+        # Detect the data file format from its extension
+        extension = (data_file.filename or '').rsplit('.', 1)[-1].lower()
+        file_format = 'jsonl' if extension in ('jsonl', 'ndjson') else extension
+
+        # Read the data file as text without loading it into memory
+        stream = io.TextIOWrapper(data_file.file, encoding='utf-8', newline='')
+
+        total_jobs = 0
+
+        # Submit each batch as soon as it is full, while the rest of the file is still unread
+        documents = iter_documents(stream, file_format)
+        for index, documents_json in enumerate(iter_batches(documents), start=1):
+            result = await submit_batch(file, f'Q4 Employment Contracts - Part {index}', documents_json)
+
+            if not result.get('success'):
+                raise HTTPException(
+                    status_code=400,
+                    detail=error_detail(
+                        error=result.get('error', 'Failed to create bulk batch'),
+                        code=result.get('code'),
+                        data=result.get('data'),
+                        failedBatch=index
+                    )
+                )
+
+            batches.append(BulkIngestResponse(
+                success=True,
+                batchId=result['batchId'],
+                batchName=result['batchName'],
+                totalJobs=result['totalJobs'],
+                status=result['status'],
+                message=result['message']
+            ))
+            total_jobs += result['totalJobs']
+
+        return StreamIngestResponse(
+            success=True,
+            totalBatches=len(batches),
+            totalJobs=total_jobs,
+            batches=batches
+        )
+
+    except HTTPException:
+        raise
+    except UpstreamError as error:
+        raise HTTPException(
+            status_code=502,
+            detail=error_detail(
+                error='Upstream error',
+                message=str(error),
+                failedBatch=len(batches) + 1
+            )
+        )
+    except ValueError as error:
+        raise HTTPException(
+            status_code=400,
+            detail=error_detail(
+                error='Invalid data file',
+                message=str(error)
+            )
+        )
+    except Exception as error:
+        print(f'Error streaming bulk batches: {error}')
+        raise HTTPException(
+            status_code=500,
+            detail=error_detail(
+                error='Internal server error',
+                message=str(error)
+            )
+        )
@@ -1,5 +1,6 @@
 import json
-import requests
+from contextlib import asynccontextmanager
+import httpx
 from fastapi import FastAPI, HTTPException, Query
 from pydantic import BaseModel
 from typing import List, Optional
@@ -9,7 +10,34 @@ API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
-app = FastAPI()
+# Use HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Shared async client - one pooled set of keep-alive connections for every request
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 class BatchInfo(BaseModel):
     id: str
@@ -43,17 +71,9 @@ async def list_batches(
         if status:
             params['status'] = status
 
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {API_TOKEN}',
-            'x-rapiddocx-org-id': ORG_ID,
-            'User-Agent': 'TurboDocx API Client'
-        }
-
-        # Send GET request
-        response = requests.get(
-            f'{BASE_URL}/turbosign/bulk/batches',
-            headers=headers,
+        # Send GET request over the shared connection pool
+        response = await http_client.get(
+            '/turbosign/bulk/batches',
             params=params
         )
 
@@ -1,5 +1,11 @@
 import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 import requests
+from requests.adapters import HTTPAdapter
 from flask import Flask, jsonify, request
 
 # Configuration - Update these values
@@ -7,6 +13,29 @@ API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
+# Summary settings
+PAGE_SIZE = 100                 # API maximum batches per page
+MAX_CONCURRENT_PAGES = 8        # Pages fetched at once for the summary
+SUMMARY_CACHE_TTL = 10          # Seconds a computed summary is served from cache
+SUMMARY_LOOKBACK_DAYS = 30      # Only batches created this recently are fetched (startDate filter)
+THROUGHPUT_WINDOW = 900         # Seconds of counter samples the current throughput is measured over
+
+# Share one rate limiter with the other TurboDocx clients in this process when the
+# rate-limiting example is saved next to this script as turbodocx_rate_limit.py
+try:
+    from turbodocx_rate_limit import RateLimitedSession
+except ImportError:
+    RateLimitedSession = None
+
+# Pooled session - reuses keep-alive connections across summary page fetches
+session = RateLimitedSession() if RateLimitedSession else requests.Session()
+session.headers.update({
+    'Authorization': f'Bearer {API_TOKEN}',
+    'x-rapiddocx-org-id': ORG_ID,
+    'User-Agent': 'TurboDocx API Client'
+})
+session.mount('https://', HTTPAdapter(pool_maxsize=MAX_CONCURRENT_PAGES))
+
 app = Flask(__name__)
 
 @app.route('/list-batches', methods=['GET'])
@@ -30,7 +59,7 @@ def list_batches():
         }
 
         # Send GET request
-        response = requests.get(
+        response = session.get(
             f'{BASE_URL}/turbosign/bulk/batches',
             headers=headers,
             params=params
@@ -75,5 +104,131 @@ def list_batches():
             'message': str(error)
         }), 500
 
+# (status, days) -> {'expires': ..., 'value': ..., 'samples': ...}; each filter keeps its own
+# deque of (monotonic time, {batch id: processed jobs}) throughput samples
+_summary_cache = {}
+_summary_lock = threading.Lock()
+
+def fetch_batches_page(offset, filters):
+    response = session.get(
+        f'{BASE_URL}/turbosign/bulk/batches',
+        params={'limit': str(PAGE_SIZE), 'offset': str(offset), **filters}
+    )
+
+    result = response.json()
+
+    if not result.get('data'):
+        raise RuntimeError(result.get('error', 'Failed to retrieve batches'))
+
+    return result['data']
+
+def fetch_all_batches(filters):
+    """Fetch the first page, then the remaining pages concurrently"""
+    first_page = fetch_batches_page(0, filters)
+    offsets = range(PAGE_SIZE, first_page['totalRecords'], PAGE_SIZE)
+
+    batches = list(first_page['batches'])
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PAGES) as executor:
+        for page in executor.map(lambda offset: fetch_batches_page(offset, filters), offsets):
+            batches.extend(page['batches'])
+
+    return batches
+
+def current_throughput(batches, samples):
+    """
+    Processed jobs per hour over the last THROUGHPUT_WINDOW seconds.
+
+    Each refresh records every batch's processed count (succeeded + failed)
+    in samples, which must only hold samples taken with the same filters.
+    The rate is the growth since the oldest sample still inside the window,
+    counting only batches present in both samples. Returns None until a
+    second sample exists.
+    """
+    now = time.monotonic()
+    processed = {batch['id']: batch['succeededJobs'] + batch['failedJobs'] for batch in batches}
+
+    while samples and now - samples[0][0] > THROUGHPUT_WINDOW:
+        samples.popleft()
+    samples.append((now, processed))
+
+    sampled_at, earlier = samples[0]
+    elapsed = now - sampled_at
+    if elapsed <= 0:
+        return None, 0
+
+    grown = sum(max(count - earlier[batch_id], 0) for batch_id, count in processed.items() if batch_id in earlier)
+    return round(grown / elapsed * 3600, 2), round(elapsed)
+
+def summarize_batches(batches):
+    """Org-wide totals, status counts and failure rate from the batch counters"""
+    by_status = {}
+    for batch in batches:
+        by_status[batch['status']] = by_status.get(batch['status'], 0) + 1
+
+    succeeded = sum(batch['succeededJobs'] for batch in batches)
+    failed = sum(batch['failedJobs'] for batch in batches)
+    processed = succeeded + failed
+
+    return {
+        'totalBatches': len(batches),
+        'batchesByStatus': by_status,
+        'totalJobs': sum(batch['totalJobs'] for batch in batches),
+        'succeededJobs': succeeded,
+        'failedJobs': failed,
+        'pendingJobs': sum(batch['pendingJobs'] for batch in batches),
+        'failureRate': round(failed / processed, 4) if processed else 0.0
+    }
+
+@app.route('/batches/summary', methods=['GET'])
+def batches_summary():
+    try:
+        # Only recent batches are fetched - the whole history is not needed every few seconds
+        days = request.args.get('days', SUMMARY_LOOKBACK_DAYS, type=int)
+        status = request.args.get('status')  # Optional, e.g. 'pending,processing'
+        since = datetime.now(timezone.utc) - timedelta(days=days)
+        filters = {'startDate': since.strftime('%Y-%m-%dT%H:%M:%SZ')}
+        if status:
+            filters['status'] = status
+
+        # Serve from cache while fresh; one request refreshes while others wait
+        with _summary_lock:
+            cached = _summary_cache.get((status, days))
+            if cached is None or time.monotonic() >= cached['expires']:
+                batches = fetch_all_batches(filters)
+                samples = cached['samples'] if cached else deque()
+                throughput_per_hour, window_seconds = current_throughput(batches, samples)
+                cached = _summary_cache[(status, days)] = {
+                    'value': {
+                        **summarize_batches(batches),
+                        'throughputPerHour': throughput_per_hour,
+                        'throughputWindowSeconds': window_seconds,
+                        'startDate': filters['startDate'],
+                        'generatedAt': datetime.utcnow().isoformat() + 'Z'
+                    },
+                    # Measured from when the fetch finished, so a slow fetch still gets the full TTL
+                    'expires': time.monotonic() + SUMMARY_CACHE_TTL,
+                    'samples': samples
+                }
+
+            summary = cached['value']
+
+        return jsonify({
+            'success': True,
+            'summary': summary
+        }), 200
+
+    except RuntimeError as error:
+        return jsonify({
+            'success': False,
+            'error': str(error)
+        }), 400
+    except Exception as error:
+        print(f'Error building batch summary: {error}')
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error',
+            'message': str(error)
+        }), 500
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -1,8 +1,16 @@
+import asyncio
 import json
-import requests
+import random
+import sqlite3
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
 from fastapi import FastAPI, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional, Any
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Any, Tuple
 
 # Configuration - Update these values
 API_TOKEN = "YOUR_API_TOKEN"
@@ -10,7 +18,54 @@ ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 BATCH_ID = "YOUR_BATCH_ID"  # Replace with actual batch ID
 
-app = FastAPI()
+# Full-batch scan settings
+PAGE_SIZE = 100             # API maximum jobs per page
+MAX_CONCURRENT_PAGES = 4    # Pages in flight at once while scanning a batch
+
+# Rate-limit settings - listing a batch's jobs is documented at 60 requests per minute
+LIST_JOBS_PER_MINUTE = 60
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5      # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0      # Upper bound for a computed backoff; Retry-After is always honoured in full
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}  # Listing is a GET, so repeating it is safe
+
+# Optional local job index - set a path such as "./turbosign_jobs.db" to enable
+JOB_STORE_PATH: Optional[str] = None
+TERMINAL_JOB_STATUSES = {'SUCCEEDED', 'FAILED', 'CANCELLED'}  # Jobs in these states no longer change
+JOB_STORE_SYNC_TTL = 60     # Seconds local queries are served without syncing from the API first
+
+# Use HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Shared async client - one pooled set of keep-alive connections for every request
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+    if JOB_STORE_PATH:
+        app.state.job_store = JobStore(JOB_STORE_PATH)
+    yield
+    await http_client.aclose()
+    if JOB_STORE_PATH:
+        app.state.job_store.close()
+
+app = FastAPI(lifespan=lifespan)
 
 class JobStatistics(BaseModel):
     totalJobs: int
@@ -41,6 +96,418 @@ class ListJobsResponse(BaseModel):
     statistics: JobStatistics
     jobs: List[JobInfo]
 
+class RateLimiter:
+    """
+    Token bucket shared by every jobs request in the process: at most `limit`
+    requests per `period` seconds. A 429 pauses all callers for the
+    Retry-After the API asked for, not just the request that received it.
+    """
+
+    def __init__(self, limit: int, period: float = 60.0):
+        self.capacity = float(limit)
+        self.rate = limit / period
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + max(now - self.updated, 0.0) * self.rate)
+                self.updated = max(now, self.updated)
+                if self.tokens >= 1 and now >= self.updated:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep(max(self.updated - now, (1 - self.tokens) / self.rate))
+
+    def pause(self, seconds: float):
+        # Nothing is sent, and no tokens accrue, until the pause is over
+        self.tokens = 0.0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+jobs_rate_limiter = RateLimiter(LIST_JOBS_PER_MINUTE)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+async def fetch_jobs_page(batch_id: str, offset: int, limit: int,
+                          status: Optional[str] = None) -> dict:
+    """Fetch one limit/offset page of jobs and return its `data` object, retrying 429s and 5xx"""
+    params = {
+        'limit': str(limit),
+        'offset': str(offset)
+    }
+
+    if status:
+        params['status'] = status
+
+    for attempt in range(MAX_RETRIES + 1):
+        await jobs_rate_limiter.acquire()
+        try:
+            response = await http_client.get(
+                f'/turbosign/bulk/batch/{batch_id}/jobs',
+                params=params
+            )
+        except httpx.TransportError as e:
+            if attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} on offset {offset} - retrying in {delay:.1f}s')
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == MAX_RETRIES:
+                break
+            delay = backoff_delay(attempt, response)
+            if response.status_code == 429:
+                jobs_rate_limiter.pause(delay)
+            print(f'⚠️  HTTP {response.status_code} on offset {offset} - retrying in {delay:.1f}s')
+
+        await asyncio.sleep(delay)
+
+    result = response.json()
+
+    if not result.get('data'):
+        raise RuntimeError(
+            f"{result.get('error', 'Failed to retrieve jobs')} (offset {offset})"
+        )
+
+    return result['data']
+
+async def iter_job_pages(batch_id: str,
+                         offsets: Iterable[int],
+                         page_size: int = PAGE_SIZE,
+                         max_concurrency: int = MAX_CONCURRENT_PAGES) -> AsyncIterator[Tuple[int, dict]]:
+    """Fetch the given page offsets with at most `max_concurrency` in flight, yielding (offset, data) as each arrives"""
+    offsets = iter(offsets)
+    pending: Dict[asyncio.Task, int] = {}
+
+    def fill_window():
+        while len(pending) < max_concurrency:
+            offset = next(offsets, None)
+            if offset is None:
+                return
+            pending[asyncio.create_task(fetch_jobs_page(batch_id, offset, page_size))] = offset
+
+    fill_window()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                offset = pending.pop(task)
+                yield offset, task.result()
+            fill_window()
+    finally:
+        # Stop outstanding fetches if the consumer exits early or a page fails,
+        # and wait for them so no request outlives the scan
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+async def iter_all_jobs(batch_id: str = BATCH_ID,
+                        status: Optional[str] = None,
+                        page_size: int = PAGE_SIZE,
+                        max_concurrency: int = MAX_CONCURRENT_PAGES) -> AsyncIterator[JobInfo]:
+    """
+    Yield every job in a batch, fetching pages concurrently.
+
+    The first page tells us how many jobs the batch holds; the remaining
+    offsets are then requested with at most `max_concurrency` pages in
+    flight, paced by the shared rate limiter. Jobs are yielded as each page
+    arrives, so page order is not preserved.
+
+    A status filter is applied locally instead of being sent to the API:
+    a job changing status mid-scan shifts every later offset of a filtered
+    listing, skipping or repeating jobs, while the batch's own job list is
+    fixed at ingest. Jobs are also de-duplicated by id.
+    """
+    seen = set()
+
+    def matching(jobs: List[dict]) -> Iterator[JobInfo]:
+        for job in jobs:
+            if job['id'] in seen:
+                continue
+            seen.add(job['id'])
+            if status is None or job['status'].lower() == status.lower():
+                yield JobInfo(**job)
+
+    first_page = await fetch_jobs_page(batch_id, 0, page_size)
+    for job in matching(first_page['jobs']):
+        yield job
+
+    offsets = range(page_size, first_page['totalJobs'], page_size)
+    async for _, page in iter_job_pages(batch_id, offsets, page_size, max_concurrency):
+        for job in matching(page['jobs']):
+            yield job
+
+async def fetch_batch_updated_on(batch_id: str, batch_name: str) -> Optional[str]:
+    """The batch's updatedOn from the batches listing, searched by name; None if it cannot be found"""
+    try:
+        response = await http_client.get(
+            '/turbosign/bulk/batches',
+            params={'query': batch_name, 'limit': '100'}
+        )
+        batches = (response.json().get('data') or {}).get('batches') or []
+    except (httpx.HTTPError, ValueError):
+        return None
+
+    return next((batch.get('updatedOn') for batch in batches if batch.get('id') == batch_id), None)
+
+class JobStore:
+    """
+    Local SQLite index of fetched jobs, keyed by (batchId, id).
+
+    Jobs are indexed on status, errorCode and recipient email so filters and
+    aggregates run locally. sync_batch() skips batches whose status,
+    counters and updatedOn are unchanged. Otherwise it re-fetches only the
+    pages that still hold a job in a non-terminal state, using each job's
+    stored position in the batch listing, and rewrites only jobs whose
+    updatedOn moved. The first sync, a store that no longer matches the
+    batch's job count, or full=True scans every page and also removes jobs
+    the API no longer lists.
+    """
+
+    def __init__(self, path: str):
+        self.synced_at: Dict[str, float] = {}  # batch id -> monotonic time of its last sync
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript('''
+            PRAGMA journal_mode = WAL;
+
+            CREATE TABLE IF NOT EXISTS batches (
+                batch_id TEXT PRIMARY KEY,
+                batch_name TEXT,
+                batch_status TEXT,
+                signature TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS jobs (
+                batch_id TEXT NOT NULL,
+                id TEXT NOT NULL,
+                document_id TEXT,
+                document_name TEXT,
+                status TEXT,
+                recipient_emails TEXT,
+                attempts INTEGER,
+                error_code TEXT,
+                error_message TEXT,
+                created_on TEXT,
+                updated_on TEXT,
+                last_attempted_at TEXT,
+                position INTEGER,
+                PRIMARY KEY (batch_id, id)
+            );
+
+            CREATE TABLE IF NOT EXISTS job_recipients (
+                batch_id TEXT NOT NULL,
+                job_id TEXT NOT NULL,
+                email TEXT NOT NULL,
+                PRIMARY KEY (batch_id, job_id, email)
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (batch_id, status);
+            CREATE INDEX IF NOT EXISTS idx_jobs_error_code ON jobs (batch_id, error_code);
+            CREATE INDEX IF NOT EXISTS idx_job_recipients_email ON job_recipients (email);
+        ''')
+
+        # Stores created before positions were tracked gain the column; their next sync is a full scan
+        columns = {row['name'] for row in self.conn.execute('PRAGMA table_info(jobs)')}
+        if 'position' not in columns:
+            with self.conn:
+                self.conn.execute('ALTER TABLE jobs ADD COLUMN position INTEGER')
+
+    def close(self):
+        self.conn.close()
+
+    def is_stale(self, batch_id: str) -> bool:
+        synced_at = self.synced_at.get(batch_id)
+        return synced_at is None or time.monotonic() - synced_at > JOB_STORE_SYNC_TTL
+
+    def _signature(self, page: dict, updated_on: Optional[str]) -> str:
+        return json.dumps([
+            page['batchStatus'],
+            page['totalJobs'],
+            page['succeededJobs'],
+            page['failedJobs'],
+            page['pendingJobs'],
+            updated_on
+        ])
+
+    def stored_jobs(self, batch_id: str) -> Dict[str, Tuple[str, str, Optional[int]]]:
+        """id -> (updated_on, status, position) for every stored job of a batch"""
+        return {row['id']: (row['updated_on'], row['status'], row['position']) for row in self.conn.execute(
+            'SELECT id, updated_on, status, position FROM jobs WHERE batch_id = ?', (batch_id,)
+        )}
+
+    def upsert_jobs(self, batch_id: str, jobs: List[dict], offset: Optional[int] = None,
+                    stored: Optional[Dict[str, Tuple[str, str, Optional[int]]]] = None) -> int:
+        """
+        Write jobs that are new, newer than the stored copy, or have moved in
+        the listing; returns rows written. `offset` is the page's position in
+        the batch listing. Pass the `stored` map from stored_jobs() when
+        writing many pages - it is kept current, so it is read only once.
+        """
+        if stored is None:
+            stored = self.stored_jobs(batch_id)
+
+        # ISO-8601 UTC timestamps from the API compare correctly as strings
+        changed = []
+        for index, job in enumerate(jobs):
+            position = offset + index if offset is not None else None
+            updated_on, _, stored_position = stored.get(job['id'], ('', None, None))
+            if updated_on < job['updatedOn'] or (position is not None and stored_position != position):
+                changed.append((job, position))
+        if not changed:
+            return 0
+
+        with self.conn:
+            self.conn.executemany(
+                '''INSERT OR REPLACE INTO jobs (
+                    batch_id, id, document_id, document_name, status, recipient_emails,
+                    attempts, error_code, error_message, created_on, updated_on, last_attempted_at, position
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                [(
+                    batch_id, job['id'], job.get('documentId'), job['documentName'],
+                    job['status'], json.dumps(job['recipientEmails']), job['attempts'],
+                    job.get('errorCode'), job.get('errorMessage'), job['createdOn'],
+                    job['updatedOn'], job.get('lastAttemptedAt'), position
+                ) for job, position in changed]
+            )
+            self.conn.executemany(
+                'DELETE FROM job_recipients WHERE batch_id = ? AND job_id = ?',
+                [(batch_id, job['id']) for job, _ in changed]
+            )
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO job_recipients (batch_id, job_id, email) VALUES (?, ?, ?)',
+                [(batch_id, job['id'], email.lower())
+                 for job, _ in changed for email in job['recipientEmails']]
+            )
+
+        for job, position in changed:
+            stored[job['id']] = (job['updatedOn'], job['status'], position)
+        return len(changed)
+
+    def delete_jobs(self, batch_id: str, job_ids: List[str]):
+        with self.conn:
+            self.conn.executemany(
+                'DELETE FROM jobs WHERE batch_id = ? AND id = ?',
+                [(batch_id, job_id) for job_id in job_ids]
+            )
+            self.conn.executemany(
+                'DELETE FROM job_recipients WHERE batch_id = ? AND job_id = ?',
+                [(batch_id, job_id) for job_id in job_ids]
+            )
+
+    async def sync_batch(self, batch_id: str, full: bool = False) -> int:
+        """Refresh one batch from the API; returns the number of jobs written or removed"""
+        first_page = await fetch_jobs_page(batch_id, 0, PAGE_SIZE)
+        updated_on = await fetch_batch_updated_on(batch_id, first_page['batchName'])
+        signature = self._signature(first_page, updated_on)
+
+        row = self.conn.execute(
+            'SELECT signature FROM batches WHERE batch_id = ?', (batch_id,)
+        ).fetchone()
+        # Without the batch's updatedOn a job change under unchanged counters cannot be ruled out
+        if not full and updated_on and row and row['signature'] == signature:
+            self.synced_at[batch_id] = time.monotonic()
+            return 0
+
+        stored = self.stored_jobs(batch_id)
+        total = first_page['totalJobs']
+        full = full or len(stored) != total or any(position is None for _, _, position in stored.values())
+
+        if full:
+            offsets = range(PAGE_SIZE, total, PAGE_SIZE)
+        else:
+            # Only pages still holding a job that can change are worth fetching
+            offsets = sorted({
+                position - position % PAGE_SIZE
+                for _, status, position in stored.values()
+                if status.upper() not in TERMINAL_JOB_STATUSES and position >= PAGE_SIZE
+            })
+
+        written = self.upsert_jobs(batch_id, first_page['jobs'], 0, stored)
+        seen = {job['id'] for job in first_page['jobs']}
+        async for offset, page in iter_job_pages(batch_id, offsets):
+            written += self.upsert_jobs(batch_id, page['jobs'], offset, stored)
+            seen.update(job['id'] for job in page['jobs'])
+
+        if full:
+            # A full scan saw every job the API still lists
+            removed = [job_id for job_id in stored if job_id not in seen]
+            self.delete_jobs(batch_id, removed)
+            written += len(removed)
+
+        with self.conn:
+            self.conn.execute(
+                '''INSERT OR REPLACE INTO batches (batch_id, batch_name, batch_status, signature)
+                VALUES (?, ?, ?, ?)''',
+                (batch_id, first_page['batchName'], first_page['batchStatus'], signature)
+            )
+        self.synced_at[batch_id] = time.monotonic()
+
+        return written
+
+    def query_jobs(self, batch_id: str, status: Optional[str] = None,
+                   error_code: Optional[str] = None,
+                   recipient_email: Optional[str] = None) -> List[JobInfo]:
+        sql = 'SELECT jobs.* FROM jobs'
+        where = ['jobs.batch_id = ?']
+        params: List[Any] = [batch_id]
+
+        if recipient_email:
+            sql += ' JOIN job_recipients r ON r.batch_id = jobs.batch_id AND r.job_id = jobs.id'
+            where.append('r.email = ?')
+            params.append(recipient_email.lower())
+        if status:
+            where.append('jobs.status = ?')
+            params.append(status)
+        if error_code:
+            where.append('jobs.error_code = ?')
+            params.append(error_code)
+
+        rows = self.conn.execute(
+            f"{sql} WHERE {' AND '.join(where)} ORDER BY jobs.created_on", params
+        ).fetchall()
+
+        return [JobInfo(
+            id=row['id'],
+            batchId=row['batch_id'],
+            documentId=row['document_id'],
+            documentName=row['document_name'],
+            status=row['status'],
+            recipientEmails=json.loads(row['recipient_emails']),
+            attempts=row['attempts'],
+            errorCode=row['error_code'],
+            errorMessage=row['error_message'],
+            createdOn=row['created_on'],
+            updatedOn=row['updated_on'],
+            lastAttemptedAt=row['last_attempted_at']
+        ) for row in rows]
+
+    def count_by_status_and_error(self, batch_id: str) -> List[Tuple[str, Optional[str], int]]:
+        return [tuple(row) for row in self.conn.execute(
+            '''SELECT status, error_code, COUNT(*) FROM jobs
+            WHERE batch_id = ? GROUP BY status, error_code ORDER BY COUNT(*) DESC''',
+            (batch_id,)
+        ).fetchall()]
+
 @app.get('/list-jobs', response_model=ListJobsResponse)
 async def list_jobs(
     limit: Optional[int] = Query(20, description="Number of jobs to return"),
@@ -57,17 +524,9 @@ async def list_jobs(
         if status:
             params['status'] = status
 
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {API_TOKEN}',
-            'x-rapiddocx-org-id': ORG_ID,
-            'User-Agent': 'TurboDocx API Client'
-        }
-
-        # Send GET request
-        response = requests.get(
-            f'{BASE_URL}/turbosign/bulk/batch/{BATCH_ID}/jobs',
-            headers=headers,
+        # Send GET request over the shared connection pool
+        response = await http_client.get(
+            f'/turbosign/bulk/batch/{BATCH_ID}/jobs',
             params=params
         )
 
@@ -109,3 +568,128 @@ async def list_jobs(
                 'message': str(error)
             }
         )
+
+@app.get('/list-jobs/all')
+async def list_all_jobs(
+    status: Optional[str] = Query(None, description="Filter by status")
+):
+    jobs = iter_all_jobs(BATCH_ID, status=status)
+
+    try:
+        # Pull the first job before responding so API errors surface as a 400
+        first_job = await jobs.__anext__()
+    except StopAsyncIteration:
+        first_job = None
+    except RuntimeError as error:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'error': str(error)
+            }
+        )
+    except Exception as error:
+        print(f'Error retrieving jobs: {error}')
+        raise HTTPException(
+            status_code=500,
+            detail={
+                'error': 'Internal server error',
+                'message': str(error)
+            }
+        )
+
+    async def stream_jobs():
+        # Newline-delimited JSON, one job per line, written as pages arrive
+        if first_job is None:
+            return
+        yield first_job.model_dump_json() + '\n'
+        async for job in jobs:
+            yield job.model_dump_json() + '\n'
+
+    return StreamingResponse(stream_jobs(), media_type='application/x-ndjson')
+
+def get_job_store() -> JobStore:
+    if not JOB_STORE_PATH:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'error': 'Local job store is disabled - set JOB_STORE_PATH to enable it'
+            }
+        )
+    return app.state.job_store
+
+@app.get('/list-jobs/local', response_model=List[JobInfo])
+async def list_jobs_local(
+    status: Optional[str] = Query(None, description="Filter by status"),
+    errorCode: Optional[str] = Query(None, description="Filter by error code"),
+    recipientEmail: Optional[str] = Query(None, description="Filter by recipient email"),
+    refresh: Optional[bool] = Query(None, description="Sync changed jobs from the API first; by default only when the last sync is older than JOB_STORE_SYNC_TTL"),
+    fullSync: bool = Query(False, description="Re-fetch every page and drop jobs the API no longer lists")
+):
+    store = get_job_store()
+
+    try:
+        # Within the TTL queries are answered from SQLite without touching the API
+        if fullSync or refresh or (refresh is None and store.is_stale(BATCH_ID)):
+            await store.sync_batch(BATCH_ID, full=fullSync)
+
+        return store.query_jobs(
+            BATCH_ID,
+            status=status,
+            error_code=errorCode,
+            recipient_email=recipientEmail
+        )
+
+    except RuntimeError as error:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'error': str(error)
+            }
+        )
+    except Exception as error:
+        print(f'Error querying local jobs: {error}')
+        raise HTTPException(
+            status_code=500,
+            detail={
+                'error': 'Internal server error',
+                'message': str(error)
+            }
+        )
+
+@app.get('/list-jobs/local/stats')
+async def list_jobs_local_stats(
+    refresh: Optional[bool] = Query(None, description="Sync changed jobs from the API first; by default only when the last sync is older than JOB_STORE_SYNC_TTL"),
+    fullSync: bool = Query(False, description="Re-fetch every page and drop jobs the API no longer lists")
+):
+    store = get_job_store()
+
+    try:
+        # Within the TTL queries are answered from SQLite without touching the API
+        if fullSync or refresh or (refresh is None and store.is_stale(BATCH_ID)):
+            await store.sync_batch(BATCH_ID, full=fullSync)
+
+        return {
+            'success': True,
+            'batchId': BATCH_ID,
+            'counts': [
+                {'status': status, 'errorCode': error_code, 'count': count}
+                for status, error_code, count in store.count_by_status_and_error(BATCH_ID)
+            ]
+        }
+
+    except RuntimeError as error:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'error': str(error)
+            }
+        )
+    except Exception as error:
+        print(f'Error aggregating local jobs: {error}')
+        raise HTTPException(
+            status_code=500,
+            detail={
+                'error': 'Internal server error',
+                'message': str(error)
+            }
+        )
@@ -8,6 +8,15 @@ ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 BATCH_ID = "YOUR_BATCH_ID"  # Replace with actual batch ID
 
+# Share one rate limiter with the other TurboDocx clients in this process when the
+# rate-limiting example is saved next to this script as turbodocx_rate_limit.py
+try:
+    from turbodocx_rate_limit import RateLimitedSession
+except ImportError:
+    RateLimitedSession = None
+
+api_session = RateLimitedSession() if RateLimitedSession else requests.Session()
+
 app = Flask(__name__)
 
 @app.route('/list-jobs', methods=['GET'])
@@ -29,7 +38,7 @@ def list_jobs():
         }
 
         # Send GET request
-        response = requests.get(
+        response = api_session.get(
             f'{BASE_URL}/turbosign/bulk/batch/{BATCH_ID}/jobs',
             headers=headers,
             params=params
@@ -0,0 +1,393 @@
+import asyncio
+import io
+import json
+import random
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from pydantic import BaseModel
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+# Configuration - Update these values
+API_TOKEN = "YOUR_API_TOKEN"
+ORG_ID = "YOUR_ORGANIZATION_ID"
+BASE_URL = "https://api.turbodocx.com"
+BATCH_ID = "YOUR_BATCH_ID"  # Replace with the batch whose failed jobs should be retried
+
+# Retry settings
+PAGE_SIZE = 100                                  # API maximum jobs per page
+MAX_CONCURRENT_PAGES = 8                         # Pages in flight at once while scanning
+MAX_JOBS_PER_BATCH = 1000                        # API maximum jobs per batch
+RETRY_LINEAGE_PATH = "./retry_lineage.jsonl"     # Append-only record of original job -> retry batch
+FAILED_JOB_STATUS = 'FAILED'                     # Job statuses are uppercase (SUCCEEDED, FAILED, ...)
+
+# Rate-limit settings - ingest and cancel allow 10 requests per minute, job listing 60
+MAX_RETRIES = 5
+RETRY_BASE_DELAY = 0.5      # Seconds before the first retry
+RETRY_MAX_DELAY = 30.0      # Upper bound for a computed backoff; Retry-After is always honoured in full
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}  # Retried for GETs; POSTs are only retried on 429
+
+# Job errorCodes to resubmit. Only INVALID_EMAIL is documented, and it fails again
+# unchanged, so nothing is retried unless you list the codes your batches report for
+# transient failures here (or per request). Unknown codes are never retried.
+RETRYABLE_ERROR_CODES: Set[str] = set()
+NON_RETRYABLE_ERROR_CODES = {'INVALID_EMAIL'}
+
+# Use HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Shared async client - one pooled set of keep-alive connections for every request
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+class ErrorGroup(BaseModel):
+    errorCode: Optional[str]
+    retryable: bool
+    jobCount: int
+
+class RetryLineage(BaseModel):
+    originalBatchId: str
+    originalJobId: str
+    errorCode: Optional[str]
+    documentName: str
+    recipientEmails: List[str]
+    retryBatchId: str
+    retriedOn: str
+
+class RetryFailedResponse(BaseModel):
+    success: bool
+    originalBatchId: str
+    failedJobs: int
+    retriedJobs: int
+    alreadyRetriedJobs: List[str]
+    unmatchedJobs: List[str]
+    groups: List[ErrorGroup]
+    retryBatchIds: List[str]
+    lineage: List[RetryLineage]
+
+def job_key(document_name: str, recipient_emails: Iterable[str]) -> Tuple[str, Tuple[str, ...]]:
+    """Match a failed job to its source document by name and recipients"""
+    return (document_name, tuple(sorted(email.lower() for email in recipient_emails)))
+
+def is_retryable(error_code: Optional[str], retry_codes: Set[str]) -> bool:
+    return error_code in retry_codes and error_code not in NON_RETRYABLE_ERROR_CODES
+
+def load_retried_job_ids(batch_id: str) -> Set[str]:
+    """Jobs of batch_id that an earlier run already resubmitted, from the lineage file"""
+    retried = set()
+    try:
+        with open(RETRY_LINEAGE_PATH, 'r', encoding='utf-8') as lineage_file:
+            for line in lineage_file:
+                if line.strip():
+                    record = json.loads(line)
+                    if record.get('originalBatchId') == batch_id:
+                        retried.add(record['originalJobId'])
+    except FileNotFoundError:
+        pass
+    return retried
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+def backoff_delay(attempt: int, response: Optional[httpx.Response] = None) -> float:
+    """Full-jitter backoff, or exactly the Retry-After the API asked for"""
+    retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+    if retry_after is not None:
+        return retry_after
+    return random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** attempt)))
+
+async def request_with_retry(method: str, path: str, **kwargs) -> httpx.Response:
+    """
+    Send a request over the shared client, waiting out 429s. A 429 means
+    the API turned the request away unprocessed, so even an ingest or
+    cancel POST is safe to repeat; GETs are also retried on 5xx and
+    transport errors.
+    """
+    retry_codes = RETRY_STATUS_CODES if method == 'GET' else {429}
+
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = await http_client.request(method, path, **kwargs)
+        except httpx.TransportError as e:
+            if method != 'GET' or attempt == MAX_RETRIES:
+                raise
+            delay = backoff_delay(attempt)
+            print(f'⚠️  {type(e).__name__} on {path} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+        else:
+            if response.status_code not in retry_codes or attempt == MAX_RETRIES:
+                return response
+            delay = backoff_delay(attempt, response)
+            print(f'⚠️  HTTP {response.status_code} on {path} - retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})')
+            await response.aclose()
+
+        await asyncio.sleep(delay)
+
+async def fetch_jobs_page(batch_id: str, offset: int, status: str) -> dict:
+    response = await request_with_retry(
+        'GET',
+        f'/turbosign/bulk/batch/{batch_id}/jobs',
+        params={
+            'limit': str(PAGE_SIZE),
+            'offset': str(offset),
+            'status': status
+        }
+    )
+
+    result = response.json()
+
+    if not result.get('data'):
+        raise RuntimeError(result.get('error', 'Failed to retrieve jobs'))
+
+    return result['data']
+
+async def fetch_failed_jobs(batch_id: str) -> Tuple[dict, List[dict]]:
+    """Return the first page (for batch details) and every failed job in the batch"""
+    first_page = await fetch_jobs_page(batch_id, 0, FAILED_JOB_STATUS)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+
+    async def bounded(offset: int) -> dict:
+        async with semaphore:
+            return await fetch_jobs_page(batch_id, offset, FAILED_JOB_STATUS)
+
+    pages = await asyncio.gather(*(
+        bounded(offset) for offset in range(PAGE_SIZE, first_page['totalRecords'], PAGE_SIZE)
+    ))
+
+    jobs = list(first_page['jobs'])
+    for page in pages:
+        jobs.extend(page['jobs'])
+
+    return first_page, jobs
+
+def iter_matching_documents(stream: Iterable[str],
+                            wanted: Set[Tuple[str, Tuple[str, ...]]]) -> Iterator[Tuple[Tuple[str, Tuple[str, ...]], dict]]:
+    """Yield (key, document) for documents in a JSONL source file whose key is in `wanted`"""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            document = json.loads(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f'Invalid JSON on line {line_number}: {error}')
+
+        key = job_key(
+            document.get('documentName', ''),
+            (recipient['email'] for recipient in document['recipients'])
+        )
+        if key in wanted:
+            yield key, document
+
+async def cancel_batch(batch_id: str):
+    response = await request_with_retry(
+        'POST',
+        f'/turbosign/bulk/batch/{batch_id}/cancel',
+        headers={'Content-Type': 'application/json'}
+    )
+    result = response.json()
+
+    # A batch that finished in the meantime has nothing left to cancel
+    if not result.get('success') and result.get('code') != 'BatchNotCancellable':
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'error': result.get('error', 'Failed to cancel original batch'),
+                'code': result.get('code')
+            }
+        )
+
+async def submit_batch(file: UploadFile, batch_name: str, documents: List[dict]) -> dict:
+    # httpx rewinds the upload on every attempt, so the same file is reused for every batch
+    response = await request_with_retry(
+        'POST',
+        '/turbosign/bulk/ingest',
+        data={
+            'sourceType': 'file',
+            'batchName': batch_name,
+            'senderName': 'HR Department',
+            'senderEmail': 'hr@company.com',
+            'documents': json.dumps(documents)
+        },
+        files={
+            'file': (file.filename, file.file, file.content_type)
+        }
+    )
+
+    result = response.json()
+
+    if not result.get('success'):
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'error': result.get('error', 'Failed to create retry batch'),
+                'code': result.get('code'),
+                'data': result.get('data')
+            }
+        )
+
+    return result
+
+@app.post('/retry-failed', response_model=RetryFailedResponse)
+async def retry_failed(
+    file: UploadFile = File(..., description="The PDF used for the original batch"),
+    documents_file: UploadFile = File(..., description="JSONL file of the original documents, one per line"),
+    cancel_original: bool = Form(False, description="Cancel the original batch's remaining jobs before resubmitting"),
+    retry_error_codes: str = Form('', description="Comma-separated job errorCodes to retry in addition to RETRYABLE_ERROR_CODES")
+):
+    try:
+        batch, failed_jobs = await fetch_failed_jobs(BATCH_ID)
+        retry_codes = RETRYABLE_ERROR_CODES | {code.strip() for code in retry_error_codes.split(',') if code.strip()}
+
+        # Jobs an earlier run already resubmitted - sending them again would email the signers twice
+        retried_job_ids = load_retried_job_ids(BATCH_ID)
+
+        # Group failed jobs by errorCode and keep the retryable ones that were not retried yet
+        groups: Dict[Optional[str], List[dict]] = defaultdict(list)
+        for job in failed_jobs:
+            groups[job.get('errorCode')].append(job)
+
+        retryable_jobs: Dict[str, dict] = {}
+        already_retried: List[str] = []
+        for error_code, jobs in groups.items():
+            if not is_retryable(error_code, retry_codes):
+                continue
+            for job in jobs:
+                if job['id'] in retried_job_ids:
+                    already_retried.append(job['id'])
+                else:
+                    retryable_jobs[job['id']] = job
+
+        # Several failed jobs can share a document name and recipients - each source line claims one of them
+        jobs_by_key: Dict[Tuple[str, Tuple[str, ...]], List[str]] = defaultdict(list)
+        for job_id, job in retryable_jobs.items():
+            jobs_by_key[job_key(job['documentName'], job['recipientEmails'])].append(job_id)
+
+        # Stream the source file and resubmit matches in batches of MAX_JOBS_PER_BATCH
+        stream = io.TextIOWrapper(documents_file.file, encoding='utf-8', newline='')
+        retried_on = datetime.now(timezone.utc).isoformat()
+        retry_batch_ids: List[str] = []
+        lineage: List[RetryLineage] = []
+        matched: Set[str] = set()
+        chunk_job_ids: List[str] = []
+        chunk: List[dict] = []
+
+        # Cancel only once a job is actually about to be resubmitted, not when nothing is retryable
+        cancel_pending = cancel_original and batch['batchStatus'] in ('pending', 'processing')
+
+        async def flush():
+            nonlocal cancel_pending
+            if cancel_pending:
+                await cancel_batch(BATCH_ID)
+                cancel_pending = False
+
+            result = await submit_batch(
+                file,
+                f"{batch['batchName']} - Retry {len(retry_batch_ids) + 1}",
+                chunk
+            )
+            retry_batch_ids.append(result['batchId'])
+
+            # Record lineage on disk as soon as each retry batch exists, so a rerun skips these jobs
+            with open(RETRY_LINEAGE_PATH, 'a', encoding='utf-8') as lineage_file:
+                for job_id in chunk_job_ids:
+                    original = retryable_jobs[job_id]
+                    record = RetryLineage(
+                        originalBatchId=BATCH_ID,
+                        originalJobId=original['id'],
+                        errorCode=original.get('errorCode'),
+                        documentName=original['documentName'],
+                        recipientEmails=original['recipientEmails'],
+                        retryBatchId=result['batchId'],
+                        retriedOn=retried_on
+                    )
+                    lineage.append(record)
+                    lineage_file.write(record.model_dump_json() + '\n')
+
+        for key, document in iter_matching_documents(stream, set(jobs_by_key)):
+            if not jobs_by_key[key]:
+                continue
+            job_id = jobs_by_key[key].pop(0)
+            matched.add(job_id)
+            chunk_job_ids.append(job_id)
+            chunk.append(document)
+            if len(chunk) >= MAX_JOBS_PER_BATCH:
+                await flush()
+                chunk_job_ids.clear()
+                chunk.clear()
+
+        if chunk:
+            await flush()
+
+        return RetryFailedResponse(
+            success=True,
+            originalBatchId=BATCH_ID,
+            failedJobs=len(failed_jobs),
+            retriedJobs=len(lineage),
+            alreadyRetriedJobs=already_retried,
+            unmatchedJobs=[job_id for job_id in retryable_jobs if job_id not in matched],
+            groups=[
+                ErrorGroup(
+                    errorCode=error_code,
+                    retryable=is_retryable(error_code, retry_codes),
+                    jobCount=len(jobs)
+                )
+                for error_code, jobs in groups.items()
+            ],
+            retryBatchIds=retry_batch_ids,
+            lineage=lineage
+        )
+
+    except HTTPException:
+        raise
+    except (RuntimeError, ValueError, KeyError) as error:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                'error': 'Failed to retry batch',
+                'message': str(error)
+            }
+        )
+    except Exception as error:
+        print(f'Error retrying failed jobs: {error}')
+        raise HTTPException(
+            status_code=500,
+            detail={
+                'error': 'Internal server error',
+                'message': str(error)
+            }
+        )
@@ -0,0 +1,360 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import httpx
+from fastapi import FastAPI, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+# Configuration - Update these values
+API_TOKEN = "YOUR_API_TOKEN"
+ORG_ID = "YOUR_ORGANIZATION_ID"
+BASE_URL = "https://api.turbodocx.com"
+
+# Watcher settings
+ACTIVE_STATUSES = 'pending,processing'   # Batches that can still change
+PAGE_SIZE = 100                          # API maximum page size
+MAX_CONCURRENT_REQUESTS = 8              # Requests in flight at once per poll
+MIN_POLL_INTERVAL = 5.0                  # Seconds between polls right after a change
+MAX_POLL_INTERVAL = 300.0                # Ceiling for the interval while nothing changes
+BACKOFF_FACTOR = 2.0                     # Interval multiplier for each idle poll
+REQUESTS_PER_MINUTE = 60                 # Documented limit for listing batches and for listing jobs
+MAX_RETRIES = 3                          # Attempts after a 429 before the poll gives up on a request
+
+# Job status fetched when the matching counter grows - only these jobs can have changed
+COUNTER_STATUSES = {
+    'succeededJobs': 'SUCCEEDED',
+    'failedJobs': 'FAILED'
+}
+
+# Use HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Shared async client - one pooled set of keep-alive connections for every request
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
+
+class JobInfo(BaseModel):
+    id: str
+    batchId: str
+    documentId: Optional[str]
+    documentName: str
+    status: str
+    recipientEmails: List[str]
+    attempts: int
+    errorCode: Optional[str] = None
+    errorMessage: Optional[str] = None
+    createdOn: str
+    updatedOn: str
+    lastAttemptedAt: Optional[str] = None
+
+class BatchChange(BaseModel):
+    batchId: str
+    batchName: str
+    status: str
+    totalJobs: int
+    succeededJobs: int
+    failedJobs: int
+    pendingJobs: int
+    changedJobs: List[JobInfo]
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def batch_signature(batch: dict) -> Tuple:
+    """The per-batch values compared between polls"""
+    return (
+        batch['updatedOn'],
+        batch['status'],
+        batch['succeededJobs'],
+        batch['failedJobs'],
+        batch['pendingJobs']
+    )
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delay-seconds or an HTTP-date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max((parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+class BatchGoneError(RuntimeError):
+    """The API no longer knows the batch"""
+
+class RateLimiter:
+    """
+    Token bucket for one endpoint family: at most `limit` requests per
+    `period` seconds. A 429 pauses every caller for its Retry-After.
+    """
+
+    def __init__(self, limit: int, period: float = 60.0):
+        self.capacity = float(limit)
+        self.rate = limit / period
+        self.tokens = float(limit)
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + max(now - self.updated, 0.0) * self.rate)
+                self.updated = max(now, self.updated)
+                if self.tokens >= 1 and now >= self.updated:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep(max(self.updated - now, (1 - self.tokens) / self.rate))
+
+    def pause(self, seconds: float):
+        # Nothing is sent, and no tokens accrue, until the pause is over
+        self.tokens = 0.0
+        self.updated = max(self.updated, time.monotonic() + seconds)
+
+class BatchWatcher:
+    """
+    Poll active batches and report only what changed since the last poll.
+
+    Each poll lists active batches (one request per 100 batches) and compares
+    the status and job counters with the previous poll. Jobs are only fetched
+    when a counter grew, and then only with the matching status filter (a
+    batch whose failedJobs rose is paged for FAILED jobs alone). Jobs updated
+    after the previous poll's updatedOn, and no later than this poll's, are
+    emitted; anything newer is left for the next poll, so a job is never
+    reported twice. Requests are paced to the documented 60/min per endpoint
+    family and 429s honour Retry-After. A batch the API no longer knows is
+    dropped; any other failure keeps its previous state so the next poll
+    retries it. While nothing changes the poll interval grows by
+    BACKOFF_FACTOR up to MAX_POLL_INTERVAL; any change resets it to
+    MIN_POLL_INTERVAL.
+    """
+
+    def __init__(self, client: httpx.AsyncClient,
+                 min_interval: float = MIN_POLL_INTERVAL,
+                 max_interval: float = MAX_POLL_INTERVAL,
+                 backoff_factor: float = BACKOFF_FACTOR,
+                 emit_initial: bool = False):
+        self.client = client
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.emit_initial = emit_initial
+        self.interval = min_interval
+        self.batch_state: Dict[str, Tuple] = {}
+        self.requests_made = 0
+        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self.batches_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+        self.jobs_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+
+    async def _get(self, path: str, params: dict) -> dict:
+        limiter = self.batches_limiter if path == '/turbosign/bulk/batches' else self.jobs_limiter
+
+        for attempt in range(MAX_RETRIES + 1):
+            await limiter.acquire()
+            async with self.semaphore:
+                self.requests_made += 1
+                response = await self.client.get(path, params=params)
+
+            if response.status_code != 429 or attempt == MAX_RETRIES:
+                break
+            limiter.pause(parse_retry_after(response.headers.get('Retry-After')) or 60.0 / REQUESTS_PER_MINUTE)
+
+        # Check the status first - a 404 body is not always JSON
+        if response.status_code == 404:
+            raise BatchGoneError(f'{path} not found')
+
+        result = response.json()
+
+        if result.get('code') == 'BatchNotFound':
+            raise BatchGoneError(result.get('error', f'{path} not found'))
+        if not result.get('data'):
+            raise RuntimeError(result.get('error', f'Failed to retrieve {path}'))
+
+        return result['data']
+
+    async def _get_all_pages(self, path: str, params: dict, items_key: str) -> Tuple[dict, List[dict]]:
+        """Fetch the first page, then every remaining page concurrently"""
+        first_page = await self._get(path, {**params, 'limit': str(PAGE_SIZE), 'offset': '0'})
+        pages = await asyncio.gather(*(
+            self._get(path, {**params, 'limit': str(PAGE_SIZE), 'offset': str(offset)})
+            for offset in range(PAGE_SIZE, first_page['totalRecords'], PAGE_SIZE)
+        ))
+
+        items = list(first_page[items_key])
+        for page in pages:
+            items.extend(page[items_key])
+
+        return first_page, items
+
+    async def list_active_batches(self) -> Dict[str, dict]:
+        _, batches = await self._get_all_pages(
+            '/turbosign/bulk/batches',
+            {'status': ACTIVE_STATUSES},
+            'batches'
+        )
+        return {batch['id']: batch for batch in batches}
+
+    async def diff_batch(self, batch_id: str, previous: Optional[Tuple],
+                         current: Optional[dict] = None) -> Optional[BatchChange]:
+        """
+        Fetch the jobs behind a batch's counter changes since the previous poll.
+        `current` is the batch from this poll's listing; a batch that left the
+        active list has none, so its final counters come from its jobs page.
+        """
+        path = f'/turbosign/bulk/batch/{batch_id}/jobs'
+
+        if previous is None:
+            batch, jobs = await self._get_all_pages(path, {}, 'jobs')
+            changed_jobs = jobs
+        else:
+            if current is None:
+                batch = await self._get(path, {'limit': '1', 'offset': '0'})
+                counters = {key: batch[key] for key in COUNTER_STATUSES}
+                until = None
+            else:
+                counters = {key: current[key] for key in COUNTER_STATUSES}
+                until = parse_timestamp(current['updatedOn'])
+
+            previous_counters = dict(zip(('succeededJobs', 'failedJobs', 'pendingJobs'), previous[2:]))
+            statuses = [status for key, status in COUNTER_STATUSES.items() if counters[key] > previous_counters[key]]
+            if statuses:
+                batch, jobs = await self._get_all_pages(path, {'status': ','.join(statuses)}, 'jobs')
+            elif current is None:
+                jobs = []
+            else:
+                batch, jobs = await self._get(path, {'limit': '1', 'offset': '0'}), []
+
+            since = parse_timestamp(previous[0])
+            seen = set()
+            changed_jobs = []
+            for job in jobs:
+                updated_on = parse_timestamp(job['updatedOn'])
+                # Jobs newer than this poll's snapshot are reported by the next poll
+                if job['id'] not in seen and updated_on > since and (until is None or updated_on <= until):
+                    seen.add(job['id'])
+                    changed_jobs.append(job)
+
+        if previous is not None and not changed_jobs and previous[1] == batch['batchStatus']:
+            return None
+
+        return BatchChange(
+            batchId=batch_id,
+            batchName=batch['batchName'],
+            status=batch['batchStatus'],
+            totalJobs=batch['totalJobs'],
+            succeededJobs=batch['succeededJobs'],
+            failedJobs=batch['failedJobs'],
+            pendingJobs=batch['pendingJobs'],
+            changedJobs=[JobInfo(**job) for job in changed_jobs]
+        )
+
+    async def poll_once(self) -> List[BatchChange]:
+        active = await self.list_active_batches()
+
+        # Batches seen for the first time only establish a baseline unless emit_initial is set
+        to_diff = []
+        for batch_id, batch in active.items():
+            previous = self.batch_state.get(batch_id)
+            if previous is None and not self.emit_initial:
+                self.batch_state[batch_id] = batch_signature(batch)
+                continue
+            # updatedOn alone moving means nothing counted changed - no job fetch needed
+            if previous is None or previous[1:] != batch_signature(batch)[1:]:
+                to_diff.append((batch_id, previous, batch))
+            else:
+                self.batch_state[batch_id] = batch_signature(batch)
+
+        # Watched batches that left the active list have finished - report their final jobs once
+        finished = [batch_id for batch_id in self.batch_state if batch_id not in active]
+        to_diff.extend((batch_id, self.batch_state[batch_id], None) for batch_id in finished)
+
+        # One failing batch must not fail the poll for every other batch
+        results = await asyncio.gather(*(
+            self.diff_batch(batch_id, previous, current) for batch_id, previous, current in to_diff
+        ), return_exceptions=True)
+
+        changes = []
+        for (batch_id, previous, current), result in zip(to_diff, results):
+            if isinstance(result, BatchGoneError):
+                print(f'Batch {batch_id} no longer exists - no longer watched')
+                self.batch_state.pop(batch_id, None)
+            elif isinstance(result, BaseException):
+                # Keep the previous state so the next poll retries this batch
+                print(f'Error diffing batch {batch_id}: {result}')
+            else:
+                if current is None:
+                    del self.batch_state[batch_id]
+                else:
+                    self.batch_state[batch_id] = batch_signature(current)
+                if result is not None:
+                    changes.append(result)
+
+        # Adaptive backoff - poll quickly while batches are moving, slowly while idle
+        if changes:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+
+        return changes
+
+    async def watch(self) -> AsyncIterator[BatchChange]:
+        while True:
+            try:
+                for change in await self.poll_once():
+                    yield change
+            except (httpx.HTTPError, RuntimeError, ValueError) as error:
+                # ValueError covers a response body that is not JSON - keep watching
+                print(f'Error polling batches: {error}')
+                self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+
+            await asyncio.sleep(self.interval)
+
+@app.get('/watch-batches')
+async def watch_batches(
+    emit_initial: bool = Query(False, description="Emit every job of each batch on the first poll"),
+    min_interval: float = Query(MIN_POLL_INTERVAL, description="Fastest poll interval in seconds"),
+    max_interval: float = Query(MAX_POLL_INTERVAL, description="Slowest poll interval in seconds")
+):
+    watcher = BatchWatcher(
+        http_client,
+        min_interval=min_interval,
+        max_interval=max_interval,
+        emit_initial=emit_initial
+    )
+
+    async def stream_changes():
+        # Newline-delimited JSON, one changed batch per line
+        async for change in watcher.watch():
+            yield change.model_dump_json() + '\n'
+
+    return StreamingResponse(stream_changes(), media_type='application/x-ndjson')
@@ -1,146 +1,380 @@
-import requests
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
+import httpx
 
 # Configuration - Update these values
 API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 DOCUMENT_NAME = "Contract Agreement"
+UPLOAD_CACHE_PATH = "upload_cache.json"   # Uploaded documents that were never sent, keyed on content hash and name
+UPLOAD_CACHE_TTL = 7 * 24 * 3600          # Seconds before an unsent upload is no longer reused
+UPLOAD_CACHE_MAX_ENTRIES = 1000           # Least recently used entries are evicted beyond this
 
-# Complete Workflow: Upload → Recipients → Prepare
+# Pipeline settings - each stage runs its own pool of workers
+UPLOAD_CONCURRENCY = 4        # Uploads carry the PDF bytes, so keep this lowest
+RECIPIENTS_CONCURRENCY = 8
+PREPARE_CONCURRENCY = 8
 
-# Step 1: Upload Document
-files = {
-    'name': (None, DOCUMENT_NAME),
-    'file': ('document.pdf', open('document.pdf', 'rb'), 'application/pdf')
-}
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
 
-upload_response = requests.post(
-    f'{BASE_URL}/documents/upload',
-    headers={
-        'Authorization': f'Bearer {API_TOKEN}',
-        'x-rapiddocx-org-id': ORG_ID,
-        'User-Agent': 'TurboDocx API Client'
-    },
-    files=files
-)
+def load_upload_cache():
+    try:
+        with open(UPLOAD_CACHE_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
 
-upload_result = upload_response.json()
-document_id = upload_result['data']['id']
+def save_upload_cache(cache):
+    # Drop expired entries, keep the most recently used, and replace the file atomically
+    now = time.time()
+    live = [(key, entry) for key, entry in cache.items() if now - entry['uploadedAt'] < UPLOAD_CACHE_TTL]
+    live.sort(key=lambda item: item[1]['lastUsed'], reverse=True)
+    with open(UPLOAD_CACHE_PATH + '.tmp', 'w') as f:
+        json.dump(dict(live[:UPLOAD_CACHE_MAX_ENTRIES]), f)
+    os.replace(UPLOAD_CACHE_PATH + '.tmp', UPLOAD_CACHE_PATH)
 
-# Step 2: Add Recipients
-recipient_payload = {
-    "document": {
-        "name": f"{DOCUMENT_NAME} - Updated",
-        "description": "This document requires electronic signatures from both parties. Please review all content carefully before signing."
-    },
-    "recipients": [
-        {
-            "name": "John Smith",
-            "email": "john.smith@company.com",
-            "signingOrder": 1,
-            "metadata": {
-                "color": "hsl(200, 75%, 50%)",
-                "lightColor": "hsl(200, 75%, 93%)"
-            },
-            "documentId": document_id
+def upload_cache_key(digest, name):
+    return f'{digest}:{name}'
+
+def claim_upload(key):
+    """Take an unsent document out of the cache so no other job can reuse it"""
+    cache = load_upload_cache()
+    entry = cache.pop(key, None)
+    if entry is None:
+        return None
+    save_upload_cache(cache)
+    return entry if time.time() - entry['uploadedAt'] < UPLOAD_CACHE_TTL else None
+
+def release_upload(key, document_id, name, uploaded_at):
+    """Hand a document that never got recipients back to the cache for a later run"""
+    cache = load_upload_cache()
+    cache[key] = {'id': document_id, 'name': name, 'uploadedAt': uploaded_at, 'lastUsed': time.time()}
+    save_upload_cache(cache)
+
+async def upload_document(client, path, name, digest=None):
+    """
+    Upload a PDF, or reuse a document an earlier run uploaded with the same
+    bytes and name but never sent. A cached document is claimed (removed from
+    the cache) when it is reused, so it is never handed to two sends.
+    """
+    digest = digest or await asyncio.to_thread(file_sha256, path)
+    # No await between reading and rewriting the cache, so the claim is atomic within the event loop
+    entry = claim_upload(upload_cache_key(digest, name))
+
+    if entry:
+        return {'data': {'id': entry['id'], 'name': entry['name']}, 'uploadedAt': entry['uploadedAt'], 'cached': True}
+
+    with open(path, 'rb') as f:
+        response = await client.post(
+            '/documents/upload',
+            data={'name': name},
+            files={'file': (os.path.basename(path), f, 'application/pdf')}
+        )
+
+    response.raise_for_status()
+    result = response.json()
+    result['uploadedAt'] = time.time()
+    return result
+
+def build_recipient_payload(document_id, document_name, signers):
+    colors = [200, 270, 30, 130]
+    return {
+        "document": {
+            "name": f"{document_name} - Updated",
+            "description": "This document requires electronic signatures from both parties. Please review all content carefully before signing."
         },
-        {
-            "name": "Jane Doe",
-            "email": "jane.doe@partner.com",
-            "signingOrder": 2,
-            "metadata": {
-                "color": "hsl(270, 75%, 50%)",
-                "lightColor": "hsl(270, 75%, 93%)"
-            },
-            "documentId": document_id
-        }
-    ]
+        "recipients": [
+            {
+                "name": signer['name'],
+                "email": signer['email'],
+                "signingOrder": index + 1,
+                "metadata": {
+                    "color": f"hsl({colors[index % len(colors)]}, 75%, 50%)",
+                    "lightColor": f"hsl({colors[index % len(colors)]}, 75%, 93%)"
+                },
+                "documentId": document_id
+            }
+            for index, signer in enumerate(signers)
+        ]
+    }
+
+FIELD_TYPES = {
+    'signature', 'initial', 'date', 'full_name', 'first_name', 'last_name',
+    'title', 'company', 'email', 'text', 'checkbox'
 }
 
-recipient_response = requests.post(
-    f'{BASE_URL}/documents/{document_id}/update-with-recipients',
-    headers={
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {API_TOKEN}',
-        'x-rapiddocx-org-id': ORG_ID,
-        'User-Agent': 'TurboDocx API Client'
-    },
-    json=recipient_payload
-)
+class FieldLayout:
+    """
+    A named set of anchor-based fields, validated and serialized once.
+
+    Fields reference signers by position (`signer`: 0, 1, ...) instead of a
+    recipientId. The JSON body is pre-rendered into literal segments with a
+    slot for each field's recipientId, so render() only splices in the IDs
+    for a document instead of rebuilding and re-serializing nested dicts.
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.signer_count = 0
+        self.segments = []
+
+        pending = '['
+        for index, field_spec in enumerate(fields):
+            self._validate(index, field_spec)
+            self.signer_count = max(self.signer_count, field_spec['signer'] + 1)
+
+            body = {
+                "type": field_spec['type'],
+                "template": {
+                    "placement": "replace",
+                    "offset": {"x": 0, "y": 0},
+                    "caseSensitive": True,
+                    "useRegex": False,
+                    **field_spec['template']
+                },
+                "defaultValue": field_spec.get('defaultValue', ''),
+                "required": field_spec.get('required', True)
+            }
+
+            pending += (',' if index else '') + '{"recipientId":'
+            self.segments.append(pending)
+            self.segments.append(field_spec['signer'])
+            pending = ',' + json.dumps(body, separators=(',', ':'))[1:]
+        self.segments.append(pending + ']')
+
+    def _validate(self, index, field_spec):
+        where = f"Layout '{self.name}' field {index}"
+        if not isinstance(field_spec.get('signer'), int) or field_spec['signer'] < 0:
+            raise ValueError(f'{where}: signer must be a non-negative integer')
+        if field_spec.get('type') not in FIELD_TYPES:
+            raise ValueError(f"{where}: unknown field type {field_spec.get('type')!r}")
+        template = field_spec.get('template') or {}
+        if not template.get('anchor'):
+            raise ValueError(f'{where}: template.anchor is required')
+        size = template.get('size') or {}
+        if not (size.get('width', 0) > 0 and size.get('height', 0) > 0):
+            raise ValueError(f'{where}: template.size needs a positive width and height')
 
-recipient_result = recipient_response.json()
-recipients = recipient_result['data']['recipients']
+    def render(self, recipient_ids):
+        """Return the prepare-for-signing JSON body for one document"""
+        if len(recipient_ids) < self.signer_count:
+            raise ValueError(
+                f"Layout '{self.name}' needs {self.signer_count} recipients, got {len(recipient_ids)}"
+            )
+        return ''.join(
+            segment if isinstance(segment, str) else json.dumps(recipient_ids[segment])
+            for segment in self.segments
+        )
 
-# Step 3: Prepare for Signing
-signature_fields = [
+FIELD_LAYOUTS = {}
+
+def register_layout(name, fields):
+    FIELD_LAYOUTS[name] = FieldLayout(name, fields)
+    return FIELD_LAYOUTS[name]
+
+# Layouts are defined once at startup - add one per document type you send
+register_layout('two-party-nda', [
     {
-        "recipientId": recipients[0]['id'],
+        "signer": 0,
         "type": "signature",
-        "template": {
-            "anchor": "{Signature1}",
-            "placement": "replace",
-            "size": {"width": 200, "height": 80},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
-        "defaultValue": "",
-        "required": True
+        "template": {"anchor": "{Signature1}", "size": {"width": 200, "height": 80}}
     },
     {
-        "recipientId": recipients[0]['id'],
+        "signer": 0,
         "type": "date",
-        "template": {
-            "anchor": "{Date1}",
-            "placement": "replace",
-            "size": {"width": 150, "height": 30},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
-        "defaultValue": "",
-        "required": True
+        "template": {"anchor": "{Date1}", "size": {"width": 150, "height": 30}}
     },
     {
-        "recipientId": recipients[1]['id'],
+        "signer": 1,
         "type": "signature",
-        "template": {
-            "anchor": "{Signature2}",
-            "placement": "replace",
-            "size": {"width": 200, "height": 80},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
-        "defaultValue": "",
-        "required": True
+        "template": {"anchor": "{Signature2}", "size": {"width": 200, "height": 80}}
     },
     {
-        "recipientId": recipients[1]['id'],
+        "signer": 1,
         "type": "text",
-        "template": {
-            "anchor": "{Title2}",
-            "placement": "replace",
-            "size": {"width": 200, "height": 30},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
+        "template": {"anchor": "{Title2}", "size": {"width": 200, "height": 30}},
         "defaultValue": "Business Partner",
         "required": False
     }
-]
-
-prepare_response = requests.post(
-    f'{BASE_URL}/documents/{document_id}/prepare-for-signing',
-    headers={
-        'Content-Type': 'application/json',
-        'Authorization': f'Bearer {API_TOKEN}',
-        'x-rapiddocx-org-id': ORG_ID,
-        'User-Agent': 'TurboDocx API Client'
-    },
-    json=signature_fields
-)
+])
+
+@dataclass
+class WorkflowJob:
+    path: str
+    name: str
+    signers: List[dict]
+    layout: str = 'two-party-nda'
+    document_hash: Optional[str] = None
+    document_id: Optional[str] = None
+    uploaded_at: Optional[float] = None
+    recipients: List[dict] = field(default_factory=list)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+@dataclass
+class StageStats:
+    name: str
+    completed: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def record(self, started, finished, ok):
+        self.started_at = started if self.started_at is None else min(self.started_at, started)
+        self.finished_at = finished if self.finished_at is None else max(self.finished_at, finished)
+        self.busy_seconds += finished - started
+        if ok:
+            self.completed += 1
+        else:
+            self.failed += 1
+
+    def summary(self):
+        handled = self.completed + self.failed
+        elapsed = (self.finished_at - self.started_at) if handled else 0.0
+        return {
+            'stage': self.name,
+            'completed': self.completed,
+            'failed': self.failed,
+            'docsPerSecond': round(self.completed / elapsed, 2) if elapsed else 0.0,
+            'avgLatencyMs': round(self.busy_seconds / handled * 1000, 1) if handled else 0.0
+        }
+
+class WorkflowPipeline:
+    """
+    Run upload -> update-with-recipients -> prepare-for-signing over many documents.
+
+    Each stage has its own worker pool and hands finished jobs to the next
+    stage through a bounded queue, so document k+1 can be uploading while
+    document k is getting its recipients. A job that fails in one stage
+    skips the remaining stages and keeps its error.
+
+    Jobs never share a document: a cached upload is claimed by exactly one
+    job, and only documents that never got recipients go back to the cache.
+    """
+
+    def __init__(self, client,
+                 upload_concurrency=UPLOAD_CONCURRENCY,
+                 recipients_concurrency=RECIPIENTS_CONCURRENCY,
+                 prepare_concurrency=PREPARE_CONCURRENCY):
+        self.client = client
+        self.stages = [
+            (self.upload, upload_concurrency),
+            (self.add_recipients, recipients_concurrency),
+            (self.prepare, prepare_concurrency)
+        ]
+        self.stats = [StageStats('upload'), StageStats('recipients'), StageStats('prepare')]
+
+    async def upload(self, job):
+        # Every job gets its own document - even identical PDFs are uploaded once per job,
+        # because update-with-recipients and prepare-for-signing bind a document to one send
+        job.document_hash = await asyncio.to_thread(file_sha256, job.path)
+        upload_result = await upload_document(self.client, job.path, job.name, job.document_hash)
+        if 'data' not in upload_result:
+            raise RuntimeError(f'Upload failed: {upload_result}')
+        job.document_id = upload_result['data']['id']
+        job.uploaded_at = upload_result['uploadedAt']
+
+    async def add_recipients(self, job):
+        response = await self.client.post(
+            f'/documents/{job.document_id}/update-with-recipients',
+            json=build_recipient_payload(job.document_id, job.name, job.signers)
+        )
+        response.raise_for_status()
+        job.recipients = response.json()['data']['recipients']
+
+    async def prepare(self, job):
+        response = await self.client.post(
+            f'/documents/{job.document_id}/prepare-for-signing',
+            content=FIELD_LAYOUTS[job.layout].render([recipient['id'] for recipient in job.recipients]),
+            headers={'Content-Type': 'application/json'}
+        )
+        response.raise_for_status()
+        job.result = response.json()
+
+    async def _worker(self, step, stats, inbox, outbox):
+        while True:
+            job = await inbox.get()
+            try:
+                if job.error is None:
+                    started = time.perf_counter()
+                    try:
+                        await step(job)
+                    except Exception as error:
+                        job.error = f'{stats.name}: {error}'
+                    stats.record(started, time.perf_counter(), job.error is None)
+                await outbox.put(job)
+            finally:
+                inbox.task_done()
+
+    async def run(self, jobs: Iterable[WorkflowJob]) -> List[WorkflowJob]:
+        queues = [asyncio.Queue(maxsize=concurrency * 2) for _, concurrency in self.stages]
+        done = asyncio.Queue()
+        outboxes = queues[1:] + [done]
+
+        workers = [
+            [asyncio.create_task(self._worker(step, stats, inbox, outbox)) for _ in range(concurrency)]
+            for (step, concurrency), stats, inbox, outbox in zip(self.stages, self.stats, queues, outboxes)
+        ]
+
+        # Feed jobs as the first stage frees up, then drain the stages in order
+        for job in jobs:
+            await queues[0].put(job)
+
+        for queue, stage_workers in zip(queues, workers):
+            await queue.join()
+            for worker in stage_workers:
+                worker.cancel()
+
+        results = []
+        while not done.empty():
+            job = done.get_nowait()
+            if job.error and job.document_id and not job.recipients:
+                # Uploaded but never given recipients - a later run can send it instead of uploading again
+                release_upload(upload_cache_key(job.document_hash, job.name), job.document_id, job.name, job.uploaded_at)
+            results.append(job)
+        return results
+
+async def main():
+    # One entry per document to send - the same two signers here for illustration
+    signers = [
+        {"name": "John Smith", "email": "john.smith@company.com"},
+        {"name": "Jane Doe", "email": "jane.doe@partner.com"}
+    ]
+    jobs = [
+        WorkflowJob(path=path, name=f"{DOCUMENT_NAME} - {os.path.splitext(os.path.basename(path))[0]}", signers=signers)
+        for path in ['document.pdf']
+    ]
+
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        limits=httpx.Limits(max_connections=UPLOAD_CONCURRENCY + RECIPIENTS_CONCURRENCY + PREPARE_CONCURRENCY),
+        timeout=httpx.Timeout(60.0, connect=10.0)
+    ) as client:
+        pipeline = WorkflowPipeline(client)
+        results = await pipeline.run(jobs)
+
+    for job in results:
+        print(job.path, job.error or job.result)
+
+    for stats in pipeline.stats:
+        print(stats.summary())
 
-final_result = prepare_response.json()
-print(final_result)
\ No newline at end of file
+if __name__ == '__main__':
+    asyncio.run(main())
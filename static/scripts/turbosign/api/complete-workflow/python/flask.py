@@ -9,21 +9,24 @@ DOCUMENT_NAME = "Contract Agreement"
 # Complete Workflow: Upload → Recipients → Prepare
 
 # Step 1: Upload Document
-files = {
-    'name': (None, DOCUMENT_NAME),
-    'file': ('document.pdf', open('document.pdf', 'rb'), 'application/pdf')
-}
-
-upload_response = requests.post(
-    f'{BASE_URL}/documents/upload',
-    headers={
-        'Authorization': f'Bearer {API_TOKEN}',
-        'x-rapiddocx-org-id': ORG_ID,
-        'User-Agent': 'TurboDocx API Client'
-    },
-    files=files
-)
+with open('document.pdf', 'rb') as f:
+    upload_response = requests.post(
+        f'{BASE_URL}/documents/upload',
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        files={
+            'name': (None, DOCUMENT_NAME),
+            'file': ('document.pdf', f, 'application/pdf')
+        }
+    )
 
+# Check the status before parsing - an error body is not always JSON
+if not upload_response.ok:
+    print(f'Upload failed: HTTP {upload_response.status_code} {upload_response.text}')
+    raise SystemExit(1)
 upload_result = upload_response.json()
 document_id = upload_result['data']['id']
 
@@ -68,6 +71,9 @@ recipient_response = requests.post(
     json=recipient_payload
 )
 
+if not recipient_response.ok:
+    print(f'Adding recipients failed: HTTP {recipient_response.status_code} {recipient_response.text}')
+    raise SystemExit(1)
 recipient_result = recipient_response.json()
 recipients = recipient_result['data']['recipients']
 
@@ -1,14 +1,43 @@
 import json
-import requests
+from contextlib import asynccontextmanager
+import httpx
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from pydantic import BaseModel
+from typing import Optional
 
 # Configuration - Update these values
 API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
-app = FastAPI()
+# Use HTTP/2 when the optional h2 package is installed (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_ENABLED = True
+except ImportError:
+    HTTP2_ENABLED = False
+
+# Shared async client - one pooled set of keep-alive connections for every request
+http_client: Optional[httpx.AsyncClient] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global http_client
+    http_client = httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={
+            'Authorization': f'Bearer {API_TOKEN}',
+            'x-rapiddocx-org-id': ORG_ID,
+            'User-Agent': 'TurboDocx API Client'
+        },
+        http2=HTTP2_ENABLED,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        timeout=httpx.Timeout(30.0, connect=10.0)
+    )
+    yield
+    await http_client.aclose()
+
+app = FastAPI(lifespan=lifespan)
 
 class PrepareResponse(BaseModel):
     success: bool
@@ -20,11 +49,6 @@ class PrepareResponse(BaseModel):
 @app.post('/prepare-for-review', response_model=PrepareResponse)
 async def prepare_document_for_review(file: UploadFile = File(...)):
     try:
-        # Prepare form data
-        files = {
-            'file': (file.filename, file.file, file.content_type)
-        }
-
         # Prepare form fields
         data = {
             'documentName': 'Contract Agreement',
@@ -83,17 +107,15 @@ async def prepare_document_for_review(file: UploadFile = File(...)):
         ])
         data['fields'] = fields
 
-        # Prepare headers
-        headers = {
-            'Authorization': f'Bearer {API_TOKEN}',
-            'x-rapiddocx-org-id': ORG_ID,
-            'User-Agent': 'TurboDocx API Client'
+        # Starlette has already spooled the upload to a temporary file; httpx streams the
+        # multipart body from it in chunks rather than reading the whole file into memory
+        files = {
+            'file': (file.filename or 'document.pdf', file.file, file.content_type or 'application/pdf')
         }
 
-        # Send request
-        response = requests.post(
-            f'{BASE_URL}/turbosign/single/prepare-for-review',
-            headers=headers,
+        # Send request over the shared connection pool
+        response = await http_client.post(
+            '/turbosign/single/prepare-for-review',
             data=data,
             files=files
         )
@@ -1,4 +1,8 @@
 import json
+import mmap
+import os
+import re
+from functools import lru_cache
 import requests
 from flask import Flask, jsonify
 
@@ -7,8 +11,149 @@ API_TOKEN = "YOUR_API_TOKEN"
 ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 
+# Anchors are resolved locally when pymupdf is installed (pip install pymupdf), so a
+# missing anchor fails before the upload; without it the API places the anchor fields
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
 app = Flask(__name__)
 
+class PdfTextIndex:
+    """
+    Character positions for every text line of a PDF.
+
+    The document is parsed once into lines, each holding its text and one
+    bounding box per character. Anchors are matched against whole lines, so
+    an anchor spanning several words or glued to neighbouring text
+    ("Sign:{Signature1}") is found, and its box is taken from the matched
+    characters rather than from the word that contains them.
+
+    This replaces a per-page inverted index of word tokens. Token lookups
+    only find anchors that are whole words, cannot serve useRegex anchors,
+    and return the box of the surrounding word. find() instead runs one
+    regex search over each page's text to skip pages without the anchor,
+    then scans that page's lines. The expensive step, parsing the PDF, still
+    happens once per file.
+    """
+
+    def __init__(self, document):
+        self.pages = [self._index_page(page) for page in document]
+
+    @classmethod
+    def from_file(cls, f):
+        """Memory-map an open file instead of reading it into memory"""
+        f.flush()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            document = pymupdf.open(stream=view, filetype='pdf')
+            try:
+                return cls(document)
+            finally:
+                document.close()
+                view.release()
+
+    def _index_page(self, page):
+        # Each char is {'c': text, 'bbox': (x0, y0, x1, y1)} in points from the top-left
+        lines = []
+        for block in page.get_text('rawdict')['blocks']:
+            for line in block.get('lines', []):
+                text, boxes = [], []
+                for span in line['spans']:
+                    for char in span['chars']:
+                        # Words drawn as separate runs with no space character between them
+                        if (boxes and not text[-1].isspace() and not char['c'].isspace()
+                                and char['bbox'][0] - boxes[-1][2] > span['size'] * 0.25):
+                            text.append(' ')
+                            boxes.append((boxes[-1][2], boxes[-1][1], char['bbox'][0], boxes[-1][3]))
+                        text.append(char['c'])
+                        boxes.append(tuple(char['bbox']))
+                if text:
+                    lines.append((''.join(text), boxes))
+        return {
+            'width': page.rect.width,
+            'height': page.rect.height,
+            'lines': lines,
+            'text': '\n'.join(text for text, _ in lines)
+        }
+
+    def find(self, anchor, case_sensitive=True, use_regex=False):
+        """Return (page_number, x0, y0, x1, y1) of the first match, or None"""
+        # A plain anchor matches its words separated by any run of whitespace
+        source = anchor if use_regex else r'\s+'.join(re.escape(part) for part in anchor.split())
+        pattern = re.compile(source, 0 if case_sensitive else re.IGNORECASE)
+
+        for page_number, page in enumerate(self.pages, start=1):
+            # One search over the page text skips pages without the anchor
+            if not pattern.search(page['text']):
+                continue
+            for text, boxes in page['lines']:
+                match = pattern.search(text)
+                if match and match.end() > match.start():
+                    matched = boxes[match.start():match.end()]
+                    return (page_number, matched[0][0], min(box[1] for box in matched),
+                            matched[-1][2], max(box[3] for box in matched))
+        return None
+
+@lru_cache(maxsize=32)
+def _cached_text_index(path, mtime, size):
+    with open(path, 'rb') as f:
+        return PdfTextIndex.from_file(f)
+
+def get_text_index(path):
+    """Build the index once per file version; later calls reuse it"""
+    stat = os.stat(path)
+    return _cached_text_index(path, stat.st_mtime_ns, stat.st_size)
+
+def resolve_anchor_fields(fields, index):
+    """
+    Convert template (anchor) fields to coordinate fields using the local index.
+
+    Returns (resolved_fields, missing_anchors). Fields that already use
+    coordinates are passed through unchanged.
+    """
+    resolved, missing = [], []
+
+    for field in fields:
+        template = field.get('template')
+        if not template:
+            resolved.append(field)
+            continue
+
+        match = index.find(
+            template['anchor'],
+            case_sensitive=template.get('caseSensitive', True),
+            use_regex=template.get('useRegex', False)
+        )
+        if match is None:
+            missing.append(template['anchor'])
+            continue
+
+        page_number, x0, y0, x1, y1 = match
+        page = index.pages[page_number - 1]
+        size = template['size']
+        offset = template.get('offset') or {'x': 0, 'y': 0}
+        placement = template.get('placement', 'replace')
+
+        # "before" ends the field at the anchor, "after" starts it where the anchor ends
+        x = {'before': x0 - size['width'], 'after': x1}.get(placement, x0) + offset['x']
+        y = y0 + offset['y']
+
+        coordinate_field = {key: value for key, value in field.items() if key != 'template'}
+        coordinate_field.update({
+            'page': page_number,
+            'x': round(max(0, min(x, page['width'] - size['width'])), 2),
+            'y': round(max(0, min(y, page['height'] - size['height'])), 2),
+            'width': size['width'],
+            'height': size['height'],
+            'pageWidth': page['width'],
+            'pageHeight': page['height']
+        })
+        resolved.append(coordinate_field)
+
+    return resolved, missing
+
 @app.route('/prepare-for-signing', methods=['POST'])
 def prepare_document_for_signing():
     try:
@@ -40,40 +185,41 @@ def prepare_document_for_signing():
         ])
         data['recipients'] = recipients
 
-        # Add fields (as JSON string) - Coordinate-based positioning
-        fields = json.dumps([
+        # Define fields with text anchors - the API places them, or they are resolved locally below
+        anchor_fields = [
             {
                 "recipientEmail": "john.smith@company.com",
                 "type": "signature",
-                "page": 1,
-                "x": 100,
-                "y": 200,
-                "width": 200,
-                "height": 80,
+                "template": {"anchor": "{Signature1}", "placement": "replace", "size": {"width": 200, "height": 80}},
                 "required": True
             },
             {
                 "recipientEmail": "john.smith@company.com",
                 "type": "date",
-                "page": 1,
-                "x": 100,
-                "y": 300,
-                "width": 150,
-                "height": 30,
+                "template": {"anchor": "{Date1}", "placement": "replace", "size": {"width": 150, "height": 30}},
                 "required": True
             },
             {
                 "recipientEmail": "jane.doe@partner.com",
                 "type": "signature",
-                "page": 1,
-                "x": 350,
-                "y": 200,
-                "width": 200,
-                "height": 80,
+                "template": {"anchor": "{Signature2}", "placement": "replace", "size": {"width": 200, "height": 80}},
                 "required": True
             }
-        ])
-        data['fields'] = fields
+        ]
+
+        fields = anchor_fields
+        if pymupdf is not None:
+            # Find anchors in the PDF before uploading - a missing anchor fails here, not after a round trip
+            fields, missing_anchors = resolve_anchor_fields(anchor_fields, get_text_index('./contract.pdf'))
+            if missing_anchors:
+                return jsonify({
+                    'success': False,
+                    'error': 'Anchors not found in document',
+                    'missingAnchors': missing_anchors
+                }), 400
+
+        # Add fields (as JSON string) - anchor-based, or coordinates once resolved locally
+        data['fields'] = json.dumps(fields)
 
         # Optional: Add CC emails
         ccEmails = json.dumps(["manager@company.com", "legal@company.com"])
@@ -7,77 +7,127 @@ ORG_ID = "YOUR_ORGANIZATION_ID"
 BASE_URL = "https://api.turbodocx.com"
 DOCUMENT_NAME = "Contract Agreement"
 
-# Step 3: Prepare for Signing
-document_id = "4a20eca5-7944-430c-97d5-fcce4be24296"
+FIELD_TYPES = {
+    'signature', 'initial', 'date', 'full_name', 'first_name', 'last_name',
+    'title', 'company', 'email', 'text', 'checkbox'
+}
 
-url = f"{BASE_URL}/documents/{document_id}/prepare-for-signing"
+class FieldLayout:
+    """
+    A named set of anchor-based fields, validated and serialized once.
 
-headers = {
-    "Content-Type": "application/json",
-    "Authorization": f"Bearer {API_TOKEN}",
-    "x-rapiddocx-org-id": ORG_ID,
-    "User-Agent": "TurboDocx API Client"
-}
+    Fields reference signers by position (`signer`: 0, 1, ...) instead of a
+    recipientId. The JSON body is pre-rendered into literal segments with a
+    slot for each field's recipientId, so render() only splices in the IDs
+    for a document instead of rebuilding and re-serializing nested dicts.
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.signer_count = 0
+        self.segments = []
+
+        pending = '['
+        for index, field_spec in enumerate(fields):
+            self._validate(index, field_spec)
+            self.signer_count = max(self.signer_count, field_spec['signer'] + 1)
+
+            body = {
+                "type": field_spec['type'],
+                "template": {
+                    "placement": "replace",
+                    "offset": {"x": 0, "y": 0},
+                    "caseSensitive": True,
+                    "useRegex": False,
+                    **field_spec['template']
+                },
+                "defaultValue": field_spec.get('defaultValue', ''),
+                "required": field_spec.get('required', True)
+            }
+
+            pending += (',' if index else '') + '{"recipientId":'
+            self.segments.append(pending)
+            self.segments.append(field_spec['signer'])
+            pending = ',' + json.dumps(body, separators=(',', ':'))[1:]
+        self.segments.append(pending + ']')
+
+    def _validate(self, index, field_spec):
+        where = f"Layout '{self.name}' field {index}"
+        if not isinstance(field_spec.get('signer'), int) or field_spec['signer'] < 0:
+            raise ValueError(f'{where}: signer must be a non-negative integer')
+        if field_spec.get('type') not in FIELD_TYPES:
+            raise ValueError(f"{where}: unknown field type {field_spec.get('type')!r}")
+        template = field_spec.get('template') or {}
+        if not template.get('anchor'):
+            raise ValueError(f'{where}: template.anchor is required')
+        size = template.get('size') or {}
+        if not (size.get('width', 0) > 0 and size.get('height', 0) > 0):
+            raise ValueError(f'{where}: template.size needs a positive width and height')
+
+    def render(self, recipient_ids):
+        """Return the prepare-for-signing JSON body for one document"""
+        if len(recipient_ids) < self.signer_count:
+            raise ValueError(
+                f"Layout '{self.name}' needs {self.signer_count} recipients, got {len(recipient_ids)}"
+            )
+        return ''.join(
+            segment if isinstance(segment, str) else json.dumps(recipient_ids[segment])
+            for segment in self.segments
+        )
 
-signature_fields = [
+FIELD_LAYOUTS = {}
+
+def register_layout(name, fields):
+    FIELD_LAYOUTS[name] = FieldLayout(name, fields)
+    return FIELD_LAYOUTS[name]
+
+# Layouts are defined once at startup - add one per document type you send
+register_layout('two-party-nda', [
     {
-        "recipientId": "5f673f37-9912-4e72-85aa-8f3649760f6b",
+        "signer": 0,
         "type": "signature",
-        "template": {
-            "anchor": "{Signature1}",
-            "placement": "replace",
-            "size": {"width": 200, "height": 80},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
-        "defaultValue": "",
-        "required": True
+        "template": {"anchor": "{Signature1}", "size": {"width": 200, "height": 80}}
     },
     {
-        "recipientId": "5f673f37-9912-4e72-85aa-8f3649760f6b",
+        "signer": 0,
         "type": "date",
-        "template": {
-            "anchor": "{Date1}",
-            "placement": "replace",
-            "size": {"width": 150, "height": 30},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
-        "defaultValue": "",
-        "required": True
+        "template": {"anchor": "{Date1}", "size": {"width": 150, "height": 30}}
     },
     {
-        "recipientId": "a8b9c1d2-3456-7890-abcd-ef1234567890",
+        "signer": 1,
         "type": "signature",
-        "template": {
-            "anchor": "{Signature2}",
-            "placement": "replace",
-            "size": {"width": 200, "height": 80},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
-        "defaultValue": "",
-        "required": True
+        "template": {"anchor": "{Signature2}", "size": {"width": 200, "height": 80}}
     },
     {
-        "recipientId": "a8b9c1d2-3456-7890-abcd-ef1234567890",
+        "signer": 1,
         "type": "text",
-        "template": {
-            "anchor": "{Title2}",
-            "placement": "replace",
-            "size": {"width": 200, "height": 30},
-            "offset": {"x": 0, "y": 0},
-            "caseSensitive": True,
-            "useRegex": False
-        },
+        "template": {"anchor": "{Title2}", "size": {"width": 200, "height": 30}},
         "defaultValue": "Business Partner",
         "required": False
     }
+])
+
+# Step 3: Prepare for Signing
+document_id = "4a20eca5-7944-430c-97d5-fcce4be24296"
+
+url = f"{BASE_URL}/documents/{document_id}/prepare-for-signing"
+
+headers = {
+    "Content-Type": "application/json",
+    "Authorization": f"Bearer {API_TOKEN}",
+    "x-rapiddocx-org-id": ORG_ID,
+    "User-Agent": "TurboDocx API Client"
+}
+
+# Recipient IDs from Step 2, in the order the layout's signers are numbered
+recipient_ids = [
+    "5f673f37-9912-4e72-85aa-8f3649760f6b",
+    "a8b9c1d2-3456-7890-abcd-ef1234567890"
 ]
 
-response = requests.post(url, headers=headers, json=signature_fields)
+# The layout's JSON is pre-serialized - only the recipient IDs are spliced in per document
+body = FIELD_LAYOUTS['two-party-nda'].render(recipient_ids)
+
+response = requests.post(url, headers=headers, data=body)
 result = response.json()
 print(result)
\ No newline at end of file